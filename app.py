@@ -1,4 +1,8 @@
+import hashlib
+import io
+import logging
 import os
+from typing import List, Optional
 import streamlit as st
 from PIL import Image
 from datetime import datetime
@@ -6,9 +10,41 @@ from dotenv import load_dotenv
 
 from src.isbn_detector import ISBNDetector
 from src.book_api_client import BookAPIClient
+from src.book_cache import BookCache
+from src.metrics import get_metrics
 from src.notion_client import NotionClient
+from src.revalidating_client import RevalidatingBookClient
 
 load_dotenv()
+# デバッグログを表示する場合は LOG_LEVEL=DEBUG を設定する
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+
+
+# 検出器・APIクライアントは再実行のたびに作り直さず、プロセス内で使い回す
+@st.cache_resource
+def get_detector() -> ISBNDetector:
+    return ISBNDetector()
+
+
+@st.cache_resource
+def get_api_client(google_api_key: Optional[str]) -> RevalidatingBookClient:
+    # 取得した書籍情報はISBNごとにキャッシュされ、古くなったものや項目が欠けているものは
+    # スキャンを待たせずにバックグラウンドで取り直す
+    return RevalidatingBookClient(
+        BookAPIClient(google_api_key=google_api_key, concurrent=True, cache=BookCache())
+    )
+
+
+@st.cache_resource
+def get_notion_client(api_token: str) -> NotionClient:
+    return NotionClient(api_token)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def detect_isbns(image_hash: str, _image_bytes: bytes) -> List[str]:
+    """画像の内容のハッシュごとに検出結果をキャッシュする（ボタン操作などの再実行で検出し直さない）"""
+    return get_detector().detect_isbn(Image.open(io.BytesIO(_image_bytes)))
+
 
 if "detection_history" not in st.session_state:
     st.session_state.detection_history = []
@@ -59,12 +95,11 @@ with tab1:
         )
 
     if uploaded_file:
-        image = Image.open(uploaded_file)
-        st.image(image, caption="アップロード画像", use_container_width=True)
+        image_bytes = uploaded_file.getvalue()
+        st.image(image_bytes, caption="アップロード画像", use_container_width=True)
 
         with st.spinner("ISBNバーコードを検出中..."):
-            detector = ISBNDetector()
-            isbns = detector.detect_isbn(image)
+            isbns = detect_isbns(hashlib.sha256(image_bytes).hexdigest(), image_bytes)
 
         if not isbns:
             st.warning("⚠️ ISBNバーコードが検出できませんでした。")
@@ -78,13 +113,11 @@ with tab1:
         else:
             st.success(f"✅ 検出されたISBN: {', '.join(isbns)}")
 
-            api_client = BookAPIClient(
-                google_api_key=os.getenv("GOOGLE_BOOKS_API_KEY")
-            )
+            api_client = get_api_client(os.getenv("GOOGLE_BOOKS_API_KEY"))
 
             for isbn in isbns:
                 with st.spinner(f"書籍情報を取得中（ISBN: {isbn}）..."):
-                    book = api_client.get_book_info(isbn, use_cache=False)
+                    book = api_client.get_book_info(isbn)
 
                 if book:
                     col1, col2 = st.columns([1, 3])
@@ -126,7 +159,7 @@ with tab1:
                         if st.session_state.notion_token and st.session_state.notion_database_id:
                             if st.button(f"📝 Notionに登録", key=f"notion_{isbn}"):
                                 with st.spinner("Notionに登録中..."):
-                                    notion_client = NotionClient(st.session_state.notion_token)
+                                    notion_client = get_notion_client(st.session_state.notion_token)
 
                                     # デバッグ情報を表示
                                     with st.expander("🔍 デバッグ情報", expanded=True):
@@ -142,8 +175,7 @@ with tab1:
                                         st.write(f"- 表紙URL: `{book.cover_image_url[:80] if book.cover_image_url else None}...`")
 
                                         # 画像URL検証
-                                        from src.book_api_client import BookAPIClient
-                                        is_valid = BookAPIClient.is_valid_image_url(book.cover_image_url)
+                                        is_valid = api_client.client.image_validator.is_valid(book.cover_image_url)
                                         st.write(f"- **画像URL有効性: `{is_valid}`** {'✅' if is_valid else '❌ (Notionで表示できない形式)'}")
 
                                         property_types = notion_client.get_property_mapping(st.session_state.notion_database_id)
@@ -153,9 +185,11 @@ with tab1:
                                             st.write(f"- Pages: `{property_types.get('Pages')}`")
                                         st.json(property_types)
 
+                                    # 同じISBNのページが既にあれば作成せずに更新する
                                     result, error = notion_client.add_book_to_database(
                                         st.session_state.notion_database_id,
-                                        book
+                                        book,
+                                        on_existing="update"
                                     )
                                 if result:
                                     st.success("✅ Notionデータベースに登録しました！")
@@ -304,3 +338,38 @@ with tab3:
             "google_api_key_set": bool(os.getenv("GOOGLE_BOOKS_API_KEY")),
             "zbar_available": True
         })
+
+        # 起動してからの処理時間・キャッシュヒット数など（プロセス内の合計）
+        metrics = get_metrics()
+        snapshot = metrics.snapshot()
+        st.write("**処理時間**")
+        st.dataframe([
+            {
+                "name": timer["name"],
+                "labels": ", ".join(f"{k}={v}" for k, v in timer["labels"].items()),
+                "count": timer["count"],
+                "mean (ms)": round(timer["mean"] * 1000, 1),
+                "max (ms)": round(timer["max"] * 1000, 1),
+                "total (s)": round(timer["sum"], 2),
+            }
+            for timer in snapshot["timers"]
+        ], use_container_width=True)
+        st.write("**カウンター**")
+        st.dataframe([
+            {
+                "name": counter["name"],
+                "labels": ", ".join(f"{k}={v}" for k, v in counter["labels"].items()),
+                "value": counter["value"],
+            }
+            for counter in snapshot["counters"]
+        ], use_container_width=True)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("Prometheus形式", metrics.to_prometheus(), file_name="metrics.prom")
+        with col2:
+            st.download_button("JSON", metrics.to_json(indent=2), file_name="metrics.json")
+        with col3:
+            if st.button("リセット"):
+                metrics.reset()
+                st.rerun()
@@ -0,0 +1,122 @@
+"""Amazon商品ページ解析のベンチマーク
+
+従来の正規表現による抽出（フィールドごとにHTML全体を検索）と
+src.amazon_page_parser の1パス抽出を、fixtureのページを実際のサイズ
+（数百KB）まで水増しして比較する。
+
+    python -m benchmarks.bench_amazon_parser [--repeat 200] [--pages DIR]
+"""
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+
+from src.amazon_page_parser import AmazonProductFields, parse_product_page
+
+FIXTURE = Path(__file__).parent.parent / "tests" / "fixtures" / "amazon_product.html"
+
+# 実際の商品ページに含まれるスクリプト・推薦枠などの代わり
+FILLER = (
+    '<div class="a-section a-spacing-none"><script type="text/javascript">'
+    'P.when("A").execute(function(A){A.state("widget",{"asin":"B000000000","price":1234});});'
+    '</script><span class="a-size-base">関連商品 おすすめ</span></div>\n'
+)
+
+
+def legacy_parse(html: str) -> AmazonProductFields:
+    """リファクタリング前の抽出処理（比較用）"""
+    fields = AmazonProductFields()
+
+    title_match = re.search(r'<span id="productTitle"[^>]*>([^<]+)</span>', html)
+    if title_match:
+        fields.title = title_match.group(1).strip()
+
+    author_match = re.search(r'<span class="author notFaded"[^>]*>.*?<a[^>]*>([^<]+)</a>', html, re.DOTALL)
+    if author_match:
+        fields.authors = [author_match.group(1).strip()]
+
+    publisher_match = re.search(r'出版社[^:]*:\s*([^(;]+)', html)
+    if publisher_match:
+        fields.publisher = publisher_match.group(1).strip()
+
+    date_match = re.search(r'発売日[^:]*:\s*(\d{4})/(\d{1,2})/(\d{1,2})', html)
+    if date_match:
+        year, month, day = date_match.groups()
+        fields.published_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+    page_match = re.search(r'(\d+)ページ', html)
+    if page_match:
+        fields.page_count = int(page_match.group(1))
+
+    cover_url = None
+    img_match = re.search(r'<img[^>]*id="landingImage"[^>]*src="([^"]+)"', html)
+    if img_match:
+        cover_url = img_match.group(1)
+    if not cover_url:
+        img_match = re.search(r'<div[^>]*id="imgTagWrapperId"[^>]*>.*?<img[^>]*src="([^"]+)"', html, re.DOTALL)
+        if img_match:
+            cover_url = img_match.group(1)
+    if not cover_url:
+        img_match = re.search(r'<img[^>]*id="ebooksImg"[^>]*src="([^"]+)"', html)
+        if img_match:
+            cover_url = img_match.group(1)
+    if not cover_url:
+        img_match = re.search(r'https://m\.media-amazon\.com/images/I/[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+\.jpg', html)
+        if img_match:
+            cover_url = img_match.group(0)
+    if cover_url:
+        cover_url = re.sub(r'\._[A-Z0-9_]+_', '._SL500_', cover_url)
+    fields.cover_image_url = cover_url
+
+    desc_match = re.search(r'<div[^>]*id="bookDescription_feature_div"[^>]*>.*?<span[^>]*>([^<]+)</span>', html, re.DOTALL)
+    if desc_match:
+        fields.description = desc_match.group(1).strip()
+
+    return fields
+
+
+def inflate(html: str, target_bytes: int) -> str:
+    """<body>の前後にフィラーを入れて実際のページに近いサイズにする"""
+    filler_count = max(0, (target_bytes - len(html.encode("utf-8"))) // len(FILLER.encode("utf-8")))
+    head = FILLER * (filler_count // 4)
+    tail = FILLER * (filler_count - filler_count // 4)
+    body = html.index("<body>") + len("<body>")
+    end = html.index("</body>")
+    return html[:body] + head + html[body:end] + tail + html[end:]
+
+
+def measure(fn, html: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--size", type=int, default=400_000, help="水増し後のページサイズ（バイト）")
+    parser.add_argument("--pages", type=Path, help="保存した商品ページ（*.html）のディレクトリ")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = {path.name: path.read_text(encoding="utf-8") for path in sorted(args.pages.glob("*.html"))}
+    else:
+        pages = {FIXTURE.name: inflate(FIXTURE.read_text(encoding="utf-8"), args.size)}
+
+    print(f"{'page':<32} {'KB':>6} {'legacy p50':>11} {'new p50':>9} {'speedup':>8}  same")
+    for name, html in pages.items():
+        legacy_p50, _ = measure(legacy_parse, html, args.repeat)
+        new_p50, _ = measure(parse_product_page, html, args.repeat)
+        same = legacy_parse(html) == parse_product_page(html)
+        print(
+            f"{name:<32} {len(html.encode('utf-8')) // 1024:>6} "
+            f"{legacy_p50:>9.3f}ms {new_p50:>7.3f}ms {legacy_p50 / new_p50:>7.1f}x  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
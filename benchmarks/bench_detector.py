@@ -0,0 +1,282 @@
+"""ISBNDetector のベンチマーク
+
+ネットワークを使わずに EAN-13 バーコード画像を生成し、劣化（ぼかし・回転・
+低コントラスト・ノイズ・縮小拡大・JPEG圧縮）を加えた画像で
+検出の成功率・レイテンシ（p50/p95/p99）・メモリを測る。メモリは tracemalloc で
+追跡できる Python/NumPy 側の確保量のピークで、OpenCV 内部の確保は含まない。tracemalloc は
+処理を遅くするので、メモリは時間を測るのとは別にもう一度実行して測る。乱数は --seed で固定されるので、
+preprocess_image などを変更した前後で同じ画像を比較できる。
+
+    python -m benchmarks.bench_detector [--count 20] [--conditions clean,blur-3] [--json out.json]
+
+strategies:
+    detect        ISBNDetector().detect（既定の設定）
+    no-localize   候補領域の切り出しなし
+    exhaustive    全ステージを試す
+    stage:<name>  画像全体に1つの前処理ステージだけを適用（前処理と読み取りの時間を分けて測る）
+"""
+import argparse
+import json
+import resource
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.isbn_detector import ISBNDetector
+
+# EAN-13 の符号化表（左側の奇数パリティ L。G は R を反転、R は L を反転したもの）
+_L_CODES = ["0001101", "0011001", "0010011", "0111101", "0100011",
+            "0110001", "0101111", "0111011", "0110111", "0001011"]
+_R_CODES = ["".join("1" if bit == "0" else "0" for bit in code) for code in _L_CODES]
+_G_CODES = [code[::-1] for code in _R_CODES]
+# 先頭の数字ごとの左側6桁のパリティ
+_PARITY = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG",
+           "LGGLLG", "LGGGLG", "LGLGLG", "LGLGGL", "LGGLGL"]
+
+
+def random_isbn13(rng: np.random.Generator) -> str:
+    body = "978" + "".join(str(d) for d in rng.integers(0, 10, size=9))
+    checksum = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(body))
+    return body + str((10 - checksum % 10) % 10)
+
+
+def ean13_modules(code: str) -> str:
+    """EAN-13 のバーの並び（1が黒）。ガードを含めて95モジュール"""
+    first, left, right = int(code[0]), code[1:7], code[7:]
+    bars = "101"
+    for digit, parity in zip(left, _PARITY[first]):
+        table = _L_CODES if parity == "L" else _G_CODES
+        bars += table[int(digit)]
+    bars += "01010"
+    for digit in right:
+        bars += _R_CODES[int(digit)]
+    return bars + "101"
+
+
+def render_barcode(code: str, module: int = 3, height: int = 120, quiet: int = 11) -> np.ndarray:
+    """白地に黒いバーのグレースケール画像（クワイエットゾーン付き）"""
+    row = np.array([0 if bit == "1" else 255 for bit in ean13_modules(code)], dtype=np.uint8)
+    row = np.pad(row, quiet, constant_values=255)
+    row = np.repeat(row, module)
+    image = np.tile(row, (height, 1))
+    return np.pad(image, ((quiet * module // 2, quiet * module // 2), (0, 0)), constant_values=255)
+
+
+def render_scene(code: str, rng: np.random.Generator, size: Tuple[int, int] = (960, 720)) -> np.ndarray:
+    """本の裏表紙を撮影したような画像（RGB）。背景に模様を入れ、バーコードを適当な位置に置く"""
+    width, height = size
+    scene = np.full((height, width), 200, dtype=np.uint8)
+    for _ in range(12):
+        x, y = rng.integers(0, width - 40), rng.integers(0, height - 20)
+        w, h = rng.integers(20, 200), rng.integers(5, 60)
+        cv2.rectangle(scene, (int(x), int(y)), (int(x + w), int(y + h)), int(rng.integers(60, 240)), -1)
+
+    barcode = render_barcode(code, module=int(rng.integers(2, 4)))
+    bh, bw = barcode.shape
+    x = int(rng.integers(0, width - bw))
+    y = int(rng.integers(0, height - bh))
+    scene[y:y + bh, x:x + bw] = barcode
+    return cv2.cvtColor(scene, cv2.COLOR_GRAY2RGB)
+
+
+def _blur(sigma: float) -> Callable[[np.ndarray, np.random.Generator], np.ndarray]:
+    return lambda img, rng: cv2.GaussianBlur(img, (0, 0), sigma)
+
+
+def _rotate(degrees: float) -> Callable[[np.ndarray, np.random.Generator], np.ndarray]:
+    def apply(img, rng):
+        h, w = img.shape[:2]
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), degrees, 1.0)
+        return cv2.warpAffine(img, matrix, (w, h), borderValue=(200, 200, 200))
+    return apply
+
+
+def _contrast(low: int, high: int) -> Callable[[np.ndarray, np.random.Generator], np.ndarray]:
+    return lambda img, rng: (low + img.astype(np.float32) * (high - low) / 255).astype(np.uint8)
+
+
+def _noise(std: float) -> Callable[[np.ndarray, np.random.Generator], np.ndarray]:
+    return lambda img, rng: np.clip(img + rng.normal(0, std, img.shape), 0, 255).astype(np.uint8)
+
+
+def _scale(factor: float) -> Callable[[np.ndarray, np.random.Generator], np.ndarray]:
+    interpolation = cv2.INTER_AREA if factor < 1 else cv2.INTER_CUBIC
+    return lambda img, rng: cv2.resize(img, None, fx=factor, fy=factor, interpolation=interpolation)
+
+
+def _jpeg(quality: int) -> Callable[[np.ndarray, np.random.Generator], np.ndarray]:
+    def apply(img, rng):
+        _, data = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+    return apply
+
+
+CONDITIONS: Dict[str, Callable[[np.ndarray, np.random.Generator], np.ndarray]] = {
+    "clean": lambda img, rng: img,
+    "blur-1.5": _blur(1.5),
+    "blur-3": _blur(3.0),
+    "rotate-10": _rotate(10),
+    "rotate-30": _rotate(30),
+    "rotate-90": _rotate(90),
+    "contrast-low": _contrast(100, 160),
+    "noise-25": _noise(25),
+    "scale-0.5": _scale(0.5),
+    "scale-2": _scale(2.0),
+    "jpeg-15": _jpeg(15),
+}
+
+
+def build_corpus(conditions: List[str], count: int, seed: int) -> Dict[str, List[Tuple[str, np.ndarray]]]:
+    """条件ごとに (正解ISBN, 画像) のリストを作る。同じ seed なら同じ画像になる"""
+    corpus = {}
+    for index, name in enumerate(conditions):
+        rng = np.random.default_rng([seed, index])
+        images = []
+        for _ in range(count):
+            code = random_isbn13(rng)
+            images.append((code, CONDITIONS[name](render_scene(code, rng), rng)))
+        corpus[name] = images
+    return corpus
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return float(np.percentile(values, q))
+
+
+def _summary(latencies: List[float], hits: int, total: int, peak_bytes: int, **extra) -> Dict[str, float]:
+    return {
+        "success_rate": hits / total if total else 0.0,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "peak_mb": peak_bytes / (1024 * 1024),
+        **extra,
+    }
+
+
+def peak_memory(fn: Callable[[np.ndarray], object], images: List[Tuple[str, np.ndarray]]) -> int:
+    """images を fn で処理したときの tracemalloc のピーク（バイト）。時間を測る実行とは分けて呼ぶ"""
+    tracemalloc.start()
+    try:
+        for _, image in images:
+            fn(image)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_detect(detector: ISBNDetector, images: List[Tuple[str, np.ndarray]]) -> Dict[str, float]:
+    latencies, hits, stages = [], 0, []
+    for code, image in images:
+        start = time.perf_counter()
+        result = detector.detect(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += code in result.isbns
+        stages.append(len(result.stages_tried))
+    peak = peak_memory(detector.detect, images)
+    return _summary(latencies, hits, len(images), peak, stages_tried=statistics.mean(stages))
+
+
+def run_stage(
+    detector: ISBNDetector,
+    method: Optional[str],
+    images: List[Tuple[str, np.ndarray]]
+) -> Dict[str, float]:
+    """1つの前処理ステージを画像全体に適用し、前処理と読み取りの時間を別々に測る"""
+    def apply(bgr: np.ndarray) -> np.ndarray:
+        return bgr if method is None else getattr(detector, method)(bgr)
+
+    latencies, prep_times, decode_times, hits = [], [], [], 0
+    for code, image in images:
+        bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        start = time.perf_counter()
+        processed = apply(bgr)
+        prepared = time.perf_counter()
+        found = detector._decode_isbns(processed)
+        done = time.perf_counter()
+        prep_times.append((prepared - start) * 1000)
+        decode_times.append((done - prepared) * 1000)
+        latencies.append((done - start) * 1000)
+        hits += code in found
+    peak = peak_memory(
+        lambda image: detector._decode_isbns(apply(cv2.cvtColor(image, cv2.COLOR_RGB2BGR))),
+        images
+    )
+    return _summary(
+        latencies, hits, len(images), peak,
+        prep_p50_ms=_percentile(prep_times, 50),
+        prep_p95_ms=_percentile(prep_times, 95),
+        decode_p50_ms=_percentile(decode_times, 50),
+        decode_p95_ms=_percentile(decode_times, 95),
+    )
+
+
+def strategies() -> Dict[str, Callable[[List[Tuple[str, np.ndarray]]], Dict[str, float]]]:
+    detector = ISBNDetector()
+    runs = {
+        "detect": lambda images: run_detect(detector, images),
+        "no-localize": lambda images: run_detect(ISBNDetector(localize=False), images),
+        "exhaustive": lambda images: run_detect(ISBNDetector(exhaustive=True), images),
+    }
+    for name, method in ISBNDetector.STAGES:
+        runs[f"stage:{name}"] = lambda images, method=method: run_stage(detector, method, images)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20, help="条件ごとの画像数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--conditions", default=",".join(CONDITIONS), help="カンマ区切りの劣化条件")
+    parser.add_argument("--strategies", help="カンマ区切りの戦略（デフォルト: すべて）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args()
+
+    conditions = args.conditions.split(",")
+    unknown = [name for name in conditions if name not in CONDITIONS]
+    if unknown:
+        parser.error(f"unknown conditions: {', '.join(unknown)}")
+
+    runs = strategies()
+    if args.strategies:
+        runs = {name: runs[name] for name in args.strategies.split(",")}
+
+    corpus = build_corpus(conditions, args.count, args.seed)
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    print(f"{'condition':<14} {'strategy':<16} {'success':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'peak MB':>8}  detail")
+    for condition, images in corpus.items():
+        results[condition] = {}
+        for strategy, run in runs.items():
+            summary = run(images)
+            results[condition][strategy] = summary
+            detail = (
+                f"prep {summary['prep_p50_ms']:.1f}ms / decode {summary['decode_p50_ms']:.1f}ms"
+                if "prep_p50_ms" in summary else f"stages {summary['stages_tried']:.1f}"
+            )
+            print(
+                f"{condition:<14} {strategy:<16} {summary['success_rate']:>7.0%} "
+                f"{summary['p50_ms']:>7.1f}ms {summary['p95_ms']:>7.1f}ms {summary['p99_ms']:>7.1f}ms "
+                f"{summary['peak_mb']:>8.1f}  {detail}"
+            )
+
+    # Linux では KB 単位
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"max RSS: {max_rss_mb:.0f} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"seed": args.seed, "count": args.count, "max_rss_mb": max_rss_mb, "results": results},
+                f, indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
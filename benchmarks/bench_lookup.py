@@ -0,0 +1,208 @@
+"""書籍情報検索（BookAPIClient.get_book_info）のベンチマーク
+
+benchmarks.mock_services のローカルサーバーに向けて、同じISBNの集合を
+いくつかの実行方法で検索し、スループットとレイテンシ（p50/p95/p99）を比べる。
+本物のサービスには一切アクセスしない。
+
+    python -m benchmarks.bench_lookup [--count 100] [--latency 0.05] [--rate-limit-rate 0.02]
+
+modes:
+    sequential   concurrent=False のクライアントで1件ずつ検索（Amazon → Google → openBD の順）
+    concurrent   concurrent=True のクライアントで1件ずつ検索（3ソースに同時に問い合わせ）
+    threads      concurrent=True のクライアントを --workers 個のスレッドで共有して検索
+    async        AsyncBookAPIClient で --workers 件ずつ同時に検索
+    notion       見つかった書籍を NotionClient.add_books_to_database で登録（--workers 並列）
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.mock_services import MockBookServices, MockConfig
+from src.book_api_client import AsyncBookAPIClient, BookAPIClient
+from src.http_session import create_async_client, create_session
+from src.notion_client import NotionClient
+from src.notion_index import NotionISBNIndex
+from src.openbd_client import BookInfo
+from src.rate_limiter import RateLimiter
+
+MODES = ["sequential", "concurrent", "threads", "async", "notion"]
+
+DATABASE_ID = "0123456789abcdef0123456789abcdef"
+
+
+def random_isbns(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    isbns = []
+    for _ in range(count):
+        body = "9784" + "".join(str(rng.randrange(10)) for _ in range(8))
+        checksum = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(body))
+        isbns.append(body + str((10 - checksum % 10) % 10))
+    return isbns
+
+
+def make_limiter(rate: Optional[float]) -> RateLimiter:
+    """モックサーバー向けのレート制限。None の場合は制限しない"""
+    if rate is None:
+        return RateLimiter(host_limits={}, default_limit=(1e9, 10 ** 9))
+    return RateLimiter(host_limits={}, default_limit=(rate, max(1, int(rate))))
+
+
+def timed(fn: Callable[[], object], latencies: List[float]) -> object:
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run_sync(client: BookAPIClient, isbns: List[str], workers: int, latencies: List[float]) -> List[Optional[BookInfo]]:
+    lookup = lambda isbn: timed(lambda: client.get_book_info(isbn), latencies)
+    if workers <= 1:
+        return [lookup(isbn) for isbn in isbns]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lookup, isbns))
+
+
+def run_async(client: AsyncBookAPIClient, isbns: List[str], workers: int, latencies: List[float]) -> List[Optional[BookInfo]]:
+    async def lookup(semaphore: asyncio.Semaphore, isbn: str) -> Optional[BookInfo]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                return await client.get_book_info(isbn)
+            finally:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    async def run() -> List[Optional[BookInfo]]:
+        semaphore = asyncio.Semaphore(workers)
+        try:
+            return await asyncio.gather(*(lookup(semaphore, isbn) for isbn in isbns))
+        finally:
+            await client.client.aclose()
+
+    return asyncio.run(run())
+
+
+def run_notion(services: MockBookServices, books: List[BookInfo], workers: int, limiter: RateLimiter,
+               latencies: List[float]) -> List[object]:
+    with tempfile.TemporaryDirectory() as tmp:
+        notion = NotionClient(
+            "token",
+            session=create_session(pool_maxsize=max(10, workers), rate_limiter=limiter),
+            index=NotionISBNIndex(os.path.join(tmp, "index.sqlite3")),
+            base_url=services.notion_base_url
+        )
+        # 1件ごとのレイテンシを測るため、add_books_to_database と同じ並列度で1件ずつ呼ぶ
+        def push(book: BookInfo):
+            return timed(lambda: notion.add_book_to_database(DATABASE_ID, book, on_existing="update"), latencies)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(push, books))
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, found: int, total: int) -> Dict[str, float]:
+    values = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        "mode": name,
+        "total": total,
+        "found": found,
+        "elapsed_s": elapsed,
+        "throughput": total / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100, help="検索するISBNの数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=8, help="threads / async / notion の同時実行数")
+    parser.add_argument("--modes", default=",".join(MODES), help="カンマ区切りの実行方法")
+    parser.add_argument("--latency", type=float, default=0.05, help="モックサーバーの1リクエストあたりの遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 を返す割合")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 を返す割合")
+    parser.add_argument("--amazon-hit-rate", type=float, default=0.7, help="Amazonで見つかるISBNの割合")
+    parser.add_argument("--client-rate", type=float,
+                        help="クライアント側のレート制限（1秒あたりのリクエスト数。デフォルト: 制限なし）")
+    parser.add_argument("--verbose", action="store_true", help="クライアントのデバッグログを表示する")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    modes = args.modes.split(",")
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)}")
+
+    config = MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        amazon_hit_rate=args.amazon_hit_rate,
+        seed=args.seed
+    )
+    isbns = random_isbns(args.count, args.seed)
+
+    results = []
+    books: List[BookInfo] = []
+    with MockBookServices(config) as services:
+        print(f"mock server: {services.url}  latency={args.latency}s  errors={args.error_rate:.0%}  "
+              f"429={args.rate_limit_rate:.0%}  ISBNs={len(isbns)}")
+        print(f"{'mode':<12} {'found':>9} {'elapsed':>9} {'lookups/s':>10} {'p50':>9} {'p95':>9} {'p99':>9}  requests")
+
+        for mode in modes:
+            if mode == "notion" and not books:
+                print("notion: 登録する書籍がありません（先に検索の mode を実行してください）")
+                continue
+
+            limiter = make_limiter(args.client_rate)
+            latencies: List[float] = []
+            services.requests.clear()
+
+            start = time.perf_counter()
+            if mode == "async":
+                client = AsyncBookAPIClient(
+                    client=create_async_client(rate_limiter=limiter),
+                    base_urls=services.base_urls
+                )
+                found = run_async(client, isbns, args.workers, latencies)
+            elif mode == "notion":
+                found = run_notion(services, books, args.workers, limiter, latencies)
+            else:
+                client = BookAPIClient(
+                    concurrent=mode != "sequential",
+                    session=create_session(pool_maxsize=max(10, args.workers * 3), rate_limiter=limiter),
+                    base_urls=services.base_urls
+                )
+                found = run_sync(client, isbns, args.workers if mode == "threads" else 1, latencies)
+            elapsed = time.perf_counter() - start
+
+            if mode == "notion":
+                hits = sum(1 for _, error in found if error is None)
+            else:
+                hits = sum(1 for book in found if book)
+                books = books or [book for book in found if book]
+
+            summary = summarize(mode, latencies, elapsed, hits, len(found))
+            results.append(summary)
+            requests_by_route = ", ".join(f"{route}={n}" for route, n in sorted(services.requests.items()))
+            print(
+                f"{mode:<12} {hits:>4}/{len(found):<4} {elapsed:>8.2f}s {summary['throughput']:>10.1f} "
+                f"{summary['p50_ms']:>7.1f}ms {summary['p95_ms']:>7.1f}ms {summary['p99_ms']:>7.1f}ms  {requests_by_route}"
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
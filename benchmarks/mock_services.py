@@ -0,0 +1,338 @@
+"""openBD・Google Books・Amazon・Notion のローカル代替サーバー
+
+tests/fixtures のレスポンスを元に、ISBNごとにレスポンスを組み立てて返す。
+遅延・エラー率・429 の割合を指定できるので、本物のサービスに負荷をかけずに
+BookAPIClient や NotionClient の検索経路を計測できる。
+
+    with MockBookServices(MockConfig(latency=0.05, rate_limit_rate=0.02)) as services:
+        client = BookAPIClient(base_urls=services.base_urls)
+        client.get_book_info("9784873115658")
+
+単体で起動する場合:
+
+    python -m benchmarks.mock_services [--port 8765] [--latency 0.05]
+"""
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+
+# レスポンスに含める画像のダミー（ImageURLValidator が有効と判定するサイズ）
+COVER_BYTES = b"\xff\xd8\xff\xe0" + b"\0" * 2044
+
+NOTION_SCHEMA = {
+    "properties": {
+        "Name": {"type": "title"},
+        "ISBN": {"type": "rich_text"},
+        "Author": {"type": "rich_text"},
+        "Publisher": {"type": "rich_text"},
+        "Published": {"type": "date"},
+        "Pages": {"type": "number"},
+        "Cover": {"type": "files"},
+        "Description": {"type": "rich_text"},
+    }
+}
+
+
+@dataclass
+class MockConfig:
+    # 1リクエストあたりの遅延（秒）。latency ± jitter の一様分布
+    latency: float = 0.05
+    jitter: float = 0.02
+    # 500 を返す割合
+    error_rate: float = 0.0
+    # 429 を返す割合
+    rate_limit_rate: float = 0.0
+    # 429 に付ける Retry-After（秒）
+    retry_after: int = 1
+    # Amazon の商品ページがあるISBNの割合（残りは Google Books / openBD にフォールバックする）
+    amazon_hit_rate: float = 0.7
+    # どのサービスにも登録されていないISBNの割合
+    not_found_rate: float = 0.05
+    # Google Books の結果にページ数が含まれる割合（含まれない場合は openBD で補完される）
+    google_page_count_rate: float = 0.5
+    seed: int = 0
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    # 既定の5では同時接続が多いと接続待ちがあふれ、SYNの再送（約1秒）がレイテンシに混ざる
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class MockBookServices:
+    """ThreadingHTTPServer で4つのサービスを1つのポートにまとめて提供する
+
+    パスの先頭でサービスを振り分ける:
+        /openbd/v1/get, /google/books/v1/volumes, /amazon/dp/<isbn>, /amazon/s,
+        /amazon-images/images/P/<isbn>..., /covers/<name>, /notion/v1/...
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self.requests: Counter = Counter()
+        self.notion_pages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._fixtures = json.loads((FIXTURES / "mock_responses.json").read_text(encoding="utf-8"))
+        self._amazon_html = (FIXTURES / "amazon_product.html").read_text(encoding="utf-8")
+        self._server = _MockHTTPServer((host, port), _make_handler(self))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_urls(self) -> Dict[str, str]:
+        """BookAPIClient の base_urls に渡す辞書"""
+        return {
+            "openbd": f"{self.url}/openbd/v1",
+            "google": f"{self.url}/google/books/v1/volumes",
+            "amazon": f"{self.url}/amazon",
+            "amazon_images": f"{self.url}/amazon-images",
+        }
+
+    @property
+    def notion_base_url(self) -> str:
+        return f"{self.url}/notion/v1"
+
+    def start(self) -> "MockBookServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """現在のスレッドでサーバーを動かす（Ctrl-C で停止）"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockBookServices":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _known(self, isbn: str, rate: float, salt: str) -> bool:
+        """ISBNごとに決まった結果にするため、乱数ではなくハッシュで判定する"""
+        value = zlib.crc32(f"{self.config.seed}:{salt}:{isbn}".encode()) / 2 ** 32
+        return value < rate
+
+    def _exists(self, isbn: str) -> bool:
+        return not self._known(isbn, self.config.not_found_rate, "missing")
+
+    def _fault(self) -> Optional[int]:
+        """遅延を入れ、設定した割合で 429 / 500 を返す"""
+        config = self.config
+        with self._lock:
+            delay = max(0.0, config.latency + self._random.uniform(-config.jitter, config.jitter))
+            roll = self._random.random()
+        time.sleep(delay)
+        if roll < config.rate_limit_rate:
+            return 429
+        if roll < config.rate_limit_rate + config.error_rate:
+            return 500
+        return None
+
+    def _count(self, route: str) -> None:
+        with self._lock:
+            self.requests[route] += 1
+
+    def handle(self, method: str, target: str, body: Optional[Dict[str, Any]]) -> Tuple[int, str, bytes]:
+        """(ステータス, Content-Type, 本文) を返す"""
+        parts = urlsplit(target)
+        path = parts.path
+        query = parse_qs(parts.query)
+
+        route = path.split("/")[1] if path.count("/") >= 1 else ""
+        self._count(route)
+
+        if route in ("covers", "amazon-images"):
+            return 200, "image/jpeg", COVER_BYTES
+
+        status = self._fault()
+        if status is not None:
+            return status, "application/json", json.dumps({"error": status}).encode()
+
+        if path == "/openbd/v1/get":
+            isbns = query.get("isbn", [""])[0].split(",")
+            return self._json([self._openbd_record(isbn) for isbn in isbns])
+
+        if path == "/google/books/v1/volumes":
+            isbn = query.get("q", [""])[0].replace("isbn:", "")
+            return self._json(self._google_volumes(isbn))
+
+        if path.startswith("/amazon/dp/"):
+            isbn = path.rsplit("/", 1)[1]
+            if not self._exists(isbn) or not self._known(isbn, self.config.amazon_hit_rate, "amazon"):
+                return 404, "text/html", b"<html><body>Not Found</body></html>"
+            return 200, "text/html; charset=utf-8", self._amazon_page(isbn).encode("utf-8")
+
+        if path == "/amazon/s":
+            return 200, "text/html; charset=utf-8", self._amazon_search().encode("utf-8")
+
+        if path.startswith("/notion/v1/"):
+            return self._notion(method, path[len("/notion/v1/"):], body or {})
+
+        return 404, "application/json", b'{"error": "not found"}'
+
+    def _json(self, data: Any, status: int = 200) -> Tuple[int, str, bytes]:
+        return status, "application/json", json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def _openbd_record(self, isbn: str) -> Optional[Dict[str, Any]]:
+        if not self._exists(isbn):
+            return None
+        record = copy.deepcopy(self._fixtures["openbd_success"][0])
+        record["summary"]["isbn"] = isbn
+        record["summary"]["cover"] = f"{self.url}/covers/{isbn}.jpg"
+        return record
+
+    def _google_volumes(self, isbn: str) -> Dict[str, Any]:
+        if not self._exists(isbn):
+            return self._fixtures["google_books_not_found"]
+        data = copy.deepcopy(self._fixtures["google_books_success"])
+        volume = data["items"][0]["volumeInfo"]
+        volume["industryIdentifiers"] = [{"type": "ISBN_13", "identifier": isbn}]
+        volume["imageLinks"] = {"thumbnail": f"{self.url}/covers/google-{isbn}.jpg"}
+        if not self._known(isbn, self.config.google_page_count_rate, "pages"):
+            volume.pop("pageCount", None)
+        return data
+
+    def _amazon_page(self, isbn: str) -> str:
+        return (
+            self._amazon_html
+            .replace("978-4873115658", f"{isbn[:3]}-{isbn[3:]}")
+            .replace("https://m.media-amazon.com", f"{self.url}/amazon-images")
+        )
+
+    def _amazon_search(self) -> str:
+        return (
+            '<html><body><div class="s-result-list">'
+            '<div data-asin="" class="s-result-item"></div>'
+            '<div data-asin="9784873115658" class="s-result-item"></div>'
+            '</div></body></html>'
+        )
+
+    def _notion(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, str, bytes]:
+        segments = path.split("/")
+
+        if segments[0] == "databases" and len(segments) == 2 and method == "GET":
+            return self._json(NOTION_SCHEMA)
+
+        if segments[0] == "databases" and len(segments) == 3 and segments[2] == "query":
+            with self._lock:
+                pages = list(self.notion_pages.values())
+            return self._json({"results": pages, "has_more": False, "next_cursor": None})
+
+        if segments == ["pages"] and method == "POST":
+            page = {"id": str(uuid.uuid4()), "properties": body.get("properties", {})}
+            with self._lock:
+                self.notion_pages[page["id"]] = self._stored_page(page)
+            return self._json(page)
+
+        if segments[0] == "pages" and len(segments) == 2 and method == "PATCH":
+            page_id = segments[1]
+            with self._lock:
+                if page_id not in self.notion_pages:
+                    return self._json({"object": "error", "status": 404}, status=404)
+                page = {"id": page_id, "properties": body.get("properties", {})}
+                self.notion_pages[page_id] = self._stored_page(page)
+            return self._json(page)
+
+        return self._json({"object": "error", "status": 404}, status=404)
+
+    @staticmethod
+    def _stored_page(page: Dict[str, Any]) -> Dict[str, Any]:
+        """query で返すときのために rich_text に plain_text を付ける"""
+        stored = copy.deepcopy(page)
+        for prop in stored["properties"].values():
+            for part in prop.get("rich_text", []):
+                part.setdefault("plain_text", part.get("text", {}).get("content", ""))
+        return stored
+
+
+def _make_handler(services: MockBookServices):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, method: str) -> None:
+            body = None
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                body = json.loads(self.rfile.read(length) or b"null")
+
+            status, content_type, payload = services.handle(method, self.path, body)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            if status == 429:
+                self.send_header("Retry-After", str(services.config.retry_after))
+            self.end_headers()
+            if method != "HEAD":
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # streaming のクライアントは必要な部分を読んだ時点で接続を閉じる
+                    self.close_connection = True
+
+        def do_GET(self):
+            self._respond("GET")
+
+        def do_HEAD(self):
+            self._respond("HEAD")
+
+        def do_POST(self):
+            self._respond("POST")
+
+        def do_PATCH(self):
+            self._respond("PATCH")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="1リクエストあたりの遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 を返す割合")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 を返す割合")
+    args = parser.parse_args()
+
+    config = MockConfig(latency=args.latency, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    services = MockBookServices(config, host=args.host, port=args.port)
+    print(f"listening on {services.url}")
+    for name, url in {**services.base_urls, "notion": services.notion_base_url}.items():
+        print(f"  {name:<14} {url}")
+    try:
+        services.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,96 @@
-from typing import Optional, List
+from typing import Optional, Tuple, Union
+import codecs
+import logging
+import time
+import httpx
 import requests
-import re
 from urllib.parse import quote
 from src.openbd_client import BookInfo
+from src.amazon_page_parser import (
+    AmazonProductFields, ProductPageScanner, SearchPageScanner, parse_product_page
+)
+from src.http_session import create_async_client, get_session
+from src.metrics import get_metrics
+
+
+logger = logging.getLogger(__name__)
+
+Scanner = Union[ProductPageScanner, SearchPageScanner]
+
+
+class _TimedScanner:
+    """scanner の feed / close にかかった時間を合計する（ダウンロード時間と解析時間を分けて記録するため）"""
+
+    def __init__(self, scanner: Scanner):
+        self.scanner = scanner
+        self.seconds = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return self.scanner.complete
+
+    def feed(self, text: str) -> None:
+        started = time.perf_counter()
+        self.scanner.feed(text)
+        self.seconds += time.perf_counter() - started
+
+    def close(self) -> None:
+        started = time.perf_counter()
+        self.scanner.close()
+        self.seconds += time.perf_counter() - started
+
+    @property
+    def page(self) -> str:
+        return "product" if isinstance(self.scanner, ProductPageScanner) else "search"
 
 
 class AmazonCoverClient:
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept-Language': 'ja-JP,ja;q=0.9',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+    }
+
+    BASE_URL = "https://www.amazon.co.jp"
+    IMAGE_BASE_URL = "https://images-na.ssl-images-amazon.com"
+
+    CHUNK_SIZE = 16 * 1024
+    # streaming時に揃うまで読み続けるフィールド。出版社・発売日・説明は Google Books / openBD で補えるので待たない
+    REQUIRED_FIELDS = ("title", "authors", "page_count", "cover_image_url")
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float = 15,
+        streaming: bool = True,
+        max_bytes: int = 2 * 1024 * 1024,
+        required_fields: Optional[Tuple[str, ...]] = None,
+        base_url: Optional[str] = None,
+        image_base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            session: 使用するHTTPセッション（デフォルト: 共有セッション）
+            timeout: タイムアウト（秒）
+            streaming: Trueの場合、ページを少しずつ読み、必要な情報が揃った時点で接続を閉じる
+            max_bytes: streaming時に読み込む最大バイト数
+            required_fields: streaming時に揃うまで読み続けるフィールド（AmazonProductFields の属性名。
+                デフォルト: REQUIRED_FIELDS）
+            base_url: 商品ページ・検索ページのベースURL（デフォルト: BASE_URL）
+            image_base_url: ISBNから表紙画像を引くときのベースURL（デフォルト: IMAGE_BASE_URL）
+        """
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.streaming = streaming
+        self.max_bytes = max_bytes
+        self.required_fields = required_fields or self.REQUIRED_FIELDS
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.image_base_url = (image_base_url or self.IMAGE_BASE_URL).rstrip("/")
+
     def get_cover_url_by_isbn(self, isbn: str) -> Optional[str]:
         try:
-            url = f"https://images-na.ssl-images-amazon.com/images/P/{isbn}.09.LZZZZZZZ.jpg"
-            response = requests.head(url, timeout=5)
+            url = f"{self.image_base_url}/images/P/{isbn}.09.LZZZZZZZ.jpg"
+            response = self.session.head(url, timeout=min(5, self.timeout))
             if response.status_code == 200:
                 return url
         except Exception:
@@ -22,13 +103,13 @@ class AmazonCoverClient:
             if author:
                 search_query = f"{title} {author}"
 
-            search_url = f"https://www.amazon.co.jp/s?k={quote(search_query)}&i=stripbooks"
+            search_url = f"{self.base_url}/s?k={quote(search_query)}&i=stripbooks"
 
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
 
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = self.session.get(search_url, headers=headers, timeout=self.timeout)
             if response.status_code != 200:
                 return None
 
@@ -49,167 +130,234 @@ class AmazonCoverClient:
     def get_book_info_by_title(self, title: str, author: Optional[str] = None, isbn: Optional[str] = None) -> Optional[BookInfo]:
         """タイトル名でAmazonを検索して書籍情報を取得"""
         try:
-            # 検索クエリの構築
-            search_query = title
-            if author:
-                search_query = f"{title} {author}"
-
-            search_url = f"https://www.amazon.co.jp/s?k={quote(search_query)}&i=stripbooks"
-            print(f"[DEBUG Amazon Title Search] Searching: {search_query}")
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept-Language': 'ja-JP,ja;q=0.9',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-            }
+            search_url = self._build_search_url(title, author)
 
-            response = requests.get(search_url, headers=headers, timeout=15)
-            if response.status_code != 200:
-                print(f"[DEBUG Amazon Title Search] Search failed: {response.status_code}")
+            scanner = SearchPageScanner()
+            status_code = self._fetch(search_url, scanner)
+            if status_code != 200:
+                logger.debug("Amazon title search failed: %s", status_code)
                 return None
 
-            html = response.text
-
-            # 書籍の商品のみを取得（data-asinとs-result-itemを持つもの）
-            # 書籍のASINは通常ISBNと同じ13桁（978...）または10桁
-            asin_pattern = r'data-asin="((?:978[0-9]{10}|[0-9]{10}))"'
-            asin_matches = re.findall(asin_pattern, html)
-
-            if not asin_matches:
-                print(f"[DEBUG Amazon Title Search] No book ASIN found in search results")
+            asin = self._found_asin(scanner.asin)
+            if not asin:
                 return None
 
-            # 最初の書籍のASINを使用
-            asin = asin_matches[0]
-            print(f"[DEBUG Amazon Title Search] Found book ASIN: {asin}")
-
             # 商品ページから詳細情報を取得
-            return self._get_book_info_from_url(f"https://www.amazon.co.jp/dp/{asin}", isbn or asin)
+            return self._get_book_info_from_url(f"{self.base_url}/dp/{asin}", isbn or asin)
 
         except Exception as e:
-            print(f"[DEBUG Amazon Title Search] Exception: {str(e)}")
+            logger.debug("Amazon title search failed: %s", e)
+            return None
+
+    def _build_search_url(self, title: str, author: Optional[str] = None) -> str:
+        # 検索クエリの構築
+        search_query = title
+        if author:
+            search_query = f"{title} {author}"
+
+        logger.debug("Amazon title search: %s", search_query)
+        return f"{self.base_url}/s?k={quote(search_query)}&i=stripbooks"
+
+    def _found_asin(self, asin: Optional[str]) -> Optional[str]:
+        # 書籍のASINは通常ISBNと同じ13桁（978...）または10桁
+        if not asin:
+            logger.debug("Amazon title search: no book ASIN found in search results")
             return None
 
+        logger.debug("Amazon title search: found book ASIN %s", asin)
+        return asin
+
     def _get_book_info_from_url(self, url: str, isbn: str) -> Optional[BookInfo]:
         """Amazon商品ページURLから書籍情報を取得"""
         try:
-            print(f"[DEBUG Amazon] Fetching {url}")
+            logger.debug("Amazon: fetching %s", url)
 
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept-Language': 'ja-JP,ja;q=0.9',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-            }
+            scanner = ProductPageScanner(self.required_fields)
+            status_code = self._fetch(url, scanner)
+            logger.debug("Amazon: status code %s", status_code)
+            if status_code != 200:
+                return None
+
+            return self._book_from_fields(scanner.fields(), isbn)
+
+        except Exception:
+            logger.debug("Amazon: failed to fetch %s", url, exc_info=True)
+
+        return None
 
-            response = requests.get(url, headers=headers, timeout=15)
-            print(f"[DEBUG Amazon] Status code: {response.status_code}")
+    def _fetch(self, url: str, scanner: Scanner) -> int:
+        """ページを取得して scanner に渡し、ステータスコードを返す
+
+        streaming時は scanner が complete になるか max_bytes に達した時点で読むのをやめて接続を閉じる。
+        """
+        timed = _TimedScanner(scanner)
+        metrics = get_metrics()
+        with metrics.timer("amazon_fetch_seconds", page=timed.page):
+            status_code = self._download(url, timed)
+        metrics.observe("amazon_parse_seconds", timed.seconds, page=timed.page)
+        return status_code
+
+    def _download(self, url: str, scanner: _TimedScanner) -> int:
+        if not self.streaming:
+            response = self.session.get(url, headers=self.HEADERS, timeout=self.timeout)
+            if response.status_code == 200:
+                scanner.feed(response.text)
+                scanner.close()
+            return response.status_code
+
+        with self.session.get(url, headers=self.HEADERS, timeout=self.timeout, stream=True) as response:
             if response.status_code != 200:
-                return None
+                return response.status_code
+
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            received = 0
+            for chunk in response.iter_content(self.CHUNK_SIZE):
+                received += len(chunk)
+                scanner.feed(decoder.decode(chunk))
+                if scanner.complete or received >= self.max_bytes:
+                    break
+            else:
+                scanner.feed(decoder.decode(b'', final=True))
 
-            html = response.text
+            scanner.close()
+            logger.debug("Amazon: read %d bytes", received)
+            return response.status_code
 
-            # タイトル取得
-            title = None
-            title_match = re.search(r'<span id="productTitle"[^>]*>([^<]+)</span>', html)
-            if title_match:
-                title = title_match.group(1).strip()
-
-            # 著者取得
-            authors = None
-            author_match = re.search(r'<span class="author notFaded"[^>]*>.*?<a[^>]*>([^<]+)</a>', html, re.DOTALL)
-            if author_match:
-                authors = [author_match.group(1).strip()]
-
-            # 出版社取得
-            publisher = None
-            publisher_match = re.search(r'出版社[^:]*:\s*([^(;]+)', html)
-            if publisher_match:
-                publisher = publisher_match.group(1).strip()
-
-            # 発行日取得
-            published_date = None
-            date_match = re.search(r'発売日[^:]*:\s*(\d{4})/(\d{1,2})/(\d{1,2})', html)
-            if date_match:
-                year, month, day = date_match.groups()
-                published_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-
-            # ページ数取得
-            page_count = None
-            page_match = re.search(r'(\d+)ページ', html)
-            if page_match:
-                try:
-                    page_count = int(page_match.group(1))
-                except ValueError:
-                    pass
-
-            # 表紙画像取得（複数のパターンを試す）
-            cover_url = None
-
-            # パターン1: landingImage
-            img_match = re.search(r'<img[^>]*id="landingImage"[^>]*src="([^"]+)"', html)
-            if img_match:
-                cover_url = img_match.group(1)
-
-            # パターン2: imgTagWrapper内の画像
-            if not cover_url:
-                img_match = re.search(r'<div[^>]*id="imgTagWrapperId"[^>]*>.*?<img[^>]*src="([^"]+)"', html, re.DOTALL)
-                if img_match:
-                    cover_url = img_match.group(1)
-
-            # パターン3: ebooksImg
-            if not cover_url:
-                img_match = re.search(r'<img[^>]*id="ebooksImg"[^>]*src="([^"]+)"', html)
-                if img_match:
-                    cover_url = img_match.group(1)
-
-            # パターン4: Amazon画像URLの一般的なパターン
-            if not cover_url:
-                img_match = re.search(r'https://m\.media-amazon\.com/images/I/[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+\.jpg', html)
-                if img_match:
-                    cover_url = img_match.group(0)
-
-            # 高解像度画像に変更
-            if cover_url:
-                cover_url = re.sub(r'\._[A-Z0-9_]+_', '._SL500_', cover_url)
-
-            # 説明取得
-            description = None
-            desc_match = re.search(r'<div[^>]*id="bookDescription_feature_div"[^>]*>.*?<span[^>]*>([^<]+)</span>', html, re.DOTALL)
-            if desc_match:
-                description = desc_match.group(1).strip()
-
-            # デバッグ：取得したデータを表示
-            print(f"[DEBUG Amazon] Extracted data:")
-            print(f"  title: {title}")
-            print(f"  authors: {authors}")
-            print(f"  publisher: {publisher}")
-            print(f"  published_date: {published_date}")
-            print(f"  page_count: {page_count}")
+    def _parse_product_page(self, html: str, isbn: str) -> Optional[BookInfo]:
+        """商品ページのHTMLから書籍情報を抽出"""
+        return self._book_from_fields(parse_product_page(html), isbn)
+
+    def _book_from_fields(self, fields: AmazonProductFields, isbn: str) -> Optional[BookInfo]:
+        try:
+            logger.debug(
+                "Amazon: extracted title=%s, authors=%s, publisher=%s, published_date=%s, page_count=%s",
+                fields.title, fields.authors, fields.publisher, fields.published_date, fields.page_count
+            )
 
             # データが十分取得できた場合のみBookInfoを返す
-            if title or authors:
-                print(f"[DEBUG Amazon] Returning BookInfo with page_count={page_count}")
+            if fields.title or fields.authors:
                 return BookInfo(
                     isbn=isbn,
-                    title=title,
-                    authors=authors,
-                    publisher=publisher,
-                    published_date=published_date,
-                    page_count=page_count,
-                    description=description,
-                    cover_image_url=cover_url,
+                    title=fields.title,
+                    authors=fields.authors,
+                    publisher=fields.publisher,
+                    published_date=fields.published_date,
+                    page_count=fields.page_count,
+                    description=fields.description,
+                    cover_image_url=fields.cover_image_url,
                     source="Amazon"
                 )
             else:
-                print(f"[DEBUG Amazon] No title or authors found, returning None")
+                logger.debug("Amazon: no title or authors found")
 
-        except Exception as e:
-            print(f"[DEBUG Amazon] Exception: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.debug("Amazon: failed to build BookInfo", exc_info=True)
 
         return None
 
     def get_book_info(self, isbn: str) -> Optional[BookInfo]:
         """ISBNでAmazonの商品ページから書籍情報を取得"""
-        return self._get_book_info_from_url(f"https://www.amazon.co.jp/dp/{isbn}", isbn)
+        return self._get_book_info_from_url(f"{self.base_url}/dp/{isbn}", isbn)
+
+
+class AsyncAmazonCoverClient(AmazonCoverClient):
+    """AmazonCoverClient の asyncio 版（HTMLの解析処理は共通）"""
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 15,
+        streaming: bool = True,
+        max_bytes: int = 2 * 1024 * 1024,
+        required_fields: Optional[Tuple[str, ...]] = None,
+        base_url: Optional[str] = None,
+        image_base_url: Optional[str] = None
+    ):
+        self.client = client or create_async_client()
+        self.timeout = timeout
+        self.streaming = streaming
+        self.max_bytes = max_bytes
+        self.required_fields = required_fields or self.REQUIRED_FIELDS
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.image_base_url = (image_base_url or self.IMAGE_BASE_URL).rstrip("/")
+
+    async def get_book_info_by_title(self, title: str, author: Optional[str] = None, isbn: Optional[str] = None) -> Optional[BookInfo]:
+        """タイトル名でAmazonを検索して書籍情報を取得"""
+        try:
+            search_url = self._build_search_url(title, author)
+
+            scanner = SearchPageScanner()
+            status_code = await self._fetch(search_url, scanner)
+            if status_code != 200:
+                logger.debug("Amazon title search failed: %s", status_code)
+                return None
+
+            asin = self._found_asin(scanner.asin)
+            if not asin:
+                return None
+
+            return await self._get_book_info_from_url(f"{self.base_url}/dp/{asin}", isbn or asin)
+
+        except Exception as e:
+            logger.debug("Amazon title search failed: %s", e)
+            return None
+
+    async def _get_book_info_from_url(self, url: str, isbn: str) -> Optional[BookInfo]:
+        """Amazon商品ページURLから書籍情報を取得"""
+        try:
+            logger.debug("Amazon: fetching %s", url)
+
+            scanner = ProductPageScanner(self.required_fields)
+            status_code = await self._fetch(url, scanner)
+            logger.debug("Amazon: status code %s", status_code)
+            if status_code != 200:
+                return None
+
+            return self._book_from_fields(scanner.fields(), isbn)
+
+        except Exception:
+            logger.debug("Amazon: failed to fetch %s", url, exc_info=True)
+
+        return None
+
+    async def _fetch(self, url: str, scanner: Scanner) -> int:
+        timed = _TimedScanner(scanner)
+        metrics = get_metrics()
+        with metrics.timer("amazon_fetch_seconds", page=timed.page):
+            status_code = await self._download(url, timed)
+        metrics.observe("amazon_parse_seconds", timed.seconds, page=timed.page)
+        return status_code
+
+    async def _download(self, url: str, scanner: _TimedScanner) -> int:
+        if not self.streaming:
+            response = await self.client.get(url, headers=self.HEADERS, timeout=self.timeout)
+            if response.status_code == 200:
+                scanner.feed(response.text)
+                scanner.close()
+            return response.status_code
+
+        async with self.client.stream("GET", url, headers=self.HEADERS, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                return response.status_code
+
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            received = 0
+            finished = True
+            async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                received += len(chunk)
+                scanner.feed(decoder.decode(chunk))
+                if scanner.complete or received >= self.max_bytes:
+                    finished = False
+                    break
+            if finished:
+                scanner.feed(decoder.decode(b'', final=True))
+
+            scanner.close()
+            return response.status_code
+
+    async def get_book_info(self, isbn: str) -> Optional[BookInfo]:
+        """ISBNでAmazonの商品ページから書籍情報を取得"""
+        return await self._get_book_info_from_url(f"{self.base_url}/dp/{isbn}", isbn)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
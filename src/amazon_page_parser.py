@@ -0,0 +1,300 @@
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import re
+
+
+# 各フィールドの目印となる文字列。str.find で高速に位置を特定する
+_ANCHORS = {
+    "title": '<span id="productTitle"',
+    "author": '<span class="author notFaded"',
+    "publisher": '出版社',
+    "date": '発売日',
+    "pages": 'ページ',
+    "landing": 'id="landingImage"',
+    "wrapper": 'id="imgTagWrapperId"',
+    "ebooks": 'id="ebooksImg"',
+    "generic": 'https://m.media-amazon.com/images/I/',
+    "description": 'id="bookDescription_feature_div"',
+}
+
+# 表紙画像の目印（優先順）
+_COVER_ANCHORS = ("landing", "wrapper", "ebooks", "generic")
+
+# 目印の位置から先だけを調べるパターン
+_TITLE_RE = re.compile(r'[^>]*>([^<]+)</span>')
+_LINK_TEXT_RE = re.compile(r'<a[^>]*>([^<]+)</a>')
+_PUBLISHER_RE = re.compile(r'[^:]*:\s*([^(;]+)')
+_DATE_RE = re.compile(r'[^:]*:\s*(\d{4})/(\d{1,2})/(\d{1,2})')
+_TAG_SRC_RE = re.compile(r'[^>]*src="([^"]+)"')
+_IMG_SRC_RE = re.compile(r'<img[^>]*src="([^"]+)"')
+_GENERIC_IMG_RE = re.compile(r'https://m\.media-amazon\.com/images/I/[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+\.jpg')
+_SPAN_TEXT_RE = re.compile(r'<span[^>]*>([^<]+)</span>')
+_SIZE_SUFFIX_RE = re.compile(r'\._[A-Z0-9_]+_')
+_ASIN_RE = re.compile(r'data-asin="((?:978[0-9]{10}|[0-9]{10}))"')
+
+# 目印から後ろを探す範囲（文字数）
+SECTION_WINDOW = 10000
+
+
+@dataclass
+class AmazonProductFields:
+    title: Optional[str] = None
+    authors: Optional[List[str]] = None
+    publisher: Optional[str] = None
+    published_date: Optional[str] = None
+    page_count: Optional[int] = None
+    description: Optional[str] = None
+    cover_image_url: Optional[str] = None
+
+
+# フィールド名 → 目印。表紙画像は最優先の landingImage が見つかれば確定
+_FIELD_ANCHORS = {
+    "title": "title",
+    "authors": "author",
+    "publisher": "publisher",
+    "published_date": "date",
+    "page_count": "pages",
+    "description": "description",
+    "cover_image_url": "landing",
+}
+
+ALL_FIELDS = tuple(_FIELD_ANCHORS)
+
+
+class ProductPageScanner:
+    """HTMLを少しずつ受け取りながら書籍情報を抽出する
+
+    目印の後ろに SECTION_WINDOW 文字以上届くまでは抽出を保留するので、
+    途中で読むのをやめても、見つかった値は最後まで読んでから
+    parse_product_page した場合と同じになる。受け取ったHTMLは、まだ探している
+    目印の位置より SECTION_WINDOW 文字以上前の部分を捨てるので、ページ全体を保持しない。
+    """
+
+    def __init__(self, required_fields: Tuple[str, ...] = ALL_FIELDS):
+        """
+        Args:
+            required_fields: これらがすべて見つかれば complete になるフィールド名
+                （AmazonProductFields の属性名）
+        """
+        self.required_anchors = tuple(_FIELD_ANCHORS[name] for name in required_fields)
+        # まだ捨てていない部分のHTML。_next_pos はこの先頭からの位置
+        self._buffer = ""
+        self._found: Dict[str, Any] = {}
+        self._next_pos = {kind: 0 for kind in _ANCHORS}
+
+    def feed(self, text: str) -> None:
+        self._buffer += text
+        self._scan(final=False)
+        self._discard_scanned()
+
+    def close(self) -> None:
+        """最後まで読んだ（または読むのをやめた）ときに呼び、保留中の目印を処理する"""
+        self._scan(final=True)
+
+    @property
+    def complete(self) -> bool:
+        return all(kind in self._found for kind in self.required_anchors)
+
+    def fields(self) -> AmazonProductFields:
+        found = self._found
+        fields = AmazonProductFields(
+            title=found.get("title"),
+            publisher=found.get("publisher"),
+            published_date=found.get("date"),
+            page_count=found.get("pages"),
+            description=found.get("description"),
+        )
+        if "author" in found:
+            fields.authors = [found["author"]]
+
+        # 表紙画像は出現位置ではなく目印の優先順位で選ぶ
+        for kind in _COVER_ANCHORS:
+            if kind in found:
+                # 高解像度画像に変更
+                fields.cover_image_url = _SIZE_SUFFIX_RE.sub('._SL500_', found[kind])
+                break
+
+        return fields
+
+    def _scan(self, final: bool) -> None:
+        html = self._buffer
+        for kind, anchor in _ANCHORS.items():
+            if kind in self._found or self._cover_resolved_above(kind):
+                continue
+
+            extractor = _EXTRACTORS[kind]
+            pos = html.find(anchor, self._next_pos[kind])
+            while pos >= 0:
+                end = pos + len(anchor)
+                if not final and len(html) - end < SECTION_WINDOW:
+                    # 目印の後ろがまだ届いていない
+                    break
+                value = extractor(html, pos, end)
+                if value is not None:
+                    self._found[kind] = value
+                    break
+                pos = html.find(anchor, end)
+
+            if pos < 0:
+                # 目印がチャンクの境界をまたぐ場合に備えて少し手前から探す
+                pos = max(0, len(html) - len(anchor) + 1)
+            self._next_pos[kind] = pos
+
+    def _discard_scanned(self) -> None:
+        """まだ探している目印より前の部分を捨てる（ページ数の数字やタグの先頭を後ろ向きに読むため、
+        SECTION_WINDOW 文字は残す）"""
+        pending = [
+            pos for kind, pos in self._next_pos.items()
+            if kind not in self._found and not self._cover_resolved_above(kind)
+        ]
+        keep_from = (min(pending) if pending else len(self._buffer)) - SECTION_WINDOW
+        if keep_from <= 0:
+            return
+        self._buffer = self._buffer[keep_from:]
+        for kind in self._next_pos:
+            self._next_pos[kind] = max(0, self._next_pos[kind] - keep_from)
+
+    def _cover_resolved_above(self, kind: str) -> bool:
+        if kind not in _COVER_ANCHORS:
+            return False
+        higher = _COVER_ANCHORS[:_COVER_ANCHORS.index(kind)]
+        return any(k in self._found for k in higher)
+
+
+def parse_product_page(html: str) -> AmazonProductFields:
+    """Amazon商品ページのHTMLから書籍情報を抽出する
+
+    フィールドごとに目印の文字列を str.find で探し、目印の直後の
+    限られた範囲だけを事前コンパイルした正規表現で調べる。
+    """
+    scanner = ProductPageScanner()
+    scanner._buffer = html
+    scanner.close()
+    return scanner.fields()
+
+
+class SearchPageScanner:
+    """検索結果ページを少しずつ受け取り、最初の書籍のASINが見つかった時点で complete になる"""
+
+    def __init__(self):
+        # 前回のチャンクの末尾（属性がチャンクの境界をまたぐ場合に備えて残す）
+        self._tail = ""
+        self.asin: Optional[str] = None
+
+    def feed(self, text: str) -> None:
+        if self.asin:
+            return
+        html = self._tail + text
+        match = _ASIN_RE.search(html)
+        if match:
+            self.asin = match.group(1)
+        else:
+            self._tail = html[-32:]
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def complete(self) -> bool:
+        return self.asin is not None
+
+
+def parse_search_asin(html: str) -> Optional[str]:
+    """検索結果ページから最初の書籍のASINを取得する"""
+    match = _ASIN_RE.search(html)
+    return match.group(1) if match else None
+
+
+def _tag_start(html: str, pos: int, tag: str) -> Optional[int]:
+    """pos を含むタグが tag で始まっていればその開始位置を返す"""
+    start = html.rfind('<', 0, pos)
+    if start < 0 or not html.startswith(tag, start):
+        return None
+    if html.find('>', start, pos) >= 0:
+        return None
+    return start
+
+
+def _extract_title(html: str, start: int, end: int) -> Optional[str]:
+    m = _TITLE_RE.match(html, end, end + SECTION_WINDOW)
+    return m.group(1).strip() if m else None
+
+
+def _extract_author(html: str, start: int, end: int) -> Optional[str]:
+    tag_end = html.find('>', end)
+    if tag_end < 0:
+        return None
+    m = _LINK_TEXT_RE.search(html, tag_end + 1, tag_end + 1 + SECTION_WINDOW)
+    return m.group(1).strip() if m else None
+
+
+def _extract_publisher(html: str, start: int, end: int) -> Optional[str]:
+    m = _PUBLISHER_RE.match(html, end, end + SECTION_WINDOW)
+    return m.group(1).strip() if m else None
+
+
+def _extract_date(html: str, start: int, end: int) -> Optional[str]:
+    m = _DATE_RE.match(html, end, end + SECTION_WINDOW)
+    if not m:
+        return None
+    year, month, day = m.groups()
+    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+
+def _extract_pages(html: str, start: int, end: int) -> Optional[int]:
+    # 「ページ」の直前の数字を後ろ向きに読む
+    digits_start = start
+    while digits_start > 0 and html[digits_start - 1].isdecimal():
+        digits_start -= 1
+    if digits_start == start:
+        return None
+    try:
+        return int(html[digits_start:start])
+    except ValueError:
+        return None
+
+
+def _extract_img_src(html: str, start: int, end: int) -> Optional[str]:
+    if _tag_start(html, start, '<img') is None:
+        return None
+    m = _TAG_SRC_RE.match(html, end)
+    return m.group(1) if m else None
+
+
+def _extract_wrapper_img(html: str, start: int, end: int) -> Optional[str]:
+    if _tag_start(html, start, '<div') is None:
+        return None
+    tag_end = html.find('>', end)
+    if tag_end < 0:
+        return None
+    m = _IMG_SRC_RE.search(html, tag_end + 1, tag_end + 1 + SECTION_WINDOW)
+    return m.group(1) if m else None
+
+
+def _extract_generic_img(html: str, start: int, end: int) -> Optional[str]:
+    m = _GENERIC_IMG_RE.match(html, start)
+    return m.group(0) if m else None
+
+
+def _extract_description(html: str, start: int, end: int) -> Optional[str]:
+    if _tag_start(html, start, '<div') is None:
+        return None
+    tag_end = html.find('>', end)
+    if tag_end < 0:
+        return None
+    m = _SPAN_TEXT_RE.search(html, tag_end + 1, tag_end + 1 + SECTION_WINDOW)
+    return m.group(1).strip() if m else None
+
+
+_EXTRACTORS = {
+    "title": _extract_title,
+    "author": _extract_author,
+    "publisher": _extract_publisher,
+    "date": _extract_date,
+    "pages": _extract_pages,
+    "landing": _extract_img_src,
+    "wrapper": _extract_wrapper_img,
+    "ebooks": _extract_img_src,
+    "generic": _extract_generic_img,
+    "description": _extract_description,
+}
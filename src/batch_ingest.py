@@ -0,0 +1,353 @@
+from typing import Dict, Iterable, List, Optional, Set
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from dotenv import load_dotenv
+
+from src.book_api_client import BookAPIClient
+from src.book_cache import BookCache
+from src.isbn_detector import BatchDetectionResult, ISBNDetector
+from src.metrics import get_metrics
+from src.notion_client import NotionClient
+from src.openbd_client import BookInfo
+from src.pipeline import Pipeline, Stage
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tif", ".tiff", ".webp"}
+
+# 画像ごとの処理結果
+STATUS_OK = "ok"
+STATUS_NO_ISBN = "no_isbn"
+STATUS_NOT_FOUND = "not_found"
+STATUS_ERROR = "error"
+
+
+@dataclass
+class IngestRecord:
+    """出力ファイルの1行。1枚の画像から複数のISBNが見つかった場合はISBNごとに1行"""
+    path: str
+    status: str
+    isbn: Optional[str] = None
+    title: Optional[str] = None
+    authors: Optional[List[str]] = None
+    publisher: Optional[str] = None
+    published_date: Optional[str] = None
+    page_count: Optional[int] = None
+    description: Optional[str] = None
+    cover_image_url: Optional[str] = None
+    source: Optional[str] = None
+    notion_page_id: Optional[str] = None
+    notion_action: Optional[str] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_book(cls, path: str, book: BookInfo) -> "IngestRecord":
+        return cls(path=path, status=STATUS_OK, **asdict(book))
+
+    def to_book(self) -> BookInfo:
+        return BookInfo(**{name: getattr(self, name) for name in BookInfo.__dataclass_fields__})
+
+
+FIELDS = [f for f in IngestRecord.__dataclass_fields__]
+
+
+@dataclass
+class IngestSummary:
+    images: int = 0
+    skipped: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, status: str) -> None:
+        self.counts[status] = self.counts.get(status, 0) + 1
+
+
+def collect_images(source: str) -> List[str]:
+    """ディレクトリ内の画像、またはマニフェストに書かれた画像のパスを返す
+
+    マニフェストは1行に1パスのテキストファイル、または path 列を持つCSV。
+    相対パスはマニフェストのあるディレクトリからの相対とみなす。
+    """
+    root = Path(source)
+    if root.is_dir():
+        return sorted(
+            str(p) for p in root.rglob("*")
+            if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+
+    base = root.parent
+    with open(root, encoding="utf-8", newline="") as f:
+        if root.suffix.lower() == ".csv":
+            entries = [row["path"] for row in csv.DictReader(f) if row.get("path")]
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    return [str(p if p.is_absolute() else base / p) for p in map(Path, entries)]
+
+
+class Checkpoint:
+    """処理済みの画像パスを1行ずつ追記するファイル。再実行時に処理済みの画像を飛ばす"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+
+    def mark(self, image_path: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(image_path + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.add(image_path)
+
+    def clear(self) -> None:
+        """チェックポイントファイルを削除し、すべての画像を未処理に戻す"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.done.clear()
+
+
+class ResultWriter:
+    """IngestRecord を JSONL または CSV に書き込む"""
+
+    def __init__(self, path: str, fmt: Optional[str] = None, append: bool = True):
+        """
+        Args:
+            path: 出力ファイルのパス
+            fmt: "jsonl" または "csv"（デフォルト: 拡張子から判定）
+            append: Falseの場合は既存の内容を消してから書き込む
+        """
+        self.path = path
+        self.fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        if self.fmt not in ("jsonl", "csv"):
+            raise ValueError(f"未対応の出力形式です: {self.fmt}")
+
+        write_header = self.fmt == "csv" and (
+            not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        )
+        self._file = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._file, fieldnames=FIELDS) if self.fmt == "csv" else None
+        if write_header:
+            self._csv.writeheader()
+
+    def write(self, records: Iterable[IngestRecord]) -> None:
+        for record in records:
+            row = asdict(record)
+            if self._csv:
+                row["authors"] = ", ".join(record.authors) if record.authors else None
+                self._csv.writerow(row)
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def process_detection(
+    detection: BatchDetectionResult,
+    book_client: BookAPIClient,
+    notion: Optional[NotionClient] = None,
+    database_id: Optional[str] = None,
+    on_existing: Optional[str] = "update"
+) -> List[IngestRecord]:
+    """1枚分の検出結果から書籍情報を取得し、必要ならNotionに登録する"""
+    records = lookup_records(detection, book_client)
+    if notion is not None and database_id:
+        push_records(records, notion, database_id, on_existing)
+    return records
+
+
+def lookup_records(detection: BatchDetectionResult, book_client: BookAPIClient) -> List[IngestRecord]:
+    """1枚分の検出結果の各ISBNについて書籍情報を取得する"""
+    path = detection.path or str(detection.index)
+    if detection.error:
+        return [IngestRecord(path=path, status=STATUS_ERROR, error=detection.error)]
+    if not detection.isbns:
+        return [IngestRecord(path=path, status=STATUS_NO_ISBN)]
+
+    records = []
+    for isbn in detection.isbns:
+        try:
+            book = book_client.get_book_info(isbn)
+        except Exception as e:
+            records.append(IngestRecord(path=path, status=STATUS_ERROR, isbn=isbn, error=str(e)))
+            continue
+
+        if book is None:
+            records.append(IngestRecord(path=path, status=STATUS_NOT_FOUND, isbn=isbn))
+            continue
+
+        records.append(IngestRecord.from_book(path, book))
+
+    return records
+
+
+def push_records(
+    records: List[IngestRecord],
+    notion: NotionClient,
+    database_id: str,
+    on_existing: Optional[str] = "update"
+) -> List[IngestRecord]:
+    """書籍情報が見つかったレコードをNotionに登録し、結果をレコードに書き込む"""
+    found = [record for record in records if record.status == STATUS_OK]
+    if not found:
+        return records
+
+    results = notion.add_books_to_database(
+        database_id,
+        [record.to_book() for record in found],
+        max_workers=1,
+        on_existing=on_existing
+    )
+    for record, result in zip(found, results):
+        record.notion_page_id = result.page.get("id") if result.page else None
+        record.notion_action = result.action
+        if not result.ok:
+            record.status = STATUS_ERROR
+            record.error = result.error
+    return records
+
+
+def run_batch(
+    images: List[str],
+    writer: ResultWriter,
+    detector: ISBNDetector,
+    book_client: BookAPIClient,
+    checkpoint: Optional[Checkpoint] = None,
+    notion: Optional[NotionClient] = None,
+    database_id: Optional[str] = None,
+    on_existing: Optional[str] = "update",
+    max_workers: Optional[int] = None,
+    lookup_workers: int = 8,
+    notion_workers: int = 2
+) -> IngestSummary:
+    """画像を検出 → 書籍情報取得 →（Notion登録）→ 出力の順に処理する
+
+    各段階は Pipeline で並行に動くので、画像の検出（プロセスプール）と
+    書籍情報の取得（スレッド）が互いを待たずに進む。
+    画像ごとに結果を書き込んでから checkpoint に記録するので、途中で止まっても
+    再実行すれば未処理の画像から再開できる。
+
+    Args:
+        max_workers: 検出に使うプロセス数（デフォルト: CPUコア数）
+        lookup_workers: 書籍情報を同時に取得するスレッド数
+        notion_workers: Notionに同時に登録するスレッド数
+    """
+    summary = IngestSummary()
+    pending = images
+    if checkpoint is not None:
+        pending = [path for path in images if path not in checkpoint.done]
+        summary.skipped = len(images) - len(pending)
+
+    stages = [Stage("lookup", lambda d: (d.index, lookup_records(d, book_client)), workers=lookup_workers)]
+    if notion is not None and database_id:
+        stages.append(Stage(
+            "notion",
+            lambda item: (item[0], push_records(item[1], notion, database_id, on_existing)),
+            workers=notion_workers
+        ))
+    pipeline = Pipeline(lambda: detector.detect_many(pending, max_workers=max_workers), stages)
+
+    for index, records in pipeline.run():
+        writer.write(records)
+        if checkpoint is not None:
+            checkpoint.mark(pending[index])
+
+        summary.images += 1
+        for record in records:
+            summary.add(record.status)
+        logger.info("[%d/%d] %s: %s", summary.images, len(pending), pending[index],
+                    ", ".join(r.status for r in records))
+
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="画像からISBNを読み取り、書籍情報をJSONL/CSVに出力する（Notionへの登録も可能）"
+    )
+    parser.add_argument("source", help="画像のディレクトリ、またはマニフェスト（.txt / path列を持つ.csv）")
+    parser.add_argument("-o", "--output", required=True, help="出力ファイル（.jsonl または .csv）")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="出力形式（デフォルト: 拡張子から判定）")
+    parser.add_argument("--checkpoint", help="チェックポイントファイル（デフォルト: <output>.checkpoint）")
+    parser.add_argument("--no-resume", action="store_true", help="チェックポイントと出力ファイルの内容を消して最初から処理する")
+    parser.add_argument("--workers", type=int, help="検出に使うプロセス数（デフォルト: CPUコア数）")
+    parser.add_argument("--lookup-workers", type=int, default=8, help="書籍情報を同時に取得するスレッド数")
+    parser.add_argument("--notion-workers", type=int, default=2, help="Notionに同時に登録するスレッド数")
+    parser.add_argument("--notion", action="store_true", help="見つかった書籍をNotionに登録する")
+    parser.add_argument("--notion-database-id", default=os.getenv("NOTION_DATABASE_ID"),
+                        help="登録先のデータベースID（デフォルト: 環境変数 NOTION_DATABASE_ID）")
+    parser.add_argument("--on-existing", choices=["update", "skip", "create"], default="update",
+                        help="同じISBNのページが既にある場合の動作")
+    parser.add_argument("--metrics", help="終了時に処理時間・カウンターを書き出すファイル（.prom ならPrometheus形式、それ以外はJSON）")
+    parser.add_argument("-v", "--verbose", action="store_true", help="デバッグログを表示する")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    notion = None
+    if args.notion:
+        token = os.getenv("NOTION_API_TOKEN")
+        if not token or not args.notion_database_id:
+            print("NOTION_API_TOKEN と NOTION_DATABASE_ID を設定してください", file=sys.stderr)
+            return 2
+        notion = NotionClient(token)
+
+    images = collect_images(args.source)
+    checkpoint = Checkpoint(args.checkpoint or args.output + ".checkpoint")
+    if args.no_resume:
+        # 前回の結果を残したまま追記すると、同じ画像の行が重複する
+        checkpoint.clear()
+
+    book_client = BookAPIClient(
+        google_api_key=os.getenv("GOOGLE_BOOKS_API_KEY"),
+        concurrent=True,
+        cache=BookCache()
+    )
+
+    with book_client, ResultWriter(args.output, args.format, append=not args.no_resume) as writer:
+        summary = run_batch(
+            images,
+            writer,
+            ISBNDetector(),
+            book_client,
+            checkpoint=checkpoint,
+            notion=notion,
+            database_id=args.notion_database_id,
+            on_existing=None if args.on_existing == "create" else args.on_existing,
+            max_workers=args.workers,
+            lookup_workers=args.lookup_workers,
+            notion_workers=args.notion_workers
+        )
+
+    print(f"処理: {summary.images}枚, スキップ: {summary.skipped}枚, 結果: {summary.counts}", file=sys.stderr)
+
+    if args.metrics:
+        # 検出はワーカープロセスで行うため、ここには検索・Notion登録の計測値だけが含まれる
+        metrics = get_metrics()
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus() if args.metrics.endswith(".prom") else metrics.to_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,55 @@
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import asyncio
+import logging
+import httpx
 import requests
-from src.openbd_client import OpenBDClient, BookInfo
-from src.google_books_client import GoogleBooksClient
-from src.amazon_cover_client import AmazonCoverClient
+from src.openbd_client import AsyncOpenBDClient, OpenBDClient, BookInfo
+from src.google_books_client import AsyncGoogleBooksClient, GoogleBooksClient
+from src.amazon_cover_client import AsyncAmazonCoverClient, AmazonCoverClient
+from src.book_cache import BookCache
+from src.http_session import create_async_client, get_session
+from src.image_url_validator import ImageURLValidator
+from src.isbn_utils import normalize_isbn
+from src.metrics import get_metrics
+from src.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+# concurrent=True のときにソースへの問い合わせに使うスレッド数（クライアントごと）
+LOOKUP_MAX_WORKERS = 16
 
 
 class BookAPIClient:
+    # concurrent=True の場合だけ __init__ で作成する
+    _executor: Optional[ThreadPoolExecutor] = None
+
     @staticmethod
-    def is_valid_image_url(url: Optional[str], check_exists: bool = True) -> bool:
+    def is_valid_image_url(
+        url: Optional[str],
+        check_exists: bool = True,
+        session: Optional[requests.Session] = None
+    ) -> bool:
         """画像URLが有効な形式かチェック
 
         Args:
             url: チェックする画像URL
             check_exists: 実際にURLにアクセスして画像が存在するかチェックするか（デフォルト: True）
+            session: 使用するHTTPセッション（デフォルト: 共有セッション）
 
         Returns:
             bool: 有効な画像URLの場合True
         """
-        if not url:
-            return False
-
-        # 画像拡張子のリスト
-        valid_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']
-        url_lower = url.lower()
-
-        # URLが画像拡張子で終わっているかチェック
-        # クエリパラメータがあってもOK（例: image.jpg?size=large）
-        has_valid_extension = False
-        for ext in valid_extensions:
-            if ext in url_lower:
-                has_valid_extension = True
-                break
-
+        has_valid_extension = BookAPIClient._has_image_extension(url)
         if not has_valid_extension:
             return False
 
         # 実際に画像が存在するかチェック（オプション）
         if check_exists:
+            session = session or get_session()
             try:
-                response = requests.head(url, timeout=3, allow_redirects=True)
+                response = session.head(url, timeout=3, allow_redirects=True)
                 # ステータスコードが200で、Content-Lengthが500バイト以上
                 # （ダミー画像を除外）
                 if response.status_code == 200:
@@ -47,42 +58,258 @@ class BookAPIClient:
                         return True
                     # Content-Lengthがない場合は、GETで確認
                     elif not content_length:
-                        response = requests.get(url, timeout=3, stream=True)
-                        # 最初の1000バイトを読み込んで確認
-                        chunk = next(response.iter_content(1000), None)
-                        if chunk and len(chunk) >= 500:
-                            return True
+                        with session.get(url, timeout=3, stream=True) as response:
+                            # 最初の1000バイトを読み込んで確認
+                            chunk = next(response.iter_content(1000), None)
+                            if chunk and len(chunk) >= 500:
+                                return True
                 return False
             except Exception:
                 # ネットワークエラーの場合は拡張子チェックの結果を返す
                 return has_valid_extension
 
         return has_valid_extension
-    def __init__(self, google_api_key: Optional[str] = None):
-        self.openbd = OpenBDClient()
-        self.google = GoogleBooksClient(api_key=google_api_key)
-        self.amazon = AmazonCoverClient()
+
+    @staticmethod
+    def _has_image_extension(url: Optional[str]) -> bool:
+        if not url:
+            return False
+
+        # 画像拡張子のリスト
+        valid_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']
+        url_lower = url.lower()
+
+        # URLが画像拡張子で終わっているかチェック
+        # クエリパラメータがあってもOK（例: image.jpg?size=large）
+        for ext in valid_extensions:
+            if ext in url_lower:
+                return True
+        return False
+
+    def __init__(
+        self,
+        google_api_key: Optional[str] = None,
+        concurrent: bool = False,
+        cache: Optional[BookCache] = None,
+        session: Optional[requests.Session] = None,
+        image_validator: Optional[ImageURLValidator] = None,
+        base_urls: Optional[Dict[str, str]] = None,
+        fallback_delay: float = 0.3
+    ):
+        """
+        Args:
+            google_api_key: Google Books APIキー（オプション）
+            concurrent: Trueの場合、Amazonの応答が fallback_delay 秒以内に返らなければ
+                Google Books・openBDにも同時に問い合わせる。Amazonの応答が遅いと3つのソースすべてに
+                問い合わせることになり、Google Books のクォータを消費する
+            cache: プロセス間で共有する永続キャッシュ（オプション）
+            session: 各クライアントで共有するHTTPセッション（デフォルト: 共有セッション）
+            image_validator: 表紙画像URLの検証結果キャッシュ（デフォルト: クライアントごとに作成）
+            base_urls: ソースごとのベースURL（"openbd", "google", "amazon", "amazon_images"）。
+                指定しなかったソースは各クライアントの BASE_URL を使う
+            fallback_delay: concurrent=True のとき、Google Books・openBDへの問い合わせを始める前に
+                Amazonの応答を待つ時間（秒）
+        """
+        base_urls = base_urls or {}
+        self.session = session or get_session()
+        self.openbd = OpenBDClient(session=self.session, base_url=base_urls.get("openbd"))
+        self.google = GoogleBooksClient(
+            api_key=google_api_key, session=self.session, base_url=base_urls.get("google")
+        )
+        self.amazon = AmazonCoverClient(
+            session=self.session,
+            base_url=base_urls.get("amazon"),
+            image_base_url=base_urls.get("amazon_images")
+        )
+        self.fallback_delay = fallback_delay
+        # 検索ごとに作り直さず、クライアントの寿命の間使い回す
+        self._executor = ThreadPoolExecutor(
+            max_workers=LOOKUP_MAX_WORKERS, thread_name_prefix="book-lookup"
+        ) if concurrent else None
+        self._init_state(concurrent, cache, image_validator)
+
+    def _init_state(
+        self,
+        concurrent: bool,
+        cache: Optional[BookCache],
+        image_validator: Optional[ImageURLValidator]
+    ) -> None:
+        """ソースのクライアント以外の状態（同期版・asyncio版で共通）"""
+        self.concurrent = concurrent
+        self.cache = cache
+        self.image_validator = image_validator or ImageURLValidator(
+            probe=lambda url: self.is_valid_image_url(url, session=self.session)
+        )
         self._cache = {}
+        self._flight = SingleFlight()
+
+    def close(self) -> None:
+        """concurrent=True の場合に使うスレッドを止める"""
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self) -> "BookAPIClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def get_book_info(self, isbn: str, use_cache: bool = True) -> Optional[BookInfo]:
+        """書籍情報を取得する
+
+        同じISBN（ISBN-10/13・ハイフンの有無は区別しない）の検索が実行中の場合は、
+        新しく問い合わせずにその結果を待って共有する。
+        """
+        if use_cache:
+            hit, book = self._get_cached(isbn)
+            if hit:
+                return book
+
+        executed = False
+
+        def lookup() -> Optional[BookInfo]:
+            nonlocal executed
+            executed = True
+            return self._lookup_and_store(isbn, use_cache)
+
+        book = self._flight.do(normalize_isbn(isbn), lookup)
+        if not executed:
+            get_metrics().inc("lookup_coalesced_total")
+        return book
+
+    def _lookup_and_store(self, isbn: str, use_cache: bool) -> Optional[BookInfo]:
+        # キャッシュを確認してから実行中の検索に合流するまでの間に、前の検索が終わっていることがある
         if use_cache and isbn in self._cache:
             return self._cache[isbn]
 
+        with get_metrics().timer("lookup_seconds"):
+            if self.concurrent:
+                book = self._lookup_concurrent(isbn)
+            else:
+                book = self._lookup(isbn)
+
+        self._store(isbn, book)
+        return book
+
+    def _get_cached(self, isbn: str) -> Tuple[bool, Optional[BookInfo]]:
+        """メモリ内キャッシュ → 永続キャッシュの順に探す
+
+        Returns:
+            (キャッシュにあったか, 書籍情報)。永続キャッシュに見つからなかった結果（None）が保存されていればそれも返す
+        """
+        metrics = get_metrics()
+        if isbn in self._cache:
+            metrics.inc("lookup_cache_total", layer="memory", result="hit")
+            return True, self._cache[isbn]
+        metrics.inc("lookup_cache_total", layer="memory", result="miss")
+
+        if self.cache is not None:
+            hit, book = self.cache.get(isbn)
+            metrics.inc("lookup_cache_total", layer="persistent", result="hit" if hit else "miss")
+            if hit:
+                if book:
+                    self._cache[isbn] = book
+                return True, book
+
+        return False, None
+
+    def _store(self, isbn: str, book: Optional[BookInfo]) -> None:
+        # 各ソースは通信エラーでも None を返し「見つからなかった」と区別できないので、
+        # 見つからなかった結果はキャッシュせずに次回また問い合わせる
+        if not book:
+            return
+        self._cache[isbn] = book
+        if self.cache is not None:
+            self.cache.set(isbn, book)
+
+    @staticmethod
+    def _from_source(source: str, fetch: Callable[..., Optional[BookInfo]], *args: Any) -> Optional[BookInfo]:
+        """1つのソースへの問い合わせの時間と結果を記録する"""
+        metrics = get_metrics()
+        with metrics.timer("lookup_source_seconds", source=source):
+            book = fetch(*args)
+        metrics.inc("lookup_source_total", source=source, result="found" if book else "not_found")
+        return book
+
+    def _lookup(self, isbn: str) -> Optional[BookInfo]:
         # 優先順位: Amazon → Google Books → openBD
         # Amazon（最も詳細な情報）
-        print(f"[DEBUG] Trying Amazon for ISBN {isbn}...")
-        book = self.amazon.get_book_info(isbn)
+        logger.debug("Trying Amazon for ISBN %s", isbn)
+        book = self._from_source("amazon", self.amazon.get_book_info, isbn)
         if book:
-            print(f"[DEBUG] Got book from Amazon: title={book.title}, pages={book.page_count}")
-            self._cache[isbn] = book
+            logger.debug("Got book from Amazon: title=%s, pages=%s", book.title, book.page_count)
             return book
-        print(f"[DEBUG] Amazon failed, trying Google Books...")
+        logger.debug("Amazon failed, trying Google Books")
+        get_metrics().inc("lookup_fallback_total", to="google_openbd")
+
+        # Google Books（フォールバック）→ openBD（補完・最後のフォールバック）
+        google_book = self._from_source("google", self.google.get_book_info, isbn)
+        openbd_book = self._from_source("openbd", self.openbd.get_book_info, isbn)
+        return self._merge(isbn, google_book, openbd_book)
+
+    def _lookup_concurrent(self, isbn: str) -> Optional[BookInfo]:
+        """Amazonの応答が遅い場合だけ Google Books・openBD にも同時に問い合わせ、_lookup と同じ優先順位でマージする
+
+        Amazonが fallback_delay 秒以内に見つければ、他のソースには問い合わせない。
+        """
+        executor = self._executor
+        amazon_future = executor.submit(self._from_source, "amazon", self.amazon.get_book_info, isbn)
+
+        def submit_others():
+            return (
+                executor.submit(self._from_source, "google", self.google.get_book_info, isbn),
+                executor.submit(self._from_source, "openbd", self.openbd.get_book_info, isbn),
+            )
+
+        others = None
+        try:
+            book = amazon_future.result(timeout=self.fallback_delay)
+        except FutureTimeoutError:
+            # Amazonの応答を待つ間に、フォールバック先への問い合わせを始めておく
+            others = submit_others()
+            book = amazon_future.result()
 
-        # Google Books（フォールバック）
-        book = self.google.get_book_info(isbn)
         if book:
+            logger.debug("Got book from Amazon: title=%s, pages=%s", book.title, book.page_count)
+            return book
+        logger.debug("Amazon failed, using Google Books / openBD results")
+        get_metrics().inc("lookup_fallback_total", to="google_openbd")
+
+        google_future, openbd_future = others or submit_others()
+        return self._merge(isbn, google_future.result(), openbd_future.result())
+
+    def _merge(
+        self,
+        isbn: str,
+        google_book: Optional[BookInfo],
+        openbd_book: Optional[BookInfo]
+    ) -> Optional[BookInfo]:
+        """Google Books優先でopenBDの情報を補完し、不足分をAmazonのタイトル検索で補う"""
+        book = self._merge_sources(google_book, openbd_book, self._is_valid_cover)
+        if not book:
+            return None
+
+        if self._needs_amazon(book, self._is_valid_cover):
+            author = book.authors[0] if book.authors else None
+            amazon_book = self._from_source(
+                "amazon_title", self.amazon.get_book_info_by_title, book.title, author, isbn
+            )
+            if amazon_book:
+                self._merge_amazon(book, amazon_book, self._is_valid_cover)
+        return book
+
+    def _is_valid_cover(self, url: Optional[str]) -> bool:
+        return self.image_validator.is_valid(url)
+
+    @staticmethod
+    def _merge_sources(
+        google_book: Optional[BookInfo],
+        openbd_book: Optional[BookInfo],
+        is_valid_cover: Callable[[Optional[str]], bool]
+    ) -> Optional[BookInfo]:
+        if google_book:
+            book = google_book
             # openBDから補完情報を取得
-            openbd_book = self.openbd.get_book_info(isbn)
             if openbd_book:
                 if not book.publisher and openbd_book.publisher:
                     book.publisher = openbd_book.publisher
@@ -91,67 +318,198 @@ class BookAPIClient:
                 if not book.published_date and openbd_book.published_date:
                     book.published_date = openbd_book.published_date
                 # openBDの画像が有効な形式の場合のみ使用
-                if not self.is_valid_image_url(book.cover_image_url) and openbd_book.cover_image_url:
-                    if self.is_valid_image_url(openbd_book.cover_image_url):
+                if not is_valid_cover(book.cover_image_url) and openbd_book.cover_image_url:
+                    if is_valid_cover(openbd_book.cover_image_url):
                         book.cover_image_url = openbd_book.cover_image_url
+            return book
 
-            # ページ数や画像が不足している場合、Amazonでタイトル検索
-            needs_amazon = (
-                not book.page_count or
-                not self.is_valid_image_url(book.cover_image_url)
+        # openBD（最後のフォールバック）
+        return openbd_book
+
+    @staticmethod
+    def _needs_amazon(book: BookInfo, is_valid_cover: Callable[[Optional[str]], bool]) -> bool:
+        # ページ数や画像が不足している場合、Amazonでタイトル検索
+        valid_image = is_valid_cover(book.cover_image_url)
+        if (not book.page_count or not valid_image) and book.title:
+            logger.debug(
+                "Missing data from %s (pages=%s, valid_image=%s), trying Amazon title search",
+                book.source, book.page_count, valid_image
             )
+            get_metrics().inc("lookup_fallback_total", to="amazon_title")
+            return True
+        return False
 
-            if needs_amazon and book.title:
-                print(f"[DEBUG] Missing data (pages={book.page_count}, valid_image={self.is_valid_image_url(book.cover_image_url)}), trying Amazon title search...")
-                author = book.authors[0] if book.authors else None
-                amazon_book = self.amazon.get_book_info_by_title(book.title, author, isbn)
-
-                if amazon_book:
-                    # Amazonから取得したデータで補完
-                    if not book.page_count and amazon_book.page_count:
-                        print(f"[DEBUG]補完: Pages {amazon_book.page_count}")
-                        book.page_count = amazon_book.page_count
-                    if not book.published_date and amazon_book.published_date:
-                        print(f"[DEBUG] 補完: Published {amazon_book.published_date}")
-                        book.published_date = amazon_book.published_date
-                    if not self.is_valid_image_url(book.cover_image_url) and self.is_valid_image_url(amazon_book.cover_image_url):
-                        print(f"[DEBUG] 補完: Cover image from Amazon")
-                        book.cover_image_url = amazon_book.cover_image_url
-                    if not book.description and amazon_book.description:
-                        book.description = amazon_book.description
-
-            self._cache[isbn] = book
-            return book
+    @staticmethod
+    def _merge_amazon(
+        book: BookInfo,
+        amazon_book: BookInfo,
+        is_valid_cover: Callable[[Optional[str]], bool]
+    ) -> None:
+        # Amazonから取得したデータで補完
+        if not book.page_count and amazon_book.page_count:
+            logger.debug("補完: Pages %s", amazon_book.page_count)
+            book.page_count = amazon_book.page_count
+        if not book.published_date and amazon_book.published_date:
+            logger.debug("補完: Published %s", amazon_book.published_date)
+            book.published_date = amazon_book.published_date
+        if not is_valid_cover(book.cover_image_url) and is_valid_cover(amazon_book.cover_image_url):
+            logger.debug("補完: Cover image from Amazon")
+            book.cover_image_url = amazon_book.cover_image_url
+        if not book.description and amazon_book.description:
+            book.description = amazon_book.description
 
-        # openBD（最後のフォールバック）
-        book = self.openbd.get_book_info(isbn)
+
+class AsyncBookAPIClient(BookAPIClient):
+    """BookAPIClient の asyncio 版
+
+    3つのソースに同時に問い合わせ、BookAPIClient と同じ優先順位・補完ルールでマージする。
+    """
+
+    def __init__(
+        self,
+        google_api_key: Optional[str] = None,
+        cache: Optional[BookCache] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        base_urls: Optional[Dict[str, str]] = None,
+        image_validator: Optional[ImageURLValidator] = None,
+        session: Optional[requests.Session] = None
+    ):
+        """
+        Args:
+            google_api_key: Google Books APIキー（オプション）
+            cache: プロセス間で共有する永続キャッシュ（オプション）
+            client: 各クライアントで共有するHTTPクライアント（デフォルト: 新しく作成）
+            base_urls: ソースごとのベースURL（BookAPIClient と同じ）
+            image_validator: 表紙画像URLの検証結果キャッシュ（デフォルト: クライアントごとに作成）
+            session: image_validator.is_valid を同期的に呼んだときに使うHTTPセッション（デフォルト: 共有セッション）
+        """
+        base_urls = base_urls or {}
+        self.session = session or get_session()
+        self.client = client or create_async_client()
+        self.openbd = AsyncOpenBDClient(client=self.client, base_url=base_urls.get("openbd"))
+        self.google = AsyncGoogleBooksClient(
+            api_key=google_api_key, client=self.client, base_url=base_urls.get("google")
+        )
+        self.amazon = AsyncAmazonCoverClient(
+            client=self.client,
+            base_url=base_urls.get("amazon"),
+            image_base_url=base_urls.get("amazon_images")
+        )
+        self._init_state(True, cache, image_validator)
+        self._in_flight: Dict[str, "asyncio.Future[Optional[BookInfo]]"] = {}
+
+    async def get_book_info(self, isbn: str, use_cache: bool = True) -> Optional[BookInfo]:
+        """書籍情報を取得する（同じISBNの実行中の検索があれば、その結果を待って共有する）"""
+        if use_cache:
+            hit, book = self._get_cached(isbn)
+            if hit:
+                return book
+
+        key = normalize_isbn(isbn)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup_and_store(isbn, use_cache))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            get_metrics().inc("lookup_coalesced_total")
+
+        # 1つの呼び出し元がキャンセルされても、待っている他の呼び出し元の検索は止めない
+        return await asyncio.shield(task)
+
+    async def _lookup_and_store(self, isbn: str, use_cache: bool) -> Optional[BookInfo]:
+        if use_cache and isbn in self._cache:
+            return self._cache[isbn]
+
+        with get_metrics().timer("lookup_seconds"):
+            book = await self._lookup(isbn)
+
+        self._store(isbn, book)
+        return book
+
+    @staticmethod
+    async def _from_source_async(source: str, fetch: Awaitable[Optional[BookInfo]]) -> Optional[BookInfo]:
+        metrics = get_metrics()
+        with metrics.timer("lookup_source_seconds", source=source):
+            book = await fetch
+        metrics.inc("lookup_source_total", source=source, result="found" if book else "not_found")
+        return book
+
+    async def _lookup(self, isbn: str) -> Optional[BookInfo]:
+        amazon_task = asyncio.ensure_future(self._from_source_async("amazon", self.amazon.get_book_info(isbn)))
+        other_tasks = asyncio.gather(
+            self._from_source_async("google", self.google.get_book_info(isbn)),
+            self._from_source_async("openbd", self.openbd.get_book_info(isbn))
+        )
+
+        book = await amazon_task
         if book:
-            # ページ数や画像が不足している場合、Amazonでタイトル検索
-            needs_amazon = (
-                not book.page_count or
-                not self.is_valid_image_url(book.cover_image_url)
+            logger.debug("Got book from Amazon: title=%s, pages=%s", book.title, book.page_count)
+            # Amazonで確定した場合、残りの問い合わせは打ち切る
+            other_tasks.cancel()
+            # 打ち切った問い合わせの CancelledError を読み捨てる（未取得の例外として警告が出ないように）
+            other_tasks.add_done_callback(lambda future: future.cancelled() or future.exception())
+            return book
+        logger.debug("Amazon failed, using Google Books / openBD results")
+        get_metrics().inc("lookup_fallback_total", to="google_openbd")
+
+        google_book, openbd_book = await other_tasks
+        return await self._merge(isbn, google_book, openbd_book)
+
+    async def _merge(
+        self,
+        isbn: str,
+        google_book: Optional[BookInfo],
+        openbd_book: Optional[BookInfo]
+    ) -> Optional[BookInfo]:
+        # 画像URLの検証を先に行い、同期版と同じマージ処理に渡す。
+        # openBDの画像は同期版と同じく、Google Booksの画像が使えない場合だけ検証する
+        valid_covers = await self._check_covers(google_book or openbd_book)
+        if google_book and openbd_book and google_book.cover_image_url not in valid_covers:
+            valid_covers |= await self._check_covers(openbd_book)
+        book = self._merge_sources(google_book, openbd_book, valid_covers.__contains__)
+        if not book:
+            return None
+
+        if self._needs_amazon(book, valid_covers.__contains__):
+            author = book.authors[0] if book.authors else None
+            amazon_book = await self._from_source_async(
+                "amazon_title", self.amazon.get_book_info_by_title(book.title, author, isbn)
             )
+            if amazon_book:
+                valid_covers |= await self._check_covers(amazon_book)
+                self._merge_amazon(book, amazon_book, valid_covers.__contains__)
+        return book
 
-            if needs_amazon and book.title:
-                print(f"[DEBUG] Missing data from openBD (pages={book.page_count}, valid_image={self.is_valid_image_url(book.cover_image_url)}), trying Amazon title search...")
-                author = book.authors[0] if book.authors else None
-                amazon_book = self.amazon.get_book_info_by_title(book.title, author, isbn)
-
-                if amazon_book:
-                    # Amazonから取得したデータで補完
-                    if not book.page_count and amazon_book.page_count:
-                        print(f"[DEBUG] 補完: Pages {amazon_book.page_count}")
-                        book.page_count = amazon_book.page_count
-                    if not book.published_date and amazon_book.published_date:
-                        print(f"[DEBUG] 補完: Published {amazon_book.published_date}")
-                        book.published_date = amazon_book.published_date
-                    if not self.is_valid_image_url(book.cover_image_url) and self.is_valid_image_url(amazon_book.cover_image_url):
-                        print(f"[DEBUG] 補完: Cover image from Amazon")
-                        book.cover_image_url = amazon_book.cover_image_url
-                    if not book.description and amazon_book.description:
-                        book.description = amazon_book.description
-
-            self._cache[isbn] = book
-            return book
+    async def _check_covers(self, *books: Optional[BookInfo]) -> Set[str]:
+        urls = {book.cover_image_url for book in books if book and book.cover_image_url}
+        urls = list(urls)
+        results = await asyncio.gather(*(self.is_valid_image_url_async(url) for url in urls))
+        return {url for url, valid in zip(urls, results) if valid}
+
+    async def is_valid_image_url_async(self, url: Optional[str]) -> bool:
+        """is_valid_image_url の asyncio 版（検証結果は image_validator にキャッシュする）"""
+        if not self._has_image_extension(url):
+            return False
+
+        return await self.image_validator.is_valid_async(url, self._probe_image_url_async)
+
+    async def _probe_image_url_async(self, url: str) -> bool:
+        try:
+            response = await self.client.head(url, timeout=3, follow_redirects=True)
+            if response.status_code == 200:
+                content_length = response.headers.get('Content-Length')
+                if content_length and int(content_length) >= 500:
+                    return True
+                elif not content_length:
+                    async with self.client.stream("GET", url, timeout=3) as stream:
+                        # 最初の1000バイトを読み込んで確認
+                        async for chunk in stream.aiter_bytes(1000):
+                            return len(chunk) >= 500
+            return False
+        except Exception:
+            # ネットワークエラーの場合は拡張子チェックの結果を返す
+            return True
 
-        return None
+    async def aclose(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,151 @@
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from contextlib import contextmanager
+from dataclasses import asdict
+import json
+import os
+import sqlite3
+import time
+
+from src.openbd_client import BookInfo
+from src.isbn_utils import normalize_isbn
+
+
+class BookCache:
+    """SQLiteファイルに書籍情報を保存する永続キャッシュ
+
+    複数プロセスから同じファイルを共有できる。set(isbn, None) で記録した見つからなかったISBNは
+    negative_ttl の間キャッシュし、max_entries を超えたら最終参照が古い順に削除する。
+    BookAPIClient は通信エラーと見つからなかった場合を区別できないため、見つからなかった結果は保存しない。
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "isbn-book-reader", "books.sqlite3")
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 30 * 24 * 60 * 60,
+        negative_ttl: float = 60 * 60,
+        max_entries: int = 10000,
+        ttl_by_source: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: キャッシュファイルのパス（":memory:" は使用不可）
+            ttl: 書籍情報の有効期間（秒）
+            negative_ttl: 見つからなかったISBNの有効期間（秒）
+            max_entries: 保持する最大件数
+            ttl_by_source: データソースごとの有効期間（秒）。ttl より優先する
+            clock: 現在時刻（UNIX時間）を返す関数（テスト用）
+        """
+        self.path = path or self.DEFAULT_PATH
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.ttl_by_source = ttl_by_source or {}
+        self.clock = clock
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS books (
+                    isbn TEXT PRIMARY KEY,
+                    data TEXT,
+                    source TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS books_accessed_at ON books (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, isbn: str) -> Tuple[bool, Optional[BookInfo]]:
+        """キャッシュを参照する
+
+        Returns:
+            (ヒットしたか, 書籍情報)。見つからなかったISBNとしてキャッシュされている場合は (True, None)
+        """
+        key = normalize_isbn(isbn)
+        now = self.clock()
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, source, fetched_at FROM books WHERE isbn = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+
+            data, source, fetched_at = row
+            if now - fetched_at > self._ttl_for(source, data is None):
+                conn.execute("DELETE FROM books WHERE isbn = ?", (key,))
+                return False, None
+
+            conn.execute("UPDATE books SET accessed_at = ? WHERE isbn = ?", (now, key))
+
+        if data is None:
+            return True, None
+        return True, BookInfo(**json.loads(data))
+
+    def set(self, isbn: str, book: Optional[BookInfo]) -> None:
+        """書籍情報を保存する。book が None の場合は見つからなかったことを記録する"""
+        key = normalize_isbn(isbn)
+        now = self.clock()
+        data = json.dumps(asdict(book), ensure_ascii=False) if book else None
+        source = book.source if book else None
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO books (isbn, data, source, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, source, now, now)
+            )
+            self._evict(conn)
+
+    def fetched_at(self, isbn: str) -> Optional[float]:
+        """保存した時刻（UNIX時間）。キャッシュされていなければNone"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM books WHERE isbn = ?",
+                (normalize_isbn(isbn),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, isbn: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM books WHERE isbn = ?", (normalize_isbn(isbn),))
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM books")
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def _ttl_for(self, source: Optional[str], negative: bool) -> float:
+        if negative:
+            return self.negative_ttl
+        return self.ttl_by_source.get(source, self.ttl)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count = conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM books WHERE isbn IN "
+                "(SELECT isbn FROM books ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
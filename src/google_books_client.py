@@ -1,24 +1,38 @@
 from typing import Optional, Dict, Any
+import httpx
 import requests
+from src.http_session import create_async_client, get_session
 from src.openbd_client import BookInfo
 
 
 class GoogleBooksClient:
     BASE_URL = "https://www.googleapis.com/books/v1/volumes"
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        timeout: float = 10,
+        base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            api_key: Google Books APIキー（オプション）
+            session: 使用するHTTPセッション（デフォルト: 共有セッション）
+            timeout: タイムアウト（秒）
+            base_url: volumes APIのURL（デフォルト: BASE_URL）
+        """
         self.api_key = api_key
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.base_url = base_url or self.BASE_URL
 
     def get_book_info(self, isbn: str) -> Optional[BookInfo]:
         try:
-            params = {"q": f"isbn:{isbn}"}
-            if self.api_key:
-                params["key"] = self.api_key
-
-            response = requests.get(
-                self.BASE_URL,
-                params=params,
-                timeout=10
+            response = self.session.get(
+                self.base_url,
+                params=self._build_params(isbn),
+                timeout=self.timeout
             )
 
             if response.status_code != 200:
@@ -31,6 +45,12 @@ class GoogleBooksClient:
         except Exception:
             return None
 
+    def _build_params(self, isbn: str) -> Dict[str, str]:
+        params = {"q": f"isbn:{isbn}"}
+        if self.api_key:
+            params["key"] = self.api_key
+        return params
+
     def _parse_response(self, data: Dict[str, Any], isbn: str) -> Optional[BookInfo]:
         if not data or data.get('totalItems', 0) == 0:
             return None
@@ -66,3 +86,38 @@ class GoogleBooksClient:
 
         except Exception:
             return None
+
+
+class AsyncGoogleBooksClient(GoogleBooksClient):
+    """GoogleBooksClient の asyncio 版（レスポンスの解析処理は共通）"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 10,
+        base_url: Optional[str] = None
+    ):
+        self.api_key = api_key
+        self.client = client or create_async_client()
+        self.timeout = timeout
+        self.base_url = base_url or self.BASE_URL
+
+    async def get_book_info(self, isbn: str) -> Optional[BookInfo]:
+        try:
+            response = await self.client.get(
+                self.base_url,
+                params=self._build_params(isbn),
+                timeout=self.timeout
+            )
+
+            if response.status_code != 200:
+                return None
+
+            return self._parse_response(response.json(), isbn)
+
+        except Exception:
+            return None
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
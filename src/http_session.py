@@ -0,0 +1,200 @@
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.metrics import get_metrics
+from src.rate_limiter import RETRY_STATUSES, Backoff, RateLimiter, get_rate_limiter, parse_retry_after
+
+
+logger = logging.getLogger(__name__)
+
+# 同時に保持するホストごとのコネクションプール数
+DEFAULT_POOL_CONNECTIONS = 10
+# 1ホストあたりの最大コネクション数
+DEFAULT_POOL_MAXSIZE = 10
+
+# 429/503 を受けたときの最大再試行回数
+DEFAULT_RATE_LIMIT_RETRIES = 3
+
+_shared_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+class _RetryPolicy:
+    """429/503 を受けたときに何秒待って再試行するかを決める"""
+
+    def __init__(self, retries: int, backoff: Optional[Backoff]):
+        self.retries = retries
+        self.backoff = backoff or Backoff()
+
+    def retry_delay(self, status_code: int, retry_after: Optional[str], attempt: int) -> Optional[float]:
+        """再試行までの待ち時間。再試行しない場合はNone"""
+        if status_code not in RETRY_STATUSES or attempt >= self.retries:
+            return None
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff.delay(attempt)
+        if delay > self.backoff.cap:
+            # 長時間待たされる場合は呼び出し元にそのまま返す
+            return None
+        return delay
+
+    def penalty(self, retry_after: Optional[str], delay: Optional[float]) -> float:
+        """同じホストへの後続のリクエストを止める時間（秒）
+
+        再試行せずに呼び出し元へ返す場合も、Retry-After が長いと後続のリクエストが
+        何時間も待たされるので backoff.cap で打ち切る。
+        """
+        if delay is not None:
+            return delay
+        return min(parse_retry_after(retry_after) or 0.0, self.backoff.cap)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """ホストごとのレート制限と、429/503 のバックオフ付き再試行を行うアダプター
+
+    rate_limiter が None の場合はリクエストごとに共有レートリミッターを使う。
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_limit_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+        backoff: Optional[Backoff] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        **kwargs
+    ):
+        self.rate_limiter = rate_limiter
+        self.retry_policy = _RetryPolicy(rate_limit_retries, backoff)
+        self.sleep = sleep
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        bucket = (self.rate_limiter or get_rate_limiter()).bucket(request.url)
+        attempt = 0
+        while True:
+            wait = bucket.reserve()
+            if wait > 0:
+                self.sleep(wait)
+
+            response = super().send(request, **kwargs)
+            if response.status_code not in RETRY_STATUSES:
+                bucket.reward()
+                return response
+
+            retry_after = response.headers.get("Retry-After")
+            delay = self.retry_policy.retry_delay(response.status_code, retry_after, attempt)
+            # 他のスレッドからの同じホストへのリクエストも止める
+            bucket.penalize(self.retry_policy.penalty(retry_after, delay))
+            if delay is None:
+                return response
+
+            logger.debug("%s from %s, retrying in %.2fs", response.status_code, request.url, delay)
+            get_metrics().inc("http_retries_total", host=urlsplit(request.url).hostname or "", status=response.status_code)
+            response.close()
+            attempt += 1
+
+
+class AsyncRateLimitedTransport(httpx.AsyncHTTPTransport):
+    """RateLimitedAdapter の asyncio 版"""
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_limit_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+        backoff: Optional[Backoff] = None,
+        **kwargs
+    ):
+        self.rate_limiter = rate_limiter
+        self.retry_policy = _RetryPolicy(rate_limit_retries, backoff)
+        super().__init__(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = (self.rate_limiter or get_rate_limiter()).bucket(str(request.url))
+        attempt = 0
+        while True:
+            wait = bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            response = await super().handle_async_request(request)
+            if response.status_code not in RETRY_STATUSES:
+                bucket.reward()
+                return response
+
+            retry_after = response.headers.get("Retry-After")
+            delay = self.retry_policy.retry_delay(response.status_code, retry_after, attempt)
+            bucket.penalize(self.retry_policy.penalty(retry_after, delay))
+            if delay is None:
+                return response
+
+            logger.debug("%s from %s, retrying in %.2fs", response.status_code, request.url, delay)
+            get_metrics().inc("http_retries_total", host=request.url.host, status=response.status_code)
+            await response.aclose()
+            attempt += 1
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False,
+    rate_limiter: Optional[RateLimiter] = None
+) -> requests.Session:
+    """Keep-Aliveでコネクションを使い回すセッションを作成する
+
+    Args:
+        pool_connections: コネクションプールを保持するホスト数
+        pool_maxsize: 1ホストあたりの最大コネクション数
+        pool_block: Trueの場合、上限に達したら空きが出るまで待つ
+        rate_limiter: ホストごとのレート制限（デフォルト: 共有レートリミッター）
+    """
+    session = requests.Session()
+    adapter = RateLimitedAdapter(
+        rate_limiter,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """全クライアントで共有するセッションを返す"""
+    global _shared_session
+    if _shared_session is None:
+        with _lock:
+            if _shared_session is None:
+                _shared_session = create_session()
+    return _shared_session
+
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """共有セッションを差し替える（Noneの場合は次回 get_session で再作成）"""
+    global _shared_session
+    with _lock:
+        _shared_session = session
+
+
+def create_async_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    rate_limiter: Optional[RateLimiter] = None
+) -> httpx.AsyncClient:
+    """asyncio版クライアント用のコネクションプール付きHTTPクライアントを作成する"""
+    return httpx.AsyncClient(
+        transport=AsyncRateLimitedTransport(
+            rate_limiter,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+    )
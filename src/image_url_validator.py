@@ -0,0 +1,116 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import threading
+import time
+
+from src.metrics import get_metrics
+from src.single_flight import SingleFlight
+
+
+class ImageURLValidator:
+    """画像URLの検証結果をキャッシュする
+
+    同じURLを同時に検証しようとした場合は1回だけ問い合わせて結果を共有する。
+    キャッシュは max_entries 件を超えると最終参照が古い順に削除する。
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[str], bool],
+        ttl: float = 10 * 60,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            probe: 実際にURLを検証する関数（例: BookAPIClient.is_valid_image_url）
+            ttl: 検証結果の有効期間（秒）
+            max_entries: キャッシュする最大URL数
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.probe = probe
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._in_flight: Dict[str, "asyncio.Future[bool]"] = {}
+
+    def is_valid(self, url: Optional[str]) -> bool:
+        if not url:
+            return False
+
+        cached = self._cached(url)
+        if cached is not None:
+            return cached
+
+        return self._flight.do(url, lambda: self._probe_and_store(url))
+
+    async def is_valid_async(self, url: Optional[str], probe: Callable[[str], Awaitable[bool]]) -> bool:
+        """is_valid の asyncio 版。キャッシュ（is_valid と共有）になければ probe で検証する
+
+        同じURLの実行中の検証があれば、その結果を待って共有する。
+        """
+        if not url:
+            return False
+
+        cached = self._cached(url)
+        if cached is not None:
+            return cached
+
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._probe_and_store_async(url, probe))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+
+        # 1つの呼び出し元がキャンセルされても、待っている他の呼び出し元の検証は止めない
+        return await asyncio.shield(task)
+
+    def _cached(self, url: str) -> Optional[bool]:
+        cached = self._get(url)
+        get_metrics().inc("image_validation_cache_total", result="miss" if cached is None else "hit")
+        return cached
+
+    def _get(self, url: str) -> Optional[bool]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+
+            valid, expires_at = entry
+            if self.clock() >= expires_at:
+                del self._entries[url]
+                return None
+
+            self._entries.move_to_end(url)
+            return valid
+
+    def _probe_and_store(self, url: str) -> bool:
+        with get_metrics().timer("image_validation_seconds"):
+            valid = self.probe(url)
+        self._store(url, valid)
+        return valid
+
+    async def _probe_and_store_async(self, url: str, probe: Callable[[str], Awaitable[bool]]) -> bool:
+        with get_metrics().timer("image_validation_seconds"):
+            valid = await probe(url)
+        self._store(url, valid)
+        return valid
+
+    def _store(self, url: str, valid: bool) -> None:
+        with self._lock:
+            self._entries[url] = (valid, self.clock() + self.ttl)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -1,36 +1,354 @@
-from typing import List, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+import os
 from PIL import Image
 import numpy as np
 from pyzbar import pyzbar
 import cv2
 
+from src.metrics import get_metrics
+
+
+Region = Tuple[int, int, int, int]
+ImageSource = Union[str, Path, Image.Image, np.ndarray]
+
+
+@dataclass
+class DetectionResult:
+    isbns: List[str] = field(default_factory=list)
+    # 最初にISBNを検出できた前処理ステージ名（検出できなければNone）
+    stage: Optional[str] = None
+    # 最初にISBNを検出できた領域 (x, y, w, h)。画像全体で検出した場合はNone
+    region: Optional[Region] = None
+    # 最初にISBNを検出できた縮小率（1.0は元の解像度）
+    scale: Optional[float] = None
+    stages_tried: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchDetectionResult:
+    # detect_many に渡した順番（0始まり）
+    index: int
+    # 入力がファイルパスの場合はそのパス、画像オブジェクトの場合はNone
+    path: Optional[str] = None
+    result: Optional[DetectionResult] = None
+    error: Optional[str] = None
+
+    @property
+    def isbns(self) -> List[str]:
+        return self.result.isbns if self.result else []
+
 
 class ISBNDetector:
-    def detect_isbn(self, image: Union[Image.Image, np.ndarray]) -> List[str]:
+    # 前処理ステージ（軽い順）。画像は必要になった時点で生成する
+    STAGES = [
+        ("raw", None),
+        ("adaptive", "preprocess_image"),
+        ("otsu", "_preprocess_simple"),
+        ("enhanced", "_preprocess_enhanced"),
+    ]
+    # 候補領域で試すステージ。重いノイズ除去（enhanced）は候補領域では行わず、画像全体でだけ試す
+    REGION_STAGES = ("raw", "adaptive", "otsu")
+
+    def __init__(
+        self,
+        exhaustive: bool = False,
+        localize: bool = True,
+        max_regions: int = 3,
+        max_working_size: Optional[int] = 1280,
+        max_escalation_size: Optional[int] = 2560
+    ):
+        """
+        Args:
+            exhaustive: Trueの場合、ISBNが見つかっても全ステージを試す
+                （1枚に複数のバーコードが写っている棚写真など）
+            localize: バーコードらしい領域を切り出してからデコードするか
+            max_regions: デコードを試す候補領域の最大数
+            max_working_size: 最初に処理する画像の長辺の上限（px）。
+                見つからなければ2倍ずつ元の解像度まで拡大して再試行する。
+                Noneの場合は常に元の解像度で処理する
+            max_escalation_size: 拡大して再試行するときの長辺の上限（px）。
+                これより大きな画像は元の解像度では処理しない。Noneの場合は上限なし
+        """
+        self.exhaustive = exhaustive
+        self.localize = localize
+        self.max_regions = max_regions
+        self.max_working_size = max_working_size
+        self.max_escalation_size = max_escalation_size
+
+    def detect_isbn(self, image: Union[Image.Image, np.ndarray], exhaustive: Optional[bool] = None) -> List[str]:
+        return self.detect(image, exhaustive=exhaustive).isbns
+
+    def detect_many(
+        self,
+        images: Iterable[ImageSource],
+        max_workers: Optional[int] = None
+    ) -> Iterator[BatchDetectionResult]:
+        """複数の画像をプロセスプールで並列に検出し、終わった順に返す
+
+        Args:
+            images: 画像ファイルのパス、PIL画像、NumPy配列のいずれかのイテラブル
+            max_workers: ワーカープロセス数（デフォルト: CPUコア数）。
+                1の場合はプロセスを使わずに順番に処理する。
+                ワーカープロセス内の計測値（src.metrics）は呼び出し元には集計されない
+
+        Yields:
+            BatchDetectionResult: index で入力順を判別できる
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+
+        if max_workers <= 1:
+            for index, image in enumerate(images):
+                yield _detect_one(self, index, image)
+            return
+
+        # 入力を一度に読み込まないよう、未完了のタスク数を制限する
+        max_pending = max_workers * 2
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self._options(),)
+        ) as executor:
+            pending = set()
+            for index, image in enumerate(images):
+                if isinstance(image, Path):
+                    image = str(image)
+                pending.add(executor.submit(_detect_worker, index, image))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            "exhaustive": self.exhaustive,
+            "localize": self.localize,
+            "max_regions": self.max_regions,
+            "max_working_size": self.max_working_size,
+            "max_escalation_size": self.max_escalation_size,
+        }
+
+    def detect(self, image: Union[Image.Image, np.ndarray], exhaustive: Optional[bool] = None) -> DetectionResult:
+        """候補領域ごとに前処理ステージを順に試し、ISBNが見つかった時点で打ち切る
+
+        候補領域で見つからなければ画像全体で試す。大きな画像はまず
+        max_working_size まで縮小して処理し、見つからなければ max_escalation_size まで
+        拡大して再試行する。重いノイズ除去（enhanced）は最後の解像度の画像全体でだけ試す。
+        """
+        if exhaustive is None:
+            exhaustive = self.exhaustive
+
+        metrics = get_metrics()
+        with metrics.timer("detector_detect_seconds"):
+            result = self._detect(image, exhaustive)
+        metrics.inc("detector_scans_total", result="found" if result.isbns else "not_found")
+        return result
+
+    def _detect(self, image: Union[Image.Image, np.ndarray], exhaustive: bool) -> DetectionResult:
         if isinstance(image, Image.Image):
             image = np.array(image)
 
         if len(image.shape) == 3:
             image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
 
-        isbns = []
+        result = DetectionResult()
+
+        scales = self._working_scales(image)
+        for index, scale in enumerate(scales):
+            if scale < 1.0:
+                scaled = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                scaled = image
+
+            final = index == len(scales) - 1
+            found, region = self._detect_at(scaled, result, exhaustive, None if final else self.REGION_STAGES)
+            if found and result.scale is None:
+                result.scale = scale
+                if region is not None:
+                    # 元画像の座標に戻す
+                    result.region = tuple(int(round(v / scale)) for v in region)
+
+            if result.isbns and not exhaustive:
+                break
 
-        images_to_try = [
-            image,
-            self.preprocess_image(image),
-            self._preprocess_simple(image),
-            self._preprocess_enhanced(image)
-        ]
+        return result
 
-        for img in images_to_try:
-            barcodes = pyzbar.decode(img)
-            for barcode in barcodes:
-                if barcode.type in ['EAN13', 'EAN-13']:
-                    code = barcode.data.decode('utf-8')
-                    if (code.startswith('978') or code.startswith('979')) and self.validate_isbn(code):
-                        isbns.append(code)
+    def _working_scales(self, image: np.ndarray) -> List[float]:
+        """縮小率のリスト（小さい順、最後は1.0または max_escalation_size に収まる縮小率）"""
+        long_side = max(image.shape[:2])
+        final = 1.0
+        if self.max_escalation_size and long_side > self.max_escalation_size:
+            final = self.max_escalation_size / long_side
+
+        if not self.max_working_size or long_side * final <= self.max_working_size:
+            return [final]
+
+        scales = []
+        scale = self.max_working_size / long_side
+        while scale < final:
+            scales.append(scale)
+            scale *= 2
+        scales.append(final)
+        return scales
+
+    def _detect_at(
+        self,
+        image: np.ndarray,
+        result: DetectionResult,
+        exhaustive: bool,
+        full_frame_stages: Optional[Iterable[str]] = None
+    ) -> Tuple[bool, Optional[Region]]:
+        """候補領域→画像全体の順に1つの解像度で検出を試す
+
+        Args:
+            full_frame_stages: 画像全体で試すステージ名（デフォルト: すべて）
+
+        Returns:
+            (検出できたか, 最初に検出できた領域)
+        """
+        found_any = False
+        hit_region = None
+
+        regions: List[Optional[Region]] = []
+        if self.localize:
+            with get_metrics().timer("detector_localize_seconds"):
+                regions.extend(self.locate_barcodes(image))
+        regions.append(None)
+
+        for region in regions:
+            if region is None:
+                if found_any and not exhaustive:
+                    break
+                crop = image
+                stages = full_frame_stages
+            else:
+                x, y, w, h = region
+                crop = image[y:y + h, x:x + w]
+                stages = self.REGION_STAGES
 
-        return list(set(isbns))
+            if self._detect_in(crop, result, exhaustive, stages):
+                if not found_any:
+                    hit_region = region
+                found_any = True
+
+            if found_any and not exhaustive:
+                break
+
+        return found_any, hit_region
+
+    def _detect_in(
+        self,
+        image: np.ndarray,
+        result: DetectionResult,
+        exhaustive: bool,
+        stages: Optional[Iterable[str]] = None
+    ) -> bool:
+        found_any = False
+        metrics = get_metrics()
+        for name, img in self._iter_stages(image, stages):
+            result.stages_tried.append(name)
+            with metrics.timer("detector_decode_seconds", stage=name):
+                found = self._decode_isbns(img)
+            if found:
+                found_any = True
+                if result.stage is None:
+                    result.stage = name
+            for code in found:
+                if code not in result.isbns:
+                    result.isbns.append(code)
+
+            if found_any and not exhaustive:
+                break
+
+        return found_any
+
+    def locate_barcodes(self, image: np.ndarray) -> List[Region]:
+        """勾配とモルフォロジー演算でバーコードらしい矩形領域を探す
+
+        縦縞・横縞（90度回転）の両方を対象とし、面積の大きい順に返す。
+        """
+        if len(image.shape) == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image
+
+        height, width = gray.shape[:2]
+        grad_x = cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3))
+        grad_y = cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3))
+
+        # バーの並び方向に長いカーネルで縞模様を塗りつぶす
+        long_side = max(9, min(height, width) // 20)
+        short_side = max(3, long_side // 3)
+
+        candidates = []
+        for gradient, kernel_size in (
+            (cv2.subtract(grad_x, grad_y), (long_side, short_side)),
+            (cv2.subtract(grad_y, grad_x), (short_side, long_side)),
+        ):
+            blurred = cv2.blur(gradient, (9, 9))
+            _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, kernel_size)
+            closed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+            closed = cv2.erode(closed, None, iterations=4)
+            closed = cv2.dilate(closed, None, iterations=4)
+
+            contours = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+            for contour in contours:
+                x, y, w, h = cv2.boundingRect(contour)
+                candidates.append((w * h, (x, y, w, h)))
+
+        min_area = height * width * 0.002
+        candidates = [c for c in candidates if min_area <= c[0] < height * width * 0.9]
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        regions = []
+        for _, (x, y, w, h) in candidates[:self.max_regions]:
+            # クワイエットゾーンを含めるため余白を付ける
+            margin_x = max(10, w // 5)
+            margin_y = max(10, h // 5)
+            x0 = max(0, x - margin_x)
+            y0 = max(0, y - margin_y)
+            x1 = min(width, x + w + margin_x)
+            y1 = min(height, y + h + margin_y)
+            regions.append((x0, y0, x1 - x0, y1 - y0))
+
+        return regions
+
+    def _iter_stages(
+        self,
+        image: np.ndarray,
+        stages: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, np.ndarray]]:
+        """前処理した画像を順に生成する（stages を指定した場合はその名前のステージだけ）"""
+        metrics = get_metrics()
+        names = None if stages is None else set(stages)
+        for name, method in self.STAGES:
+            if names is not None and name not in names:
+                continue
+            if method is None:
+                yield name, image
+            else:
+                with metrics.timer("detector_preprocess_seconds", stage=name):
+                    processed = getattr(self, method)(image)
+                yield name, processed
+
+    def _decode_isbns(self, image: np.ndarray) -> List[str]:
+        isbns = []
+        for barcode in pyzbar.decode(image):
+            if barcode.type in ['EAN13', 'EAN-13']:
+                code = barcode.data.decode('utf-8')
+                if (code.startswith('978') or code.startswith('979')) and self.validate_isbn(code):
+                    isbns.append(code)
+        return isbns
 
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
         if len(image.shape) == 3:
@@ -125,3 +443,32 @@ class ISBNDetector:
             return False
 
         return checksum % 11 == 0
+
+
+def _load_image(image: ImageSource) -> Union[Image.Image, np.ndarray]:
+    if isinstance(image, (str, Path)):
+        with Image.open(image) as img:
+            return img.convert("RGB")
+    return image
+
+
+def _detect_one(detector: ISBNDetector, index: int, image: ImageSource) -> BatchDetectionResult:
+    path = str(image) if isinstance(image, (str, Path)) else None
+    try:
+        result = detector.detect(_load_image(image))
+        return BatchDetectionResult(index=index, path=path, result=result)
+    except Exception as e:
+        return BatchDetectionResult(index=index, path=path, error=str(e))
+
+
+# ワーカープロセスごとに1つだけ生成する検出器
+_worker_detector: Optional[ISBNDetector] = None
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    global _worker_detector
+    _worker_detector = ISBNDetector(**options)
+
+
+def _detect_worker(index: int, image: ImageSource) -> BatchDetectionResult:
+    return _detect_one(_worker_detector, index, image)
@@ -0,0 +1,186 @@
+from typing import Iterable, List, Tuple, Union
+from dataclasses import dataclass
+import re
+import numpy as np
+
+_ISBN10_PATTERN = re.compile(r"[0-9]{9}[0-9X]")
+
+
+def normalize_isbn(code: str) -> str:
+    """ハイフン・空白を除去し、ISBN-10はISBN-13に変換する
+
+    チェックディジットの検証は行わない（ISBNDetector.validate_isbn を使用）。
+    ISBN-10の形式（数字9桁＋数字またはX）でない10文字の入力は変換せずに返す。
+    """
+    code = code.replace('-', '').replace(' ', '').strip().upper()
+
+    if _ISBN10_PATTERN.fullmatch(code):
+        return isbn10_to_isbn13(code)
+    return code
+
+
+def isbn10_to_isbn13(isbn: str) -> str:
+    body = "978" + isbn[:9]
+
+    checksum = 0
+    for i, digit in enumerate(body):
+        if i % 2 == 0:
+            checksum += int(digit)
+        else:
+            checksum += int(digit) * 3
+
+    check_digit = (10 - (checksum % 10)) % 10
+    return body + str(check_digit)
+
+
+# ISBN-13 の各桁の重み（チェックディジットを含めて合計が10の倍数なら正しい）
+_ISBN13_WEIGHTS = [1, 3] * 6 + [1]
+# ISBN-10 の各桁の重み（チェックディジットを含めて合計が11の倍数なら正しい）
+_ISBN10_WEIGHTS = list(range(10, 0, -1))
+_ZERO, _X, _HYPHEN, _SPACE = ord("0"), ord("X"), ord("-"), ord(" ")
+_PREFIX_978 = [ord(c) for c in "978"]
+
+ISBNArray = Union[np.ndarray, Iterable[str]]
+
+
+@dataclass
+class BulkISBNResult:
+    # 正規化したISBN-13（'<U13'）。valid が False の要素は空文字
+    isbn13: np.ndarray
+    # チェックディジットまで正しいISBN-10またはISBN-13か
+    valid: np.ndarray
+    # 入力がISBN-10だったか
+    was_isbn10: np.ndarray
+
+
+def normalize_isbns(codes: ISBNArray) -> BulkISBNResult:
+    """ISBNの配列をまとめて検証・正規化する（normalize_isbn / validate_isbn の一括版）
+
+    ハイフン・空白を除去し、ISBN-10はISBN-13に変換する。文字列操作はせず、
+    文字コードを「桁 × 件数」の行列にして桁ごとに NumPy で計算するので、
+    大量の入力でも高速。
+
+    Args:
+        codes: ISBN文字列の配列またはイテラブル
+
+    Returns:
+        入力と同じ形の配列を持つ BulkISBNResult
+    """
+    cols, lengths, shape = _to_columns(codes)
+    # 数字以外は 9 より大きくなる（uint8 の桁あふれを利用）
+    digits = cols - np.uint8(_ZERO)
+    is_digit = digits <= 9
+
+    is13 = (lengths == 13) & np.logical_and.reduce(is_digit, axis=0)
+    is13 &= _weighted_sum(digits, _ISBN13_WEIGHTS) % 10 == 0
+
+    last_is_x = cols[9] == _X
+    isbn10_sum = _weighted_sum(digits[:9], _ISBN10_WEIGHTS[:9]) + np.where(last_is_x, 10, digits[9])
+    is10 = (lengths == 10) & np.logical_and.reduce(is_digit[:9], axis=0) & (is_digit[9] | last_is_x)
+    is10 &= isbn10_sum % 11 == 0
+
+    result = np.where(is13, cols, 0).astype(np.uint8)
+    if is10.any():
+        # ISBN-10 → "978" + 先頭9桁 + チェックディジット
+        body = _weighted_sum(digits[:9, is10], _ISBN13_WEIGHTS[3:12]) + 38  # 9*1 + 7*3 + 8*1
+        converted = np.empty((13, len(body)), dtype=np.uint8)
+        converted[:3] = np.array(_PREFIX_978, dtype=np.uint8)[:, None]
+        converted[3:12] = cols[:9, is10]
+        converted[12] = _ZERO + (10 - body % 10) % 10
+        result[:, is10] = converted
+
+    return BulkISBNResult(
+        isbn13=_from_columns(result).reshape(shape),
+        valid=(is13 | is10).reshape(shape),
+        was_isbn10=is10.reshape(shape),
+    )
+
+
+def validate_isbns(codes: ISBNArray) -> np.ndarray:
+    """各要素が正しいISBN-10またはISBN-13かを表すbool配列"""
+    return normalize_isbns(codes).valid
+
+
+def isbns_to_isbn10(codes: ISBNArray) -> Tuple[np.ndarray, np.ndarray]:
+    """ISBN（10桁・13桁どちらでも可）の配列をISBN-10に変換する
+
+    Returns:
+        (ISBN-10の配列, 変換できたかを表すbool配列)。979で始まるISBNや
+        不正なISBNは変換できないので空文字になる
+    """
+    normalized = normalize_isbns(codes)
+    shape = normalized.isbn13.shape
+    cols, _, _ = _to_columns(normalized.isbn13)
+    convertible = normalized.valid.reshape(-1)
+    for i, code in enumerate(_PREFIX_978):
+        convertible &= cols[i] == code
+
+    body = cols[3:12] - np.uint8(_ZERO)
+    check = (11 - _weighted_sum(body, _ISBN10_WEIGHTS[:9]) % 11) % 11
+    isbn10 = np.zeros_like(cols)
+    isbn10[:9] = cols[3:12]
+    isbn10[9] = np.where(check == 10, _X, _ZERO + check)
+    isbn10[:, ~convertible] = 0
+
+    return _from_columns(isbn10).reshape(shape), convertible.reshape(shape)
+
+
+def _weighted_sum(digits: np.ndarray, weights: List[int]) -> np.ndarray:
+    total = np.zeros(digits.shape[1], dtype=np.uint16)
+    for row, weight in zip(digits, weights):
+        total += row * np.uint16(weight)
+    return total
+
+
+def _to_columns(codes: ISBNArray) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+    """文字列配列を区切り文字を除いた文字コード（uint8）の (13, 件数) 行列に変換する
+
+    ASCII以外の文字は 255 にする（どのチェックにも通らない）。
+
+    Returns:
+        (文字コード行列, 区切り文字を除いた長さ（13文字を超える場合は14）, 入力の形)
+    """
+    array = np.asarray(codes if isinstance(codes, np.ndarray) else list(codes), dtype=str)
+    shape = array.shape
+    flat = np.ascontiguousarray(array.reshape(-1))
+    count = len(flat)
+    width = max(flat.dtype.itemsize // 4, 1)
+
+    code_points = flat.view(np.uint32).reshape(count, width)
+    rows = code_points.astype(np.uint8)
+    if count and code_points.max() > 127:
+        rows[code_points > 127] = 255
+    # 桁ごとに連続したメモリになるよう (文字位置, 件数) に並べ替える
+    chars = np.ascontiguousarray(rows.T)
+
+    # validate_isbn と同じくハイフンと空白だけを取り除く（末尾の0埋めも含む）。タブなどは不正な文字として残す
+    drop = (chars == 0) | (chars == _SPACE) | (chars == _HYPHEN)
+    chars[drop] = 0
+    # 取り除く文字の後ろに残す文字がある場合だけ詰め直す（末尾の0埋めはそのままでよい）
+    if (drop[:-1] & ~drop[1:]).any():
+        chars = _compact(chars, drop)
+
+    cols = chars[:13] if width >= 13 else np.pad(chars, ((0, 13 - width), (0, 0)))
+    cols = np.ascontiguousarray(cols)
+    # 小文字の x はチェックディジットの X とみなす
+    cols[cols == ord("x")] = _X
+
+    lengths = np.count_nonzero(cols, axis=0)
+    if width > 13:
+        # 13文字を超える入力は長さだけで不正と判定できる
+        lengths[chars[13] != 0] = 14
+    return cols, lengths, shape
+
+
+def _compact(chars: np.ndarray, drop: np.ndarray) -> np.ndarray:
+    """各列から drop の文字を取り除いて先頭に詰める（drop の位置は0になっていること）
+
+    残す文字（False）が前に来るよう列ごとに安定ソートした順序で並べ替えるので、
+    文字の順番は保たれ、取り除いた文字（0）は末尾に集まる。
+    """
+    order = np.argsort(drop, axis=0, kind="stable")
+    return np.take_along_axis(chars, order, axis=0)
+
+
+def _from_columns(cols: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(cols.T, dtype=np.uint32).view("<U13").reshape(-1)
@@ -0,0 +1,200 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import bisect
+import json
+import threading
+import time
+
+
+# 処理時間のヒストグラムの境界（秒）
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class TimerStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    # buckets[i] は Metrics.buckets[i] 以下に入った回数（累積ではない）。最後の要素は +Inf
+    buckets: List[int] = field(default_factory=list)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    """処理時間（タイマー）と回数（カウンター）をラベルごとに集計する
+
+    スレッド間で共有でき、Prometheus のテキスト形式またはJSONで書き出せる。
+
+    例:
+        metrics = get_metrics()
+        with metrics.timer("lookup_source_seconds", source="amazon"):
+            book = amazon.get_book_info(isbn)
+        metrics.inc("lookup_cache_total", layer="memory", result="hit")
+    """
+
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        """
+        Args:
+            buckets: タイマーのヒストグラムの境界（秒、昇順）
+            clock: 経過時間の計測に使う関数（テスト用）
+        """
+        self.buckets = tuple(buckets)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._timers: Dict[Tuple[str, Labels], TimerStats] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, self._labels(labels))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            stats = self._timers.get(key)
+            if stats is None:
+                stats = TimerStats(buckets=[0] * (len(self.buckets) + 1))
+                self._timers[key] = stats
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.buckets[index] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """with ブロックの処理時間を記録する（例外が発生した場合も記録する）"""
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(name, self.clock() - started, **labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get((name, self._labels(labels)), 0)
+
+    def timer_stats(self, name: str, **labels: str) -> Optional[TimerStats]:
+        with self._lock:
+            stats = self._timers.get((name, self._labels(labels)))
+            if stats is None:
+                return None
+            return TimerStats(stats.count, stats.total, stats.max, list(stats.buckets))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """現在の集計値。JSONにそのまま変換できる"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted((key, TimerStats(s.count, s.total, s.max, list(s.buckets))) for key, s in self._timers.items())
+
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in counters
+            ],
+            "timers": [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": stats.count,
+                    "sum": stats.total,
+                    "mean": stats.mean,
+                    "max": stats.max,
+                    "buckets": {
+                        str(bound): count
+                        for bound, count in zip(self.buckets + ("+Inf",), self._cumulative(stats.buckets))
+                    },
+                }
+                for (name, labels), stats in timers
+            ],
+        }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = "isbn_reader_") -> str:
+        """Prometheus のテキスト形式（タイマーは histogram、カウンターは counter）"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        declared = set()
+        for counter in snapshot["counters"]:
+            name = prefix + counter["name"]
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{self._format_labels(counter['labels'])} {counter['value']:g}")
+
+        for timer in snapshot["timers"]:
+            name = prefix + timer["name"]
+            if name not in declared:
+                lines.append(f"# TYPE {name} histogram")
+                declared.add(name)
+            for bound, count in timer["buckets"].items():
+                labels = self._format_labels({**timer["labels"], "le": bound})
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = self._format_labels(timer["labels"])
+            lines.append(f"{name}_sum{labels} {timer['sum']:.6f}")
+            lines.append(f"{name}_count{labels} {timer['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(labels: Dict[str, str]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _cumulative(buckets: List[int]) -> List[int]:
+        total = 0
+        result = []
+        for count in buckets:
+            total += count
+            result.append(total)
+        return result
+
+    @staticmethod
+    def _format_labels(labels: Dict[str, str]) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_shared_metrics: Optional[Metrics] = None
+_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """プロセス内で共有する Metrics を返す"""
+    global _shared_metrics
+    if _shared_metrics is None:
+        with _lock:
+            if _shared_metrics is None:
+                _shared_metrics = Metrics()
+    return _shared_metrics
+
+
+def set_metrics(metrics: Optional[Metrics]) -> None:
+    """共有 Metrics を差し替える（Noneの場合は次回 get_metrics で再作成）"""
+    global _shared_metrics
+    with _lock:
+        _shared_metrics = metrics
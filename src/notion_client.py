@@ -1,12 +1,79 @@
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, List, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+import threading
+import time
 import requests
+from src.http_session import get_session
+from src.isbn_utils import normalize_isbn
+from src.metrics import get_metrics
+from src.notion_index import NotionISBNIndex
 from src.openbd_client import BookInfo
+from src.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+# 既存ページがある場合の動作
+ON_EXISTING_UPDATE = "update"
+ON_EXISTING_SKIP = "skip"
+
+
+@dataclass
+class NotionIngestResult:
+    """add_books_to_database の1冊ごとの結果"""
+    index: int
+    book: BookInfo
+    page: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # "created" / "updated" / "skipped"（失敗時はNone）
+    action: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class NotionClient:
-    def __init__(self, api_token: Optional[str] = None):
+    BASE_URL = "https://api.notion.com/v1"
+
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        timeout: float = 10,
+        schema_ttl: float = 5 * 60,
+        clock: Callable[[], float] = time.monotonic,
+        index: Optional[NotionISBNIndex] = None,
+        base_url: Optional[str] = None,
+        index_ttl: Optional[float] = 15 * 60
+    ):
+        """
+        Args:
+            api_token: Notion Integration のシークレットトークン
+            session: 使用するHTTPセッション（デフォルト: 共有セッション）
+            timeout: タイムアウト（秒）
+            schema_ttl: データベースのプロパティ型をキャッシュする期間（秒）
+            clock: 現在時刻を返す関数（テスト用）
+            index: upsert に使うISBN → ページIDのインデックス（デフォルト: 初回の upsert 時に作成）
+            base_url: APIのベースURL（デフォルト: BASE_URL）
+            index_ttl: インデックスを同期し直すまでの期間（秒）。期間が過ぎると前回の同期以降に
+                編集されたページだけを取得して反映する。Notion上で直接追加・編集されたページは
+                この期間が過ぎるまで反映されない。Noneの場合は最初の1回だけ同期する
+        """
         self.api_token = api_token
-        self.base_url = "https://api.notion.com/v1"
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.schema_ttl = schema_ttl
+        self.clock = clock
+        self._schema_lock = threading.Lock()
+        self._schemas: Dict[str, Tuple[Dict[str, str], float]] = {}
+        self.index = index
+        self.index_ttl = index_ttl
+        self._flight = SingleFlight()
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
         self.headers = {
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json",
@@ -16,8 +83,17 @@ class NotionClient:
     def add_book_to_database(
         self,
         database_id: str,
-        book: BookInfo
+        book: BookInfo,
+        on_existing: Optional[str] = None
     ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """書籍を登録する
+
+        Args:
+            database_id: 登録先のデータベースID
+            book: 書籍情報
+            on_existing: 同じISBNのページがある場合の動作。"update" で更新、"skip" で何もしない、
+                None の場合は常に新しいページを作成する
+        """
         if not self.api_token:
             return None, "APIトークンが設定されていません"
 
@@ -27,37 +103,298 @@ class NotionClient:
                 return None, "データベースIDの形式が正しくありません"
 
             property_types = self.get_property_mapping(database_id)
-            print(f"[DEBUG] Property types detected: {property_types}")
-            print(f"[DEBUG] Book data - Pages: {book.page_count}, Published: {book.published_date}")
-            properties = self._build_properties(book, property_types)
-            print(f"[DEBUG] Properties to send: {list(properties.keys())}")
-
-            data = {
-                "parent": {"database_id": clean_db_id},
-                "properties": properties
-            }
+            logger.debug("Property types detected: %s", property_types)
+            if on_existing is not None:
+                error = self._ensure_index(clean_db_id)
+                if error:
+                    return None, error
+            page, error, _ = self._ingest(clean_db_id, book, property_types, on_existing)
+            return page, error
+
+        except Exception as e:
+            return None, f"エラー: {str(e)}"
+
+    def add_books_to_database(
+        self,
+        database_id: str,
+        books: Iterable[BookInfo],
+        max_workers: int = 3,
+        on_existing: Optional[str] = None
+    ) -> List[NotionIngestResult]:
+        """複数の書籍をまとめて登録する
+
+        プロパティ型の取得はデータベースごとに1回だけ行い、ページ作成は
+        max_workers 件まで並行して送る（Notionのレート制限は共有セッションで守られる）。
+
+        Args:
+            database_id: 登録先のデータベースID
+            books: 登録する書籍情報
+            max_workers: 同時に送るリクエスト数の上限
+            on_existing: 同じISBNのページがある場合の動作（add_book_to_database と同じ）
+
+        Returns:
+            入力と同じ順序の1冊ごとの結果
+        """
+        books = list(books)
+        if not self.api_token:
+            return [NotionIngestResult(i, book, error="APIトークンが設定されていません") for i, book in enumerate(books)]
+
+        clean_db_id = self._clean_database_id(database_id)
+        if not clean_db_id:
+            return [NotionIngestResult(i, book, error="データベースIDの形式が正しくありません") for i, book in enumerate(books)]
+
+        property_types = self.get_property_mapping(database_id)
+        logger.debug("Property types detected: %s", property_types)
+
+        if on_existing is not None:
+            error = self._ensure_index(clean_db_id)
+            if error:
+                return [NotionIngestResult(i, book, error=error) for i, book in enumerate(books)]
+
+        def ingest(index: int, book: BookInfo) -> NotionIngestResult:
+            try:
+                page, error, action = self._ingest(clean_db_id, book, property_types, on_existing)
+            except Exception as e:
+                page, error, action = None, f"エラー: {str(e)}", None
+            return NotionIngestResult(index, book, page, error, action)
+
+        if max_workers <= 1 or len(books) <= 1:
+            return [ingest(i, book) for i, book in enumerate(books)]
 
-            if book.cover_image_url:
-                data["cover"] = {
-                    "type": "external",
-                    "external": {"url": book.cover_image_url}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(ingest, range(len(books)), books))
+
+    def sync_index(self, database_id: str) -> Tuple[Optional[int], Optional[str]]:
+        """データベースの全ページを取得してISBNインデックスを作り直す
+
+        Returns:
+            (インデックスに登録したISBNの数, エラーメッセージ)
+        """
+        if not self.api_token:
+            return None, "APIトークンが設定されていません"
+
+        clean_db_id = self._clean_database_id(database_id)
+        if not clean_db_id:
+            return None, "データベースIDの形式が正しくありません"
+
+        return self._flight.do(("sync", clean_db_id), lambda: self._sync_index(clean_db_id))
+
+    def _sync_index(self, clean_db_id: str, incremental: bool = False) -> Tuple[Optional[int], Optional[str]]:
+        """incremental が True で同期済みなら、前回の同期以降に編集されたページだけを反映する"""
+        index = self._get_index()
+        since = index.synced_at(clean_db_id) if incremental else None
+        # 取得中に編集されたページを次回の同期で取りこぼさないよう、問い合わせる前の時刻を記録する
+        started_at = time.time()
+
+        with get_metrics().timer("notion_sync_seconds", mode="full" if since is None else "incremental"):
+            pages, error = self._query_pages(clean_db_id, since)
+        if error:
+            return None, error
+
+        if since is None:
+            isbns: Dict[str, str] = {}
+            for page_id, isbn in pages:
+                if isbn:
+                    isbns.setdefault(isbn, page_id)
+            index.replace(clean_db_id, isbns, synced_at=started_at)
+            logger.debug("Notion index synced: %d ISBNs", len(isbns))
+            return len(isbns), None
+
+        index.update(clean_db_id, pages, synced_at=started_at)
+        logger.debug("Notion index updated: %d edited pages", len(pages))
+        return sum(1 for _, isbn in pages if isbn), None
+
+    def _query_pages(
+        self,
+        clean_db_id: str,
+        edited_since: Optional[float] = None
+    ) -> Tuple[List[Tuple[str, Optional[str]]], Optional[str]]:
+        """データベースのページを (ページID, ISBN) のリストで返す
+
+        Args:
+            edited_since: この時刻（UNIX時間）以降に編集されたページだけを取得する（デフォルト: すべて）
+        """
+        pages: List[Tuple[str, Optional[str]]] = []
+        cursor = None
+        while True:
+            body: Dict[str, Any] = {"page_size": 100}
+            if edited_since is not None:
+                body["filter"] = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": self._edited_time_filter(edited_since)}
                 }
+            if cursor:
+                body["start_cursor"] = cursor
+
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/databases/{clean_db_id}/query",
+                    headers=self.headers,
+                    json=body,
+                    timeout=self.timeout
+                )
+                if response.status_code != 200:
+                    return [], f"Status {response.status_code}: {response.text}"
+
+                data = response.json()
+            except (requests.RequestException, ValueError) as e:
+                return [], f"エラー: {str(e)}"
+
+            for page in data.get("results", []):
+                # アーカイブされたページはインデックスから外す
+                isbn = None if page.get("archived") else self._page_isbn(page)
+                pages.append((page["id"], isbn))
+
+            cursor = data.get("next_cursor")
+            if not data.get("has_more") or not cursor:
+                break
+
+        return pages, None
+
+    @staticmethod
+    def _edited_time_filter(since: float) -> str:
+        """last_edited_time のフィルターに使う時刻（ISO 8601）
+
+        last_edited_time は分単位に切り捨てられるので、since の1分前の分の始めから取得する。
+        """
+        start = datetime.fromtimestamp(since - 60, tz=timezone.utc).replace(second=0, microsecond=0)
+        return start.isoformat()
+
+    def _get_index(self) -> NotionISBNIndex:
+        if self.index is None:
+            self.index = NotionISBNIndex()
+        return self.index
+
+    def _ensure_index(self, clean_db_id: str) -> Optional[str]:
+        """まだ同期していないデータベースなら全ページを同期し、index_ttl より前に同期していれば
+        その後に編集されたページだけを反映する"""
+        synced_at = self._get_index().synced_at(clean_db_id)
+        if synced_at is not None and (self.index_ttl is None or time.time() - synced_at < self.index_ttl):
+            return None
+        _, error = self._flight.do(
+            ("sync", clean_db_id), lambda: self._sync_index(clean_db_id, incremental=True)
+        )
+        return error
+
+    @staticmethod
+    def _page_isbn(page: Dict[str, Any]) -> Optional[str]:
+        prop = page.get("properties", {}).get("ISBN")
+        if not prop:
+            return None
+
+        if prop.get("type") == "number":
+            value = prop.get("number")
+            text = str(int(value)) if value is not None else ""
+            # 数値型では先頭の0が落ちるので、ISBN-10 の桁数に戻す（例: 0306406152 → 306406152）
+            if 0 < len(text) < 10:
+                text = text.zfill(10)
+        else:
+            text = "".join(part.get("plain_text", "") for part in prop.get("rich_text", []))
+
+        isbn = normalize_isbn(text)
+        return isbn if len(isbn) == 13 and isbn.isdigit() else None
+
+    def _ingest(
+        self,
+        clean_db_id: str,
+        book: BookInfo,
+        property_types: Optional[Dict[str, str]],
+        on_existing: Optional[str]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[str]]:
+        """Returns: (ページ, エラーメッセージ, 実行した操作)"""
+        if on_existing is None or not book.isbn:
+            page, error = self._create_page(clean_db_id, book, property_types)
+            return page, error, "created" if page else None
+
+        # 同じISBNを同時に登録しようとした場合は1回だけ作成する
+        key = (clean_db_id, normalize_isbn(book.isbn))
+        return self._flight.do(key, lambda: self._upsert(clean_db_id, book, property_types, on_existing))
+
+    def _upsert(
+        self,
+        clean_db_id: str,
+        book: BookInfo,
+        property_types: Optional[Dict[str, str]],
+        on_existing: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[str]]:
+        index = self._get_index()
+        page_id = index.get(clean_db_id, book.isbn)
+        if page_id:
+            if on_existing == ON_EXISTING_SKIP:
+                return {"id": page_id}, None, "skipped"
+
+            status_code, page, error = self._update_page(page_id, book, property_types)
+            if status_code != 404:
+                return page, error, "updated" if page else None
+
+            # Notion側でページが削除されていた
+            index.delete(clean_db_id, book.isbn)
+
+        page, error = self._create_page(clean_db_id, book, property_types)
+        if page:
+            index.set(clean_db_id, book.isbn, page["id"])
+        return page, error, "created" if page else None
+
+    def _create_page(
+        self,
+        clean_db_id: str,
+        book: BookInfo,
+        property_types: Optional[Dict[str, str]]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        data = self._page_data(book, property_types)
+        data["parent"] = {"database_id": clean_db_id}
 
-            response = requests.post(
+        metrics = get_metrics()
+        with metrics.timer("notion_write_seconds", action="create"):
+            response = self.session.post(
                 f"{self.base_url}/pages",
                 headers=self.headers,
                 json=data,
-                timeout=10
+                timeout=self.timeout
             )
 
-            if response.status_code in [200, 201]:
-                return response.json(), None
-            else:
-                error_msg = f"Status {response.status_code}: {response.text}"
-                return None, error_msg
+        ok = response.status_code in [200, 201]
+        metrics.inc("notion_write_total", action="create", result="ok" if ok else "error")
+        if ok:
+            return response.json(), None
+        else:
+            error_msg = f"Status {response.status_code}: {response.text}"
+            return None, error_msg
 
-        except Exception as e:
-            return None, f"エラー: {str(e)}"
+    def _update_page(
+        self,
+        page_id: str,
+        book: BookInfo,
+        property_types: Optional[Dict[str, str]]
+    ) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+        metrics = get_metrics()
+        with metrics.timer("notion_write_seconds", action="update"):
+            response = self.session.patch(
+                f"{self.base_url}/pages/{page_id}",
+                headers=self.headers,
+                json=self._page_data(book, property_types),
+                timeout=self.timeout
+            )
+
+        metrics.inc("notion_write_total", action="update", result="ok" if response.status_code == 200 else "error")
+        if response.status_code == 200:
+            return response.status_code, response.json(), None
+        return response.status_code, None, f"Status {response.status_code}: {response.text}"
+
+    def _page_data(self, book: BookInfo, property_types: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        logger.debug("Book data - Pages: %s, Published: %s", book.page_count, book.published_date)
+        properties = self._build_properties(book, property_types)
+        logger.debug("Properties to send: %s", list(properties.keys()))
+
+        data: Dict[str, Any] = {"properties": properties}
+
+        if book.cover_image_url:
+            data["cover"] = {
+                "type": "external",
+                "external": {"url": book.cover_image_url}
+            }
+
+        return data
 
     def _clean_database_id(self, database_id: str) -> Optional[str]:
         import re
@@ -178,19 +515,40 @@ class NotionClient:
 
         return properties
 
-    def get_property_mapping(self, database_id: str) -> Optional[Dict[str, str]]:
+    def get_property_mapping(self, database_id: str, refresh: bool = False) -> Optional[Dict[str, str]]:
+        """データベースのプロパティ名 → 型。取得結果は schema_ttl の間キャッシュする
+
+        Args:
+            database_id: データベースID
+            refresh: Trueの場合、キャッシュを使わずに取得し直す
+        """
         if not self.api_token:
             return None
 
-        try:
-            clean_db_id = self._clean_database_id(database_id)
-            if not clean_db_id:
-                return None
+        clean_db_id = self._clean_database_id(database_id)
+        if not clean_db_id:
+            return None
 
-            response = requests.get(
+        if not refresh:
+            with self._schema_lock:
+                cached = self._schemas.get(clean_db_id)
+            if cached is not None and self.clock() < cached[1]:
+                get_metrics().inc("notion_schema_cache_total", result="hit")
+                return cached[0]
+
+        get_metrics().inc("notion_schema_cache_total", result="miss")
+        property_types = self._fetch_property_mapping(clean_db_id)
+        if property_types is not None:
+            with self._schema_lock:
+                self._schemas[clean_db_id] = (property_types, self.clock() + self.schema_ttl)
+        return property_types
+
+    def _fetch_property_mapping(self, clean_db_id: str) -> Optional[Dict[str, str]]:
+        try:
+            response = self.session.get(
                 f"{self.base_url}/databases/{clean_db_id}",
                 headers=self.headers,
-                timeout=10
+                timeout=self.timeout
             )
 
             if response.status_code == 200:
@@ -0,0 +1,143 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import os
+import sqlite3
+import time
+
+from src.isbn_utils import normalize_isbn
+
+
+class NotionISBNIndex:
+    """NotionデータベースごとのISBN → ページIDの対応をSQLiteファイルに保存する
+
+    NotionClient が登録・更新のたびに書き込むので、再スキャン時に
+    Notionへ問い合わせなくても既存のページがあるか判定できる。
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "isbn-book-reader", "notion_index.sqlite3")
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: インデックスファイルのパス（":memory:" は使用不可）
+        """
+        self.path = path or self.DEFAULT_PATH
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    database_id TEXT NOT NULL,
+                    isbn TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    PRIMARY KEY (database_id, isbn)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS databases (
+                    database_id TEXT PRIMARY KEY,
+                    synced_at REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, database_id: str, isbn: str) -> Optional[str]:
+        """ISBNに対応するページID。登録されていなければNone"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT page_id FROM pages WHERE database_id = ? AND isbn = ?",
+                (database_id, normalize_isbn(isbn))
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, database_id: str, isbn: str, page_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (database_id, isbn, page_id) VALUES (?, ?, ?)",
+                (database_id, normalize_isbn(isbn), page_id)
+            )
+
+    def delete(self, database_id: str, isbn: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM pages WHERE database_id = ? AND isbn = ?",
+                (database_id, normalize_isbn(isbn))
+            )
+
+    def replace(self, database_id: str, pages: Dict[str, str], synced_at: Optional[float] = None) -> None:
+        """データベースの対応をすべて置き換え、同期済みとして記録する
+
+        Args:
+            database_id: データベースID
+            pages: ISBN → ページID
+            synced_at: 同期した時刻（デフォルト: 現在時刻）
+        """
+        rows = [(database_id, normalize_isbn(isbn), page_id) for isbn, page_id in pages.items()]
+        with self._connect() as conn:
+            conn.execute("DELETE FROM pages WHERE database_id = ?", (database_id,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO pages (database_id, isbn, page_id) VALUES (?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO databases (database_id, synced_at) VALUES (?, ?)",
+                (database_id, time.time() if synced_at is None else synced_at)
+            )
+
+    def update(
+        self,
+        database_id: str,
+        pages: List[Tuple[str, Optional[str]]],
+        synced_at: Optional[float] = None
+    ) -> None:
+        """前回の同期以降に編集されたページだけを反映し、同期済みとして記録する
+
+        ISBNが書き換えられたページの古い対応は削除する。同じISBNのページが既にある場合は
+        replace と同じく先に登録されていたページを残す。
+
+        Args:
+            database_id: データベースID
+            pages: (ページID, ISBN) のリスト。ISBNがないページはNone
+            synced_at: 同期した時刻（デフォルト: 現在時刻）
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM pages WHERE database_id = ? AND page_id = ?",
+                [(database_id, page_id) for page_id, _ in pages]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO pages (database_id, isbn, page_id) VALUES (?, ?, ?)",
+                [(database_id, normalize_isbn(isbn), page_id) for page_id, isbn in pages if isbn]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO databases (database_id, synced_at) VALUES (?, ?)",
+                (database_id, time.time() if synced_at is None else synced_at)
+            )
+
+    def synced_at(self, database_id: str) -> Optional[float]:
+        """最後に replace / update した時刻（UNIX時間）。一度も同期していなければNone"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT synced_at FROM databases WHERE database_id = ?",
+                (database_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def count(self, database_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM pages WHERE database_id = ?",
+                (database_id,)
+            ).fetchone()[0]
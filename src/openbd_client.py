@@ -1,6 +1,9 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable
 from dataclasses import dataclass
+import asyncio
+import httpx
 import requests
+from src.http_session import create_async_client, get_session
 
 
 @dataclass
@@ -19,12 +22,28 @@ class BookInfo:
 class OpenBDClient:
     BASE_URL = "https://api.openbd.jp/v1"
 
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float = 10,
+        base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            session: 使用するHTTPセッション（デフォルト: 共有セッション）
+            timeout: タイムアウト（秒）
+            base_url: APIのベースURL（デフォルト: BASE_URL。ベンチマーク用のモックサーバーなどに向ける場合に指定）
+        """
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+
     def get_book_info(self, isbn: str) -> Optional[BookInfo]:
         try:
-            response = requests.get(
-                f"{self.BASE_URL}/get",
+            response = self.session.get(
+                f"{self.base_url}/get",
                 params={"isbn": isbn},
-                timeout=10
+                timeout=self.timeout
             )
 
             if response.status_code != 200:
@@ -40,6 +59,42 @@ class OpenBDClient:
         except Exception:
             return None
 
+    def get_many(self, isbns: Iterable[str], chunk_size: int = 100) -> Dict[str, Optional[BookInfo]]:
+        """複数のISBNをカンマ区切りでまとめて問い合わせる
+
+        Args:
+            isbns: ISBNのイテラブル（重複は1回だけ問い合わせる）
+            chunk_size: 1リクエストあたりのISBN数
+
+        Returns:
+            ISBN → 書籍情報の辞書。見つからなかったISBN・失敗したリクエスト分はNone
+        """
+        unique_isbns = list(dict.fromkeys(isbns))
+        results: Dict[str, Optional[BookInfo]] = {isbn: None for isbn in unique_isbns}
+
+        for start in range(0, len(unique_isbns), chunk_size):
+            chunk = unique_isbns[start:start + chunk_size]
+            try:
+                response = self.session.get(
+                    f"{self.base_url}/get",
+                    params={"isbn": ",".join(chunk)},
+                    timeout=self.timeout
+                )
+
+                if response.status_code != 200:
+                    continue
+
+                data = response.json()
+
+                # レスポンスはリクエストしたISBNと同じ順番の配列
+                for isbn, item in zip(chunk, data or []):
+                    results[isbn] = self._parse_response(item)
+
+            except Exception:
+                continue
+
+        return results
+
     def _parse_response(self, data: Optional[Dict[str, Any]]) -> Optional[BookInfo]:
         if not data:
             return None
@@ -100,3 +155,68 @@ class OpenBDClient:
 
         except Exception:
             return None
+
+
+class AsyncOpenBDClient(OpenBDClient):
+    """OpenBDClient の asyncio 版（レスポンスの解析処理は共通）"""
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 10,
+        base_url: Optional[str] = None
+    ):
+        self.client = client or create_async_client()
+        self.timeout = timeout
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+
+    async def get_book_info(self, isbn: str) -> Optional[BookInfo]:
+        try:
+            response = await self.client.get(
+                f"{self.base_url}/get",
+                params={"isbn": isbn},
+                timeout=self.timeout
+            )
+
+            if response.status_code != 200:
+                return None
+
+            data = response.json()
+
+            if not data or data[0] is None:
+                return None
+
+            return self._parse_response(data[0])
+
+        except Exception:
+            return None
+
+    async def get_many(self, isbns: Iterable[str], chunk_size: int = 100) -> Dict[str, Optional[BookInfo]]:
+        unique_isbns = list(dict.fromkeys(isbns))
+        results: Dict[str, Optional[BookInfo]] = {isbn: None for isbn in unique_isbns}
+
+        async def fetch_chunk(chunk: List[str]) -> None:
+            try:
+                response = await self.client.get(
+                    f"{self.base_url}/get",
+                    params={"isbn": ",".join(chunk)},
+                    timeout=self.timeout
+                )
+
+                if response.status_code != 200:
+                    return
+
+                for isbn, item in zip(chunk, response.json() or []):
+                    results[isbn] = self._parse_response(item)
+
+            except Exception:
+                return
+
+        await asyncio.gather(*(
+            fetch_chunk(unique_isbns[start:start + chunk_size])
+            for start in range(0, len(unique_isbns), chunk_size)
+        ))
+        return results
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,188 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+from dataclasses import dataclass
+import queue
+import threading
+import time
+
+
+@dataclass
+class Stage:
+    """パイプラインの1段。fn を workers 個のスレッドで並行に実行する"""
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    processed: int = 0
+    # fn の実行に費やした合計時間（秒）。workers 個のスレッドの合計
+    busy_seconds: float = 0.0
+
+
+# ステージの終了を次のステージに伝える目印
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Pipeline:
+    """ソースと複数のステージを上限付きキューでつなぎ、並行に実行する
+
+    各ステージは前のステージのキューから取り出して次のキューに入れる。
+    キューが一杯になると前のステージが待たされるので、遅いステージに
+    合わせて上流の処理（画像の読み込みなど）も抑えられる。
+    出力は完了した順になるので、必要なら各要素に入力順の番号を持たせる。
+
+    例:
+        pipeline = Pipeline(
+            lambda: detector.detect_many(paths),   # CPU: プロセスプール
+            [Stage("lookup", lookup, workers=8),    # I/O: スレッド
+             Stage("notion", push, workers=2)],     # レート制限付きの書き込み
+        )
+        for item in pipeline.run():
+            ...
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], Iterable[Any]],
+        stages: List[Stage],
+        queue_size: int = 32
+    ):
+        """
+        Args:
+            source: 最初のステージに渡す要素を生成する関数（専用スレッドで実行する）
+            stages: 順番に適用するステージ
+            queue_size: ステージ間のキューの上限
+        """
+        self.source = source
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats: Dict[str, StageStats] = {}
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+
+    def run(self) -> Iterator[Any]:
+        """最後のステージの結果を完了した順に返す
+
+        ソースやステージで例外が発生した場合は、残りの処理を止めてその例外を送出する。
+        """
+        self._stop.clear()
+        self.stats = {"source": StageStats(), **{stage.name: StageStats() for stage in self.stages}}
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        threads = [threading.Thread(target=self._run_source, args=(queues[0],), daemon=True)]
+        for i, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._run_stage,
+                    args=(i, queues[i], queues[i + 1], remaining, lock),
+                    daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+
+        output = queues[-1]
+        try:
+            while True:
+                item = output.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def utilization(self, elapsed: float) -> Dict[str, float]:
+        """各ステージのワーカーが処理中だった割合（0〜1）"""
+        workers = {"source": 1, **{stage.name: stage.workers for stage in self.stages}}
+        return {
+            name: stats.busy_seconds / (elapsed * workers[name]) if elapsed > 0 else 0.0
+            for name, stats in self.stats.items()
+        }
+
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> bool:
+        """キューに空きが出るまで待って入れる。停止した場合はFalse"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: "queue.Queue[Any]") -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _record(self, name: str, seconds: float) -> None:
+        with self._stats_lock:
+            stats = self.stats[name]
+            stats.processed += 1
+            stats.busy_seconds += seconds
+
+    def _run_source(self, out: "queue.Queue[Any]") -> None:
+        try:
+            started = time.perf_counter()
+            for item in self.source():
+                self._record("source", time.perf_counter() - started)
+                if not self._put(out, item):
+                    return
+                started = time.perf_counter()
+        except BaseException as e:
+            self._put(out, _Failure(e))
+            return
+        # 次のステージの各ワーカーに終了を伝える
+        for _ in range(self.stages[0].workers if self.stages else 1):
+            self._put(out, _DONE)
+
+    def _run_stage(
+        self,
+        index: int,
+        inbox: "queue.Queue[Any]",
+        out: "queue.Queue[Any]",
+        remaining: List[int],
+        lock: threading.Lock
+    ) -> None:
+        stage = self.stages[index]
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                # 上流の失敗はそのまま出力まで流す
+                self._put(out, item)
+                continue
+
+            started = time.perf_counter()
+            try:
+                result = stage.fn(item)
+            except BaseException as e:
+                self._put(out, _Failure(e))
+                continue
+            self._record(stage.name, time.perf_counter() - started)
+            if not self._put(out, result):
+                return
+
+        # 最後に終了したワーカーが次のステージに終了を伝える
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            next_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            for _ in range(next_workers):
+                self._put(out, _DONE)
@@ -0,0 +1,167 @@
+from typing import Callable, Dict, Optional, Tuple
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import random
+import threading
+import time
+
+
+# ホストごとの (1秒あたりのリクエスト数, バースト数)
+DEFAULT_HOST_LIMITS: Dict[str, Tuple[float, int]] = {
+    "www.amazon.co.jp": (1.0, 3),
+    "www.googleapis.com": (5.0, 10),
+    "api.openbd.jp": (10.0, 20),
+    "cover.openbd.jp": (10.0, 20),
+    "api.notion.com": (3.0, 3),
+}
+
+# 再試行するステータスコード
+RETRY_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """トークンバケットで1ホストへのリクエスト間隔を制御する
+
+    429 などを受け取ったら rate を半分に下げ、成功が続くと元の rate まで少しずつ戻す。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        min_rate: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            rate: 1秒あたりに補充するトークン数
+            capacity: バケットの容量（連続して送れるリクエスト数）
+            min_rate: 429 を受けたときに下げる rate の下限（デフォルト: rate の1/16）
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """トークンを1つ予約し、リクエストを送るまでに待つべき秒数を返す"""
+        with self._lock:
+            now = self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def penalize(self, delay: float) -> None:
+        """delay 秒間リクエストを止め、rate を下げる"""
+        with self._lock:
+            now = self._refill()
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def reward(self) -> None:
+        """成功したリクエストごとに rate を元の値へ近づける"""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self._refill()
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+    def _refill(self) -> float:
+        now = self.clock()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+        return now
+
+
+class RateLimiter:
+    """ホストごとのトークンバケットを管理する。スレッド間・クライアント間で共有できる"""
+
+    def __init__(
+        self,
+        host_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        default_limit: Tuple[float, int] = (5.0, 10),
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            host_limits: ホスト名 → (1秒あたりのリクエスト数, バースト数)
+            default_limit: host_limits にないホストの制限
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limit = default_limit
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).hostname or url
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, capacity = self.host_limits.get(host, self.default_limit)
+                bucket = TokenBucket(rate, capacity, clock=self.clock)
+                self._buckets[host] = bucket
+            return bucket
+
+
+class Backoff:
+    """Full Jitter 付きの指数バックオフ"""
+
+    def __init__(self, base: float = 0.5, cap: float = 30.0, rand: Callable[[float, float], float] = random.uniform):
+        """
+        Args:
+            base: 1回目の再試行の最大待ち時間（秒）
+            cap: 待ち時間の上限（秒）
+            rand: 乱数関数（テスト用）
+        """
+        self.base = base
+        self.cap = cap
+        self.rand = rand
+
+    def delay(self, attempt: int) -> float:
+        """attempt 回目（0始まり）の再試行までの待ち時間"""
+        return self.rand(0, min(self.cap, self.base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Retry-After ヘッダ（秒数またはHTTP日付）を待ち時間（秒）に変換する"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now if now is not None else time.time()))
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """共有セッションで使うレートリミッターを返す"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+    return _shared_limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """共有レートリミッターを差し替える（Noneの場合は次回 get_rate_limiter で再作成）"""
+    global _shared_limiter
+    with _lock:
+        _shared_limiter = limiter
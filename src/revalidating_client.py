@@ -0,0 +1,252 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+import heapq
+import logging
+import threading
+import time
+
+from src.book_api_client import BookAPIClient
+from src.isbn_utils import normalize_isbn
+from src.metrics import get_metrics
+from src.openbd_client import BookInfo
+
+
+logger = logging.getLogger(__name__)
+
+# 欠けていれば再取得で埋まる可能性がある項目（description はソースによって元々ないことが多いので含めない）
+TRACKED_FIELDS: Tuple[str, ...] = ("title", "authors", "publisher", "published_date", "page_count", "cover_image_url")
+
+
+def missing_fields(book: Optional[BookInfo]) -> Tuple[str, ...]:
+    """book で値が入っていない項目。見つからなかった場合（None）はすべての項目"""
+    if book is None:
+        return TRACKED_FIELDS
+    return tuple(name for name in TRACKED_FIELDS if not getattr(book, name))
+
+
+@dataclass
+class CacheEntry:
+    isbn: str
+    book: BookInfo
+    fetched_at: float
+    missing: Tuple[str, ...]
+
+
+class RevalidatingBookClient:
+    """キャッシュ済みの書籍情報をすぐに返し、古くなったものをバックグラウンドで取り直す
+
+    soft_ttl を過ぎたエントリも期限切れにはせずそのまま返し、同時にバックグラウンドの
+    スレッドで BookAPIClient に問い合わせ直す（stale-while-revalidate）。ページ数や表紙などが
+    欠けているエントリは incomplete_soft_ttl で早めに取り直し、欠けている項目が多いものから処理する。
+    取り直した結果に欠けている項目は前の値を引き継ぎ、それでも欠けている項目は Google Books と
+    openBD に直接問い合わせて埋める（Amazon で見つかった場合、通常の検索では他のソースを使わないため）。
+    取得に失敗した場合は前の値を残す。
+
+    例:
+        client = RevalidatingBookClient(BookAPIClient(cache=BookCache()))
+        book = client.get_book_info("9784839974206")
+    """
+
+    def __init__(
+        self,
+        client: BookAPIClient,
+        soft_ttl: float = 7 * 24 * 60 * 60,
+        incomplete_soft_ttl: float = 24 * 60 * 60,
+        background: bool = True,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            client: 問い合わせに使うクライアント
+            soft_ttl: 取り直すまでの期間（秒）
+            incomplete_soft_ttl: 欠けている項目があるエントリを取り直すまでの期間（秒）
+            background: Falseの場合はスレッドを起動せず、refresh_pending を呼んだときに取り直す
+            clock: 現在時刻（UNIX時間）を返す関数（テスト用）
+        """
+        self.client = client
+        self.soft_ttl = soft_ttl
+        self.incomplete_soft_ttl = incomplete_soft_ttl
+        self.background = background
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._entries: Dict[str, CacheEntry] = {}
+        # (-欠けている項目数, 追加順, キー) のヒープ
+        self._queue: List[Tuple[int, int, str]] = []
+        self._queued: Set[str] = set()
+        self._sequence = 0
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def get_book_info(self, isbn: str) -> Optional[BookInfo]:
+        """書籍情報を返す。キャッシュにあれば取り直しを待たずに返す"""
+        key = normalize_isbn(isbn)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            get_metrics().inc("revalidate_cache_total", result="miss")
+            book = self.client.get_book_info(isbn)
+            # 各ソースは通信エラーでも None を返すので、見つからなかった結果は覚えずに次回また問い合わせる
+            if book is None:
+                return None
+            entry = self._remember(key, isbn, book, self._persisted_at(isbn))
+        else:
+            get_metrics().inc("revalidate_cache_total", result="stale" if self.is_stale(entry) else "fresh")
+
+        # 永続キャッシュから読んだ場合は、初回でも古いことがある
+        if self.is_stale(entry):
+            self._schedule(key, entry)
+        return entry.book
+
+    def is_stale(self, entry: CacheEntry) -> bool:
+        ttl = self.incomplete_soft_ttl if entry.missing else self.soft_ttl
+        return self.clock() - entry.fetched_at > ttl
+
+    def incomplete(self) -> Dict[str, Tuple[str, ...]]:
+        """欠けている項目があるエントリ（ISBN → 欠けている項目）"""
+        with self._lock:
+            return {key: entry.missing for key, entry in self._entries.items() if entry.missing}
+
+    def pending(self) -> int:
+        """取り直し待ちの件数"""
+        with self._lock:
+            return len(self._queue)
+
+    def refresh_pending(self, limit: Optional[int] = None) -> int:
+        """取り直し待ちのエントリを呼び出し元のスレッドで処理する
+
+        Args:
+            limit: 処理する最大件数（デフォルト: すべて）
+
+        Returns:
+            処理した件数
+        """
+        count = 0
+        while limit is None or count < limit:
+            with self._lock:
+                if not self._queue:
+                    break
+                key = self._pop()
+            self._refresh(key)
+            count += 1
+        return count
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """バックグラウンドのスレッドを止める（処理中の取り直しは最後まで実行する）"""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def __enter__(self) -> "RevalidatingBookClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _remember(self, key: str, isbn: str, book: BookInfo, fetched_at: float) -> CacheEntry:
+        entry = CacheEntry(isbn=isbn, book=book, fetched_at=fetched_at, missing=missing_fields(book))
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _persisted_at(self, isbn: str) -> float:
+        """永続キャッシュに保存された時刻（キャッシュされていなければ現在時刻）"""
+        if self.client.cache is not None:
+            fetched_at = self.client.cache.fetched_at(isbn)
+            if fetched_at is not None:
+                return fetched_at
+        return self.clock()
+
+    def _schedule(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            if key in self._queued or self._closed:
+                return
+            self._queued.add(key)
+            self._sequence += 1
+            heapq.heappush(self._queue, (-len(entry.missing), self._sequence, key))
+            if self.background:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="book-revalidate", daemon=True)
+                    self._worker.start()
+                self._wakeup.notify()
+
+    def _pop(self) -> str:
+        _, _, key = heapq.heappop(self._queue)
+        self._queued.discard(key)
+        return key
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                key = self._pop()
+            self._refresh(key)
+
+    def _refresh(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries[key]
+        metrics = get_metrics()
+
+        try:
+            with metrics.timer("revalidate_refresh_seconds"):
+                book = self.client.get_book_info(entry.isbn, use_cache=False)
+        except Exception as e:
+            logger.warning("Failed to refresh ISBN %s: %s", entry.isbn, e)
+            book = None
+
+        if book is None:
+            # 一時的な失敗で、見つかっていた書籍を「見つからなかった」に置き換えない
+            book = entry.book
+            result = "failed"
+        else:
+            for name in TRACKED_FIELDS:
+                if not getattr(book, name) and getattr(entry.book, name):
+                    setattr(book, name, getattr(entry.book, name))
+            if missing_fields(book):
+                self._fill_missing(entry.isbn, book)
+            filled = set(entry.missing) - set(missing_fields(book))
+            result = "filled" if filled else "unchanged"
+            logger.debug("Refreshed ISBN %s (filled: %s)", entry.isbn, ", ".join(sorted(filled)) or "none")
+
+        if self.client.cache is not None:
+            self.client.cache.set(entry.isbn, book)
+        self._remember(key, entry.isbn, book, self.clock())
+        metrics.inc("revalidate_refresh_total", result=result)
+
+    def _fill_missing(self, isbn: str, book: BookInfo) -> None:
+        """欠けている項目だけを Google Books → openBD の順に問い合わせて埋める（book を書き換える）"""
+        sources = (
+            ("google_books", self.client.google.get_book_info),
+            ("openbd", self.client.openbd.get_book_info),
+        )
+        for source, fetch in sources:
+            missing = missing_fields(book)
+            if not missing:
+                return
+            # 取り直しの検索で使ったソースにはもう一度問い合わせない
+            if book.source == source:
+                continue
+
+            try:
+                other = fetch(isbn)
+            except Exception as e:
+                logger.warning("Failed to fetch %s for ISBN %s: %s", source, isbn, e)
+                continue
+            if not other:
+                continue
+
+            for name in missing:
+                value = getattr(other, name)
+                if name == "cover_image_url" and not self.client.image_validator.is_valid(value):
+                    continue
+                if value:
+                    logger.debug("補完: %s from %s", name, source)
+                    setattr(book, name, value)
@@ -0,0 +1,58 @@
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+import threading
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """同じキーの処理が実行中なら、新しく実行せずにその結果を待って共有する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """key の処理が実行中でなければ fn を実行し、実行中なら完了を待って同じ結果を返す
+
+        fn が例外を送出した場合は、待っていた呼び出し元にも同じ例外を送出する。
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+            else:
+                call.waiters += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self) -> int:
+        """実行中の処理の数"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,168 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+import time
+import numpy as np
+import cv2
+
+from src.isbn_detector import DetectionResult, ISBNDetector, Region
+
+
+@dataclass
+class ScanEvent:
+    isbn: str
+    frame_index: int
+    timestamp: float
+    # フレーム内でバーコードを検出した領域 (x, y, w, h)
+    region: Optional[Region] = None
+
+
+@dataclass
+class ScanStats:
+    frames_seen: int = 0
+    frames_decoded: int = 0
+    # デコード中だったため読み飛ばしたフレーム数
+    frames_skipped: int = 0
+    roi_hits: int = 0
+
+
+class StreamScanner:
+    """動画・カメラのフレーム列からISBNを検出する
+
+    デコード中に届いたフレームは読み飛ばし、直前に検出した領域の周辺だけを
+    次のフレームで調べる。同じISBNは debounce_seconds 以内には再通知しない。
+    """
+
+    def __init__(
+        self,
+        detector: Optional[ISBNDetector] = None,
+        debounce_seconds: float = 3.0,
+        roi_margin: float = 0.5,
+        roi_ttl_frames: int = 30,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            detector: 使用する検出器（デフォルト: ISBNDetector()）
+            debounce_seconds: 同じISBNを再通知するまでの最短間隔（秒）
+            roi_margin: 前回の検出領域の周囲に付ける余白（領域サイズに対する比率）
+            roi_ttl_frames: 前回の検出領域を再利用するフレーム数の上限
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.detector = detector or ISBNDetector()
+        self.debounce_seconds = debounce_seconds
+        self.roi_margin = roi_margin
+        self.roi_ttl_frames = roi_ttl_frames
+        self.clock = clock
+        self.stats = ScanStats()
+        self._last_seen: Dict[str, float] = {}
+        self._last_region: Optional[Region] = None
+        self._last_region_frame = 0
+
+    def scan(self, frames: Iterable[np.ndarray], bgr: bool = False) -> Iterator[ScanEvent]:
+        """フレーム列を順に処理し、新しく検出したISBNを返す
+
+        Args:
+            frames: RGB（bgr=Trueの場合はBGR）のフレーム列
+            bgr: フレームがOpenCV形式（BGR）かどうか
+        """
+        in_flight: Optional[Future] = None
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for frame_index, frame in enumerate(frames):
+                self.stats.frames_seen += 1
+
+                if in_flight is not None:
+                    if not in_flight.done():
+                        self.stats.frames_skipped += 1
+                        continue
+                    yield from self._handle_result(*in_flight.result())
+                    in_flight = None
+
+                if bgr and len(frame.shape) == 3:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+                self.stats.frames_decoded += 1
+                in_flight = executor.submit(self._decode_frame, frame, frame_index)
+
+            if in_flight is not None:
+                yield from self._handle_result(*in_flight.result())
+
+    def scan_capture(self, source: Union[str, int]) -> Iterator[ScanEvent]:
+        """動画ファイルのパスまたはカメラ番号を開いてスキャンする"""
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            raise ValueError(f"映像ソースを開けません: {source}")
+
+        try:
+            yield from self.scan(self._read_frames(capture), bgr=True)
+        finally:
+            capture.release()
+
+    @staticmethod
+    def _read_frames(capture: "cv2.VideoCapture") -> Iterator[np.ndarray]:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            yield frame
+
+    def _decode_frame(self, frame: np.ndarray, frame_index: int):
+        region = self._roi_for(frame, frame_index)
+        if region is not None:
+            x, y, w, h = region
+            result = self.detector.detect(frame[y:y + h, x:x + w])
+            if result.isbns:
+                self.stats.roi_hits += 1
+                # 切り出し前のフレームの座標に戻す
+                if result.region is not None:
+                    rx, ry, rw, rh = result.region
+                    result.region = (rx + x, ry + y, rw, rh)
+                else:
+                    result.region = region
+                return result, frame_index
+
+        return self.detector.detect(frame), frame_index
+
+    def _roi_for(self, frame: np.ndarray, frame_index: int) -> Optional[Region]:
+        if self._last_region is None:
+            return None
+        if frame_index - self._last_region_frame > self.roi_ttl_frames:
+            self._last_region = None
+            return None
+
+        height, width = frame.shape[:2]
+        x, y, w, h = self._last_region
+        margin_x = int(w * self.roi_margin)
+        margin_y = int(h * self.roi_margin)
+        x0 = max(0, x - margin_x)
+        y0 = max(0, y - margin_y)
+        x1 = min(width, x + w + margin_x)
+        y1 = min(height, y + h + margin_y)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def _handle_result(self, result: DetectionResult, frame_index: int) -> List[ScanEvent]:
+        if not result.isbns:
+            return []
+
+        if result.region is not None:
+            self._last_region = result.region
+            self._last_region_frame = frame_index
+
+        now = self.clock()
+        events = []
+        for isbn in result.isbns:
+            last_seen = self._last_seen.get(isbn)
+            # 写り続けている間は通知せず、最終検出時刻だけ更新する
+            self._last_seen[isbn] = now
+            if last_seen is not None and now - last_seen < self.debounce_seconds:
+                continue
+            events.append(ScanEvent(
+                isbn=isbn,
+                frame_index=frame_index,
+                timestamp=now,
+                region=result.region
+            ))
+        return events
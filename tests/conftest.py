@@ -0,0 +1,20 @@
+import pytest
+from src.metrics import Metrics, set_metrics
+from src.rate_limiter import RateLimiter, set_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate_limiter():
+    """テストではモックしたHTTPに対してレート制限で待たないようにする"""
+    set_rate_limiter(RateLimiter(host_limits={}, default_limit=(1e9, 10 ** 9)))
+    yield
+    set_rate_limiter(None)
+
+
+@pytest.fixture(autouse=True)
+def metrics():
+    """テストごとに空の Metrics を使う"""
+    metrics = Metrics()
+    set_metrics(metrics)
+    yield metrics
+    set_metrics(None)
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+import httpx
+import responses
+from pathlib import Path
+from src.amazon_cover_client import AmazonCoverClient, AsyncAmazonCoverClient
+from src.amazon_page_parser import SECTION_WINDOW, ProductPageScanner
+
+
+class TestAmazonCoverClient:
+    def setup_method(self):
+        self.client = AmazonCoverClient()
+        fixtures_path = Path(__file__).parent / 'fixtures' / 'amazon_product.html'
+        self.html = fixtures_path.read_text(encoding='utf-8')
+
+    @responses.activate
+    def test_get_book_info_success(self):
+        isbn = "9784873115658"
+        responses.add(responses.GET, f"https://www.amazon.co.jp/dp/{isbn}", body=self.html, status=200)
+
+        book = self.client.get_book_info(isbn)
+
+        assert book is not None
+        assert book.isbn == isbn
+        assert book.authors == ["Dustin Boswell"]
+        assert book.page_count == 260
+        assert book.source == "Amazon"
+
+    @responses.activate
+    def test_get_book_info_not_found(self):
+        isbn = "9999999999999"
+        responses.add(responses.GET, f"https://www.amazon.co.jp/dp/{isbn}", status=404)
+
+        assert self.client.get_book_info(isbn) is None
+
+    @responses.activate
+    def test_get_book_info_by_title(self):
+        responses.add(
+            responses.GET,
+            "https://www.amazon.co.jp/s",
+            body='<div data-asin="4873115655" class="s-result-item"></div>',
+            status=200
+        )
+        responses.add(responses.GET, "https://www.amazon.co.jp/dp/4873115655", body=self.html, status=200)
+
+        book = self.client.get_book_info_by_title("リーダブルコード", "Dustin Boswell", "9784873115658")
+
+        assert book is not None
+        assert book.isbn == "9784873115658"
+        assert book.page_count == 260
+
+    @responses.activate
+    def test_custom_base_urls(self):
+        isbn = "9784873115658"
+        responses.add(responses.GET, f"http://127.0.0.1:8765/amazon/dp/{isbn}", body=self.html, status=200)
+        responses.add(
+            responses.HEAD,
+            f"http://127.0.0.1:8765/amazon-images/images/P/{isbn}.09.LZZZZZZZ.jpg",
+            status=200
+        )
+
+        client = AmazonCoverClient(
+            base_url="http://127.0.0.1:8765/amazon",
+            image_base_url="http://127.0.0.1:8765/amazon-images"
+        )
+
+        assert client.get_book_info(isbn).page_count == 260
+        assert client.get_cover_url_by_isbn(isbn).startswith("http://127.0.0.1:8765/amazon-images/")
+
+    @responses.activate
+    def test_streaming_matches_full_download(self):
+        isbn = "9784873115658"
+        responses.add(responses.GET, f"https://www.amazon.co.jp/dp/{isbn}", body=self.html, status=200)
+
+        streamed = self.client.get_book_info(isbn)
+        full = AmazonCoverClient(streaming=False).get_book_info(isbn)
+
+        assert streamed == full
+
+    @responses.activate
+    def test_streaming_stops_at_max_bytes(self):
+        isbn = "9784873115658"
+        padding = "<p>" + "x" * 100000 + "</p>"
+        responses.add(
+            responses.GET,
+            f"https://www.amazon.co.jp/dp/{isbn}",
+            body=padding + self.html,
+            status=200
+        )
+        client = AmazonCoverClient(max_bytes=1024)
+
+        # 書籍情報は max_bytes より後ろにあるので読まれない
+        assert client.get_book_info(isbn) is None
+
+    def test_default_required_fields_do_not_wait_for_description(self):
+        html = self.html.replace('id="bookDescription_feature_div"', '')
+        scanner = ProductPageScanner(self.client.required_fields)
+
+        scanner.feed(html + " " * SECTION_WINDOW)
+
+        assert self.client.required_fields == AmazonCoverClient.REQUIRED_FIELDS
+        assert scanner.complete
+
+    def test_async_client_matches_sync_client(self):
+        isbn = "9784873115658"
+        client = AsyncAmazonCoverClient(client=httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text=self.html)
+        )))
+
+        book = asyncio.run(client.get_book_info(isbn))
+
+        assert book == self.client._parse_product_page(self.html, isbn)
+
+    def test_async_client_streaming_matches_full_download(self):
+        isbn = "9784873115658"
+
+        def fetch(streaming):
+            client = AsyncAmazonCoverClient(
+                client=httpx.AsyncClient(transport=httpx.MockTransport(
+                    lambda request: httpx.Response(200, text=self.html)
+                )),
+                streaming=streaming
+            )
+            return asyncio.run(client.get_book_info(isbn))
+
+        assert fetch(True) == fetch(False)
@@ -0,0 +1,133 @@
+import pytest
+from pathlib import Path
+from src.amazon_page_parser import (
+    SECTION_WINDOW, ProductPageScanner, SearchPageScanner, parse_product_page, parse_search_asin
+)
+
+
+class TestAmazonPageParser:
+    def setup_method(self):
+        fixtures_path = Path(__file__).parent / 'fixtures' / 'amazon_product.html'
+        self.html = fixtures_path.read_text(encoding='utf-8')
+
+    def test_parse_product_page(self):
+        fields = parse_product_page(self.html)
+
+        assert fields.title.startswith("リーダブルコード")
+        assert fields.authors == ["Dustin Boswell"]
+        assert fields.publisher == "オライリージャパン"
+        assert fields.published_date == "2012-06-23"
+        assert fields.page_count == 260
+        assert fields.description.startswith("美しいコード")
+        assert fields.cover_image_url == "https://m.media-amazon.com/images/I/51MgH8Jmr3L._SL500_BO1,204,203,200_.jpg"
+
+    def test_parse_empty_page(self):
+        fields = parse_product_page("<html><body></body></html>")
+
+        assert fields.title is None
+        assert fields.authors is None
+        assert fields.page_count is None
+        assert fields.cover_image_url is None
+
+    def test_cover_from_image_wrapper(self):
+        html = (
+            '<div id="imgTagWrapperId" class="imgTagWrapper">'
+            '<img alt="" src="https://m.media-amazon.com/images/I/abc._SX300_.jpg" id="main">'
+            '</div>'
+        )
+
+        fields = parse_product_page(html)
+
+        assert fields.cover_image_url == "https://m.media-amazon.com/images/I/abc._SL500_.jpg"
+
+    def test_cover_from_ebooks_image(self):
+        html = '<img id="ebooksImg" class="frontImage" src="https://m.media-amazon.com/images/I/def._SY400_.jpg">'
+
+        fields = parse_product_page(html)
+
+        assert fields.cover_image_url == "https://m.media-amazon.com/images/I/def._SL500_.jpg"
+
+    def test_cover_priority_ignores_position(self):
+        html = (
+            '<link href="https://m.media-amazon.com/images/I/generic.abc.jpg">'
+            '<img id="landingImage" src="https://m.media-amazon.com/images/I/landing._SX1_.jpg">'
+        )
+
+        fields = parse_product_page(html)
+
+        assert fields.cover_image_url == "https://m.media-amazon.com/images/I/landing._SL500_.jpg"
+
+    def test_pages_skips_occurrence_without_number(self):
+        html = '<a>次のページ</a><span>単行本 : 320ページ</span>'
+
+        assert parse_product_page(html).page_count == 320
+
+    def test_title_skips_unparsable_anchor(self):
+        html = '<span id="productTitle"><b>x</b></span><span id="productTitle">本のタイトル</span>'
+
+        assert parse_product_page(html).title == "本のタイトル"
+
+    def test_parse_search_asin(self):
+        html = '<div data-asin=""></div><div data-asin="B0ABCDEFGH"></div><div data-asin="9784873115658"></div>'
+
+        assert parse_search_asin(html) == "9784873115658"
+
+    def test_parse_search_asin_not_found(self):
+        assert parse_search_asin('<div data-asin=""></div>') is None
+
+
+class TestProductPageScanner:
+    def setup_method(self):
+        fixtures_path = Path(__file__).parent / 'fixtures' / 'amazon_product.html'
+        self.html = fixtures_path.read_text(encoding='utf-8')
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+    def test_chunked_feed_matches_full_parse(self, chunk_size):
+        scanner = ProductPageScanner()
+        for i in range(0, len(self.html), chunk_size):
+            scanner.feed(self.html[i:i + chunk_size])
+        scanner.close()
+
+        assert scanner.fields() == parse_product_page(self.html)
+
+    def test_chunked_feed_with_padding_matches_full_parse(self):
+        html = "<p>" + "x" * 50000 + "</p>" + self.html + "<p>" + "y" * 50000 + "</p>"
+        scanner = ProductPageScanner()
+        for i in range(0, len(html), 4096):
+            scanner.feed(html[i:i + 4096])
+            # 読み終えた部分は捨てるので、ページ全体は保持しない
+            assert len(scanner._buffer) < 3 * SECTION_WINDOW + 4096
+        scanner.close()
+
+        assert scanner.fields() == parse_product_page(html)
+
+    def test_complete_after_required_fields(self):
+        scanner = ProductPageScanner(required_fields=("title",))
+        scanner.feed('<span id="productTitle" class="a">本のタイトル</span>')
+
+        # 目印の後ろが SECTION_WINDOW に届くまでは確定しない
+        assert not scanner.complete
+
+        scanner.feed(" " * SECTION_WINDOW)
+
+        assert scanner.complete
+        assert scanner.fields().title == "本のタイトル"
+
+    def test_close_resolves_pending_anchor(self):
+        scanner = ProductPageScanner(required_fields=("title",))
+        scanner.feed('<span id="productTitle" class="a">本のタイトル</span>')
+        scanner.close()
+
+        assert scanner.complete
+        assert scanner.fields().title == "本のタイトル"
+
+
+class TestSearchPageScanner:
+    def test_asin_split_across_chunks(self):
+        html = '<div data-asin="" class="ad"></div><div data-asin="4873115655" class="s-result-item"></div>'
+        scanner = SearchPageScanner()
+        for i in range(0, len(html), 5):
+            scanner.feed(html[i:i + 5])
+
+        assert scanner.complete
+        assert scanner.asin == "4873115655"
@@ -0,0 +1,180 @@
+import csv
+import json
+import os
+import tempfile
+import pytest
+from unittest.mock import Mock
+from src.batch_ingest import (
+    Checkpoint, ResultWriter, collect_images, process_detection, run_batch,
+    STATUS_NO_ISBN, STATUS_NOT_FOUND, STATUS_OK
+)
+from src.isbn_detector import BatchDetectionResult, DetectionResult
+from src.notion_client import NotionIngestResult
+from src.openbd_client import BookInfo
+
+
+class FakeDetector:
+    """パスごとに決めたISBNを返す検出器"""
+
+    def __init__(self, isbns_by_path):
+        self.isbns_by_path = isbns_by_path
+        self.seen = []
+
+    def detect_many(self, images, max_workers=None):
+        for index, path in enumerate(images):
+            self.seen.append(path)
+            isbns = self.isbns_by_path.get(os.path.basename(path))
+            if isbns is None:
+                yield BatchDetectionResult(index=index, path=path, error="cannot open")
+            else:
+                yield BatchDetectionResult(index=index, path=path, result=DetectionResult(isbns=isbns))
+
+
+class TestBatchIngest:
+    def setup_method(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        for name in ["a.jpg", "b.png", "c.jpg", "notes.txt"]:
+            open(os.path.join(self.dir, name), "w").close()
+        self.book_client = Mock()
+        self.book_client.get_book_info.side_effect = lambda isbn: (
+            BookInfo(isbn=isbn, title="リーダブルコード", authors=["Dustin Boswell"], source="openBD")
+            if isbn == "9784873115658" else None
+        )
+        self.detector = FakeDetector({
+            "a.jpg": ["9784873115658"],
+            "b.png": [],
+            "c.jpg": ["9784839974206"],
+        })
+
+    def teardown_method(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_collect_images_from_directory(self):
+        assert collect_images(self.dir) == [self.path("a.jpg"), self.path("b.png"), self.path("c.jpg")]
+
+    def test_collect_images_from_manifest(self):
+        manifest = self.path("manifest.txt")
+        with open(manifest, "w") as f:
+            f.write("# 取り込み対象\na.jpg\n\n/abs/x.jpg\n")
+
+        assert collect_images(manifest) == [self.path("a.jpg"), "/abs/x.jpg"]
+
+    def test_collect_images_from_csv_manifest(self):
+        manifest = self.path("manifest.csv")
+        with open(manifest, "w") as f:
+            f.write("path,memo\nc.jpg,棚1\n")
+
+        assert collect_images(manifest) == [self.path("c.jpg")]
+
+    def test_process_detection_statuses(self):
+        found = BatchDetectionResult(index=0, path="a.jpg", result=DetectionResult(isbns=["9784873115658", "9784839974206"]))
+        records = process_detection(found, self.book_client)
+
+        assert [r.status for r in records] == [STATUS_OK, STATUS_NOT_FOUND]
+        assert records[0].title == "リーダブルコード"
+
+        empty = BatchDetectionResult(index=1, path="b.png", result=DetectionResult(isbns=[]))
+        assert process_detection(empty, self.book_client)[0].status == STATUS_NO_ISBN
+
+        failed = BatchDetectionResult(index=2, path="c.jpg", error="cannot open")
+        assert process_detection(failed, self.book_client)[0].error == "cannot open"
+
+    def test_process_detection_pushes_to_notion(self):
+        notion = Mock()
+        notion.add_books_to_database.side_effect = lambda db, books, **kwargs: [
+            NotionIngestResult(0, books[0], page={"id": "page-1"}, action="created")
+        ]
+        found = BatchDetectionResult(index=0, path="a.jpg", result=DetectionResult(isbns=["9784873115658"]))
+
+        record = process_detection(found, self.book_client, notion, "db", on_existing="skip")[0]
+
+        assert (record.notion_page_id, record.notion_action) == ("page-1", "created")
+        assert notion.add_books_to_database.call_args.kwargs["on_existing"] == "skip"
+
+    def test_run_batch_writes_jsonl(self):
+        output = self.path("out.jsonl")
+        with ResultWriter(output) as writer:
+            summary = run_batch(collect_images(self.dir), writer, self.detector, self.book_client)
+
+        with open(output, encoding="utf-8") as f:
+            rows = sorted((json.loads(line) for line in f), key=lambda r: r["path"])
+        assert [r["status"] for r in rows] == [STATUS_OK, STATUS_NO_ISBN, STATUS_NOT_FOUND]
+        assert rows[0]["authors"] == ["Dustin Boswell"]
+        assert summary.images == 3
+
+    def test_run_batch_writes_csv(self):
+        output = self.path("out.csv")
+        with ResultWriter(output) as writer:
+            run_batch(collect_images(self.dir), writer, self.detector, self.book_client)
+
+        with open(output, encoding="utf-8", newline="") as f:
+            rows = sorted(csv.DictReader(f), key=lambda r: r["path"])
+        assert rows[0]["isbn"] == "9784873115658"
+        assert rows[0]["authors"] == "Dustin Boswell"
+        assert len(rows) == 3
+
+    def test_run_batch_resumes_from_checkpoint(self):
+        output = self.path("out.jsonl")
+        checkpoint = Checkpoint(output + ".checkpoint")
+        checkpoint.mark(self.path("a.jpg"))
+
+        with ResultWriter(output) as writer:
+            summary = run_batch(
+                collect_images(self.dir), writer, self.detector, self.book_client,
+                checkpoint=Checkpoint(output + ".checkpoint")
+            )
+
+        assert self.detector.seen == [self.path("b.png"), self.path("c.jpg")]
+        assert summary.skipped == 1
+        assert Checkpoint(output + ".checkpoint").done == {self.path(n) for n in ["a.jpg", "b.png", "c.jpg"]}
+
+    def test_writer_truncates_when_not_appending(self):
+        output = self.path("out.csv")
+        with ResultWriter(output) as writer:
+            run_batch(collect_images(self.dir), writer, self.detector, self.book_client)
+
+        with ResultWriter(output, append=False) as writer:
+            run_batch(collect_images(self.dir), writer, self.detector, self.book_client)
+
+        with open(output, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 3
+
+    def test_checkpoint_clear(self):
+        checkpoint = Checkpoint(self.path("out.jsonl.checkpoint"))
+        checkpoint.mark(self.path("a.jpg"))
+
+        checkpoint.clear()
+
+        assert checkpoint.done == set()
+        assert not os.path.exists(self.path("out.jsonl.checkpoint"))
+        assert Checkpoint(self.path("out.jsonl.checkpoint")).done == set()
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            ResultWriter(self.path("out.jsonl"), fmt="xml")
+
+    def test_run_batch_pushes_to_notion_stage(self):
+        notion = Mock()
+        notion.add_books_to_database.side_effect = lambda db, books, **kwargs: [
+            NotionIngestResult(i, book, page={"id": f"page-{book.isbn}"}, action="created")
+            for i, book in enumerate(books)
+        ]
+        output = self.path("out.jsonl")
+
+        with ResultWriter(output) as writer:
+            summary = run_batch(
+                collect_images(self.dir), writer, self.detector, self.book_client,
+                notion=notion, database_id="db"
+            )
+
+        with open(output, encoding="utf-8") as f:
+            rows = {r["path"]: r for r in map(json.loads, f)}
+        assert rows[self.path("a.jpg")]["notion_page_id"] == "page-9784873115658"
+        assert rows[self.path("c.jpg")]["notion_page_id"] is None
+        assert notion.add_books_to_database.call_count == 1
+        assert summary.counts == {STATUS_OK: 1, STATUS_NO_ISBN: 1, STATUS_NOT_FOUND: 1}
@@ -1,12 +1,27 @@
+import time
+import asyncio
+import threading
 import pytest
-from unittest.mock import Mock
-from src.book_api_client import BookAPIClient
+import httpx
+from unittest.mock import AsyncMock, Mock
+from src.book_api_client import AsyncBookAPIClient, BookAPIClient
+from src.book_cache import BookCache
 from src.openbd_client import BookInfo
 
 
 class TestBookAPIClient:
     def setup_method(self):
         self.client = BookAPIClient()
+        self.concurrent_clients = []
+
+    def teardown_method(self):
+        for client in self.concurrent_clients:
+            client.close()
+
+    def concurrent_client(self, **kwargs):
+        client = BookAPIClient(concurrent=True, **kwargs)
+        self.concurrent_clients.append(client)
+        return client
 
     def test_openbd_priority(self):
         mock_openbd = Mock()
@@ -98,3 +113,294 @@ class TestBookAPIClient:
         assert result1 == book
         assert result2 == book
         assert mock_openbd.get_book_info.call_count == 2
+
+    def _mock_sources(self, client, amazon=None, google=None, openbd=None, delay=0.0):
+        def returning(value):
+            def fetch(isbn):
+                time.sleep(delay)
+                return value
+            return fetch
+
+        client.amazon = Mock()
+        client.google = Mock()
+        client.openbd = Mock()
+        client.amazon.get_book_info.side_effect = returning(amazon)
+        client.google.get_book_info.side_effect = returning(google)
+        client.openbd.get_book_info.side_effect = returning(openbd)
+        client.amazon.get_book_info_by_title.return_value = None
+        client.is_valid_image_url = Mock(return_value=True)
+
+    def test_concurrent_amazon_priority(self):
+        amazon_book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="Amazon")
+        google_book = BookInfo(isbn="9784839974206", title="Other", source="google_books")
+
+        client = self.concurrent_client()
+        self._mock_sources(client, amazon=amazon_book, google=google_book)
+
+        result = client.get_book_info("9784839974206")
+
+        assert result == amazon_book
+        # Amazonがすぐに見つけた場合は、他のソースのクォータを使わない
+        client.google.get_book_info.assert_not_called()
+        client.openbd.get_book_info.assert_not_called()
+
+    def test_concurrent_merges_google_and_openbd(self):
+        google_book = BookInfo(
+            isbn="9784839974206", title="Test Book",
+            cover_image_url="http://books.google.com/books/content?id=test.jpg", source="google_books"
+        )
+        openbd_book = BookInfo(
+            isbn="9784839974206", title="Test Book", publisher="オライリー・ジャパン",
+            page_count=260, source="openbd"
+        )
+
+        client = self.concurrent_client()
+        self._mock_sources(client, google=google_book, openbd=openbd_book)
+
+        result = client.get_book_info("9784839974206")
+
+        assert result.source == "google_books"
+        assert result.publisher == "オライリー・ジャパン"
+        assert result.page_count == 260
+        client.amazon.get_book_info_by_title.assert_not_called()
+
+    def test_concurrent_falls_back_to_openbd(self):
+        openbd_book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="openbd")
+
+        client = self.concurrent_client()
+        self._mock_sources(client, openbd=openbd_book)
+
+        result = client.get_book_info("9784839974206")
+
+        assert result == openbd_book
+
+    def test_concurrent_all_sources_none(self):
+        client = self.concurrent_client()
+        self._mock_sources(client)
+
+        result = client.get_book_info("9999999999999")
+
+        assert result is None
+        assert "9999999999999" not in client._cache
+
+    def test_concurrent_requests_overlap(self):
+        openbd_book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="openbd")
+
+        client = self.concurrent_client(fallback_delay=0.05)
+        self._mock_sources(client, openbd=openbd_book, delay=0.2)
+
+        start = time.monotonic()
+        client.get_book_info("9784839974206")
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.5
+
+    def test_concurrent_slow_amazon_starts_fallbacks(self):
+        amazon_book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="Amazon")
+
+        client = self.concurrent_client(fallback_delay=0.01)
+        self._mock_sources(client, amazon=amazon_book, delay=0.1)
+
+        result = client.get_book_info("9784839974206")
+
+        assert result == amazon_book
+        client.google.get_book_info.assert_called_once_with("9784839974206")
+        client.openbd.get_book_info.assert_called_once_with("9784839974206")
+
+    def test_persistent_cache_hit_skips_lookup(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+        book = BookInfo(isbn="9784839974206", title="Test Book", source="openbd")
+        cache.set("9784839974206", book)
+
+        client = BookAPIClient(cache=cache)
+        self._mock_sources(client)
+
+        result = client.get_book_info("9784839974206")
+
+        assert result == book
+        client.amazon.get_book_info.assert_not_called()
+
+    def test_persistent_cache_does_not_store_negative_result(self, tmp_path):
+        # 通信エラーでも None が返るので、見つからなかった結果はキャッシュしない
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+
+        client = BookAPIClient(cache=cache)
+        self._mock_sources(client)
+
+        assert client.get_book_info("9999999999999") is None
+        assert client.get_book_info("9999999999999") is None
+        assert client.amazon.get_book_info.call_count == 2
+        assert cache.get("9999999999999") == (False, None)
+
+    def test_persistent_cache_shared_between_clients(self, tmp_path):
+        path = str(tmp_path / "books.sqlite3")
+        book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="openbd")
+
+        first = BookAPIClient(cache=BookCache(path))
+        self._mock_sources(first, openbd=book)
+        first.get_book_info("9784839974206")
+
+        second = BookAPIClient(cache=BookCache(path))
+        self._mock_sources(second)
+
+        assert second.get_book_info("9784839974206") == book
+        second.openbd.get_book_info.assert_not_called()
+
+
+    def test_cover_url_is_validated_once_per_lookup(self):
+        cover = "http://books.google.com/books/content?id=test.jpg"
+        google_book = BookInfo(isbn="9784839974206", title="Test Book", cover_image_url=cover, source="google_books")
+        openbd_book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="openbd")
+
+        client = BookAPIClient()
+        self._mock_sources(client, google=google_book, openbd=openbd_book)
+        client.is_valid_image_url = Mock(return_value=False)
+
+        client.get_book_info("9784839974206")
+
+        client.is_valid_image_url.assert_called_once_with(cover, session=client.session)
+
+    def test_base_urls_are_passed_to_sources(self):
+        client = BookAPIClient(base_urls={
+            "openbd": "http://127.0.0.1:8765/openbd/v1",
+            "amazon": "http://127.0.0.1:8765/amazon",
+        })
+
+        assert client.openbd.base_url == "http://127.0.0.1:8765/openbd/v1"
+        assert client.amazon.base_url == "http://127.0.0.1:8765/amazon"
+        assert client.google.base_url == client.google.BASE_URL
+
+    def test_concurrent_lookups_of_same_isbn_are_coalesced(self, metrics):
+        book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="Amazon")
+        release = threading.Event()
+
+        client = BookAPIClient()
+        self._mock_sources(client, amazon=book)
+        client.amazon.get_book_info.side_effect = lambda isbn: release.wait(5) and book
+
+        results = []
+        forms = ["9784839974206", "978-4-8399-7420-6", "4839974207", "4-8399-7420-7", "9784839974206"]
+        threads = [threading.Thread(target=lambda isbn=isbn: results.append(client.get_book_info(isbn))) for isbn in forms]
+        threads[0].start()
+        while client._flight.in_flight() == 0:
+            time.sleep(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        while client._flight._calls["9784839974206"].waiters < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == [book] * 5
+        assert client.amazon.get_book_info.call_count == 1
+        assert metrics.counter("lookup_coalesced_total") == 4
+        assert client._flight.in_flight() == 0
+
+    def test_lookups_of_different_isbns_are_not_coalesced(self):
+        client = self.concurrent_client()
+        self._mock_sources(client, delay=0.1)
+
+        threads = [threading.Thread(target=client.get_book_info, args=(isbn,)) for isbn in ["9784839974206", "9784873115658"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert client.amazon.get_book_info.call_count == 2
+
+class TestAsyncBookAPIClient:
+    def _client(self, amazon=None, google=None, openbd=None, title_search=None):
+        client = AsyncBookAPIClient(client=httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={"Content-Length": "2048"})
+        )))
+        client.amazon = Mock()
+        client.google = Mock()
+        client.openbd = Mock()
+        client.amazon.get_book_info = AsyncMock(return_value=amazon)
+        client.google.get_book_info = AsyncMock(return_value=google)
+        client.openbd.get_book_info = AsyncMock(return_value=openbd)
+        client.amazon.get_book_info_by_title = AsyncMock(return_value=title_search)
+        return client
+
+    def test_amazon_priority(self):
+        amazon_book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="Amazon")
+        client = self._client(amazon=amazon_book, google=BookInfo(isbn="9784839974206", source="google_books"))
+
+        assert asyncio.run(client.get_book_info("9784839974206")) == amazon_book
+
+    def test_merges_google_openbd_and_amazon_title_search(self):
+        google_book = BookInfo(isbn="9784839974206", title="Test Book", source="google_books")
+        openbd_book = BookInfo(isbn="9784839974206", title="Test Book", publisher="オライリー・ジャパン", source="openbd")
+        amazon_book = BookInfo(
+            isbn="9784839974206", title="Test Book", page_count=260,
+            cover_image_url="https://m.media-amazon.com/images/I/test._SL500_.jpg", source="Amazon"
+        )
+        client = self._client(google=google_book, openbd=openbd_book, title_search=amazon_book)
+
+        result = asyncio.run(client.get_book_info("9784839974206"))
+
+        assert result.source == "google_books"
+        assert result.publisher == "オライリー・ジャパン"
+        assert result.page_count == 260
+        assert result.cover_image_url == amazon_book.cover_image_url
+        client.amazon.get_book_info_by_title.assert_awaited_once_with("Test Book", None, "9784839974206")
+
+    def test_all_sources_none(self):
+        client = self._client()
+
+        assert asyncio.run(client.get_book_info("9999999999999")) is None
+
+    def test_concurrent_lookups_of_same_isbn_are_coalesced(self, metrics):
+        book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260, source="Amazon")
+        client = self._client(amazon=book)
+
+        async def slow_amazon(isbn):
+            await asyncio.sleep(0.05)
+            return book
+        client.amazon.get_book_info = AsyncMock(side_effect=slow_amazon)
+
+        async def run():
+            return await asyncio.gather(*(
+                client.get_book_info(isbn) for isbn in ["9784839974206", "978-4-8399-7420-6", "4839974207"]
+            ))
+
+        assert asyncio.run(run()) == [book] * 3
+        client.amazon.get_book_info.assert_awaited_once()
+        assert metrics.counter("lookup_coalesced_total") == 2
+        assert client._in_flight == {}
+
+    def test_cover_validation_is_cached_across_lookups(self):
+        cover = "https://m.media-amazon.com/images/I/test._SL500_.jpg"
+        heads = []
+
+        def handler(request):
+            heads.append(str(request.url))
+            return httpx.Response(200, headers={"Content-Length": "2048"})
+
+        client = AsyncBookAPIClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        google_book = BookInfo(isbn="9784839974206", title="Test Book", page_count=260,
+                               cover_image_url=cover, source="google_books")
+        client.amazon = Mock()
+        client.google = Mock()
+        client.openbd = Mock()
+        client.amazon.get_book_info = AsyncMock(return_value=None)
+        client.google.get_book_info = AsyncMock(return_value=google_book)
+        client.openbd.get_book_info = AsyncMock(return_value=None)
+
+        async def run():
+            await client.get_book_info("9784839974206", use_cache=False)
+            await client.get_book_info("9784839974206", use_cache=False)
+
+        asyncio.run(run())
+
+        assert heads == [cover]
+        assert len(client.image_validator) == 1
+
+    def test_is_valid_image_url_async_rejects_small_image(self):
+        client = AsyncBookAPIClient(client=httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={"Content-Length": "43"})
+        )))
+
+        assert asyncio.run(client.is_valid_image_url_async("https://example.com/cover.jpg")) is False
+        assert asyncio.run(client.is_valid_image_url_async("https://example.com/cover")) is False
@@ -0,0 +1,97 @@
+import pytest
+from src.book_cache import BookCache
+from src.openbd_client import BookInfo
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestBookCache:
+    def setup_method(self):
+        self.book = BookInfo(
+            isbn="9784839974206",
+            title="リーダブルコード",
+            authors=["Dustin Boswell", "Trevor Foucher"],
+            page_count=260,
+            source="openbd"
+        )
+        self.clock = Clock()
+
+    def test_get_miss(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+
+        assert cache.get("9784839974206") == (False, None)
+
+    def test_set_and_get(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+
+        cache.set("9784839974206", self.book)
+        hit, book = cache.get("9784839974206")
+
+        assert hit is True
+        assert book == self.book
+
+    def test_key_is_normalized(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+
+        cache.set("978-4-8399-7420-6", self.book)
+
+        assert cache.get("4839974209") == (True, self.book)
+
+    def test_negative_result(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+
+        cache.set("9999999999999", None)
+
+        assert cache.get("9999999999999") == (True, None)
+
+    def test_expired_entry(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"), ttl=60, clock=self.clock)
+
+        cache.set("9784839974206", self.book)
+        self.clock.now += 61
+
+        assert cache.get("9784839974206") == (False, None)
+        assert len(cache) == 0
+
+    def test_negative_ttl(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"), negative_ttl=60, clock=self.clock)
+
+        cache.set("9999999999999", None)
+        cache.set("9784839974206", self.book)
+        self.clock.now += 61
+
+        assert cache.get("9999999999999") == (False, None)
+        assert cache.get("9784839974206") == (True, self.book)
+
+    def test_ttl_by_source(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"), ttl_by_source={"openbd": 60}, clock=self.clock)
+
+        cache.set("9784839974206", self.book)
+        self.clock.now += 61
+
+        assert cache.get("9784839974206") == (False, None)
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"), max_entries=2)
+
+        cache.set("9784839974206", self.book)
+        cache.set("9784873115658", self.book)
+        cache.get("9784839974206")
+        cache.set("9784274068560", self.book)
+
+        assert len(cache) == 2
+        assert cache.get("9784873115658") == (False, None)
+        assert cache.get("9784839974206")[0] is True
+
+    def test_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "books.sqlite3")
+
+        BookCache(path).set("9784839974206", self.book)
+
+        assert BookCache(path).get("9784839974206") == (True, self.book)
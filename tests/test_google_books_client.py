@@ -1,8 +1,10 @@
+import asyncio
 import pytest
 import json
+import httpx
 import responses
 from pathlib import Path
-from src.google_books_client import GoogleBooksClient
+from src.google_books_client import AsyncGoogleBooksClient, GoogleBooksClient
 from src.openbd_client import BookInfo
 
 
@@ -79,6 +81,19 @@ class TestGoogleBooksClient:
         assert book is not None
         assert responses.calls[0].request.url.endswith(f"q=isbn%3A{isbn}&key={api_key}")
 
+    @responses.activate
+    def test_custom_base_url(self):
+        responses.add(
+            responses.GET,
+            "http://127.0.0.1:8765/google/books/v1/volumes",
+            json=self.mock_data['google_books_success'],
+            status=200
+        )
+
+        client = GoogleBooksClient(base_url="http://127.0.0.1:8765/google/books/v1/volumes")
+
+        assert client.get_book_info("9784839974206") is not None
+
     def test_parse_response_with_full_data(self):
         data = self.mock_data['google_books_success']
 
@@ -95,3 +110,35 @@ class TestGoogleBooksClient:
         book = self.client._parse_response(data, "9999999999999")
 
         assert book is None
+
+
+class TestAsyncGoogleBooksClient:
+    def setup_method(self):
+        fixtures_path = Path(__file__).parent / 'fixtures' / 'mock_responses.json'
+        with open(fixtures_path) as f:
+            self.mock_data = json.load(f)
+
+    def test_get_book_info_success(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json=self.mock_data['google_books_success'])
+
+        client = AsyncGoogleBooksClient(
+            api_key="test_api_key",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+
+        book = asyncio.run(client.get_book_info("9784839974206"))
+
+        assert book == GoogleBooksClient()._parse_response(self.mock_data['google_books_success'], "9784839974206")
+        assert requests_seen[0].url.params["q"] == "isbn:9784839974206"
+        assert requests_seen[0].url.params["key"] == "test_api_key"
+
+    def test_get_book_info_api_error(self):
+        client = AsyncGoogleBooksClient(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+        )
+
+        assert asyncio.run(client.get_book_info("9784839974206")) is None
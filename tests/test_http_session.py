@@ -0,0 +1,59 @@
+import pytest
+import responses
+from unittest.mock import Mock
+from src.http_session import create_session, get_session, set_session
+from src.book_api_client import BookAPIClient
+from src.openbd_client import OpenBDClient
+from src.notion_client import NotionClient
+
+
+class TestHTTPSession:
+    def teardown_method(self):
+        set_session(None)
+
+    def test_create_session_pool_limits(self):
+        session = create_session(pool_connections=4, pool_maxsize=2, pool_block=True)
+
+        adapter = session.get_adapter("https://api.openbd.jp/v1/get")
+
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 2
+        assert adapter._pool_block is True
+
+    def test_get_session_is_shared(self):
+        assert get_session() is get_session()
+
+    def test_clients_use_shared_session_by_default(self):
+        session = get_session()
+
+        client = BookAPIClient()
+
+        assert client.session is session
+        assert client.openbd.session is session
+        assert client.google.session is session
+        assert client.amazon.session is session
+        assert NotionClient("token").session is session
+
+    def test_injected_session_is_passed_to_clients(self):
+        session = create_session()
+
+        client = BookAPIClient(session=session)
+
+        assert client.openbd.session is session
+        assert client.google.session is session
+        assert client.amazon.session is session
+
+    def test_client_timeout_is_configurable(self):
+        session = Mock()
+        session.get.return_value.status_code = 500
+
+        OpenBDClient(session=session, timeout=2).get_book_info("9784839974206")
+
+        assert session.get.call_args.kwargs["timeout"] == 2
+
+    @responses.activate
+    def test_is_valid_image_url_uses_session(self):
+        url = "https://cover.openbd.jp/9784839974206.jpg"
+        responses.add(responses.HEAD, url, status=200, headers={"Content-Length": "2048"})
+
+        assert BookAPIClient.is_valid_image_url(url, session=create_session()) is True
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.image_url_validator import ImageURLValidator
+
+
+class TestImageURLValidator:
+    def setup_method(self):
+        self.url = "https://cover.openbd.jp/9784839974206.jpg"
+
+    def test_caches_result(self):
+        probe = Mock(return_value=True)
+        validator = ImageURLValidator(probe)
+
+        assert validator.is_valid(self.url) is True
+        assert validator.is_valid(self.url) is True
+        probe.assert_called_once_with(self.url)
+
+    def test_caches_invalid_result(self):
+        probe = Mock(return_value=False)
+        validator = ImageURLValidator(probe)
+
+        assert validator.is_valid(self.url) is False
+        assert validator.is_valid(self.url) is False
+        probe.assert_called_once()
+
+    def test_async_shares_cache_with_sync(self):
+        probe = Mock(return_value=True)
+        probe_async = AsyncMock(return_value=False)
+        validator = ImageURLValidator(probe)
+
+        assert asyncio.run(validator.is_valid_async(self.url, probe_async)) is False
+        assert asyncio.run(validator.is_valid_async(self.url, probe_async)) is False
+        assert validator.is_valid(self.url) is False
+        probe_async.assert_awaited_once_with(self.url)
+        probe.assert_not_called()
+
+    def test_concurrent_async_calls_share_one_probe(self):
+        calls = []
+
+        async def probe_async(url):
+            calls.append(url)
+            await asyncio.sleep(0)
+            return True
+
+        async def validate_twice(validator):
+            return await asyncio.gather(
+                validator.is_valid_async(self.url, probe_async),
+                validator.is_valid_async(self.url, probe_async),
+            )
+
+        validator = ImageURLValidator(Mock())
+
+        assert asyncio.run(validate_twice(validator)) == [True, True]
+        assert calls == [self.url]
+        assert validator._in_flight == {}
+
+    def test_empty_url_is_not_probed(self):
+        probe = Mock(return_value=True)
+        validator = ImageURLValidator(probe)
+
+        assert validator.is_valid(None) is False
+        assert validator.is_valid("") is False
+        probe.assert_not_called()
+
+    def test_expired_entry_is_reprobed(self):
+        now = [0.0]
+        probe = Mock(return_value=True)
+        validator = ImageURLValidator(probe, ttl=60, clock=lambda: now[0])
+
+        validator.is_valid(self.url)
+        now[0] = 61.0
+        validator.is_valid(self.url)
+
+        assert probe.call_count == 2
+
+    def test_bounded_size(self):
+        probe = Mock(return_value=True)
+        validator = ImageURLValidator(probe, max_entries=2)
+
+        validator.is_valid("https://example.com/a.jpg")
+        validator.is_valid("https://example.com/b.jpg")
+        validator.is_valid("https://example.com/a.jpg")
+        validator.is_valid("https://example.com/c.jpg")
+
+        assert len(validator) == 2
+        validator.is_valid("https://example.com/a.jpg")
+        assert probe.call_count == 3
+
+    def test_concurrent_checks_share_one_probe(self):
+        started = threading.Event()
+        calls = []
+
+        def probe(url):
+            calls.append(url)
+            started.set()
+            time.sleep(0.1)
+            return True
+
+        validator = ImageURLValidator(probe)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(validator.is_valid(self.url))) for _ in range(4)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [self.url]
+        assert results == [True] * 4
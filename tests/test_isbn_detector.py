@@ -1,5 +1,7 @@
 import pytest
 import numpy as np
+from types import SimpleNamespace
+from unittest.mock import patch
 from PIL import Image
 from src.isbn_detector import ISBNDetector
 
@@ -57,3 +59,268 @@ class TestISBNDetector:
         result = self.detector.detect_isbn(test_image)
 
         assert isinstance(result, list)
+
+    def _barcode(self, code):
+        return SimpleNamespace(type='EAN13', data=code.encode('utf-8'))
+
+    def test_detect_stops_at_first_successful_stage(self):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+        with patch('src.isbn_detector.pyzbar.decode', return_value=[self._barcode("9784839974206")]), \
+                patch.object(self.detector, '_preprocess_enhanced') as mock_enhanced:
+            result = self.detector.detect(test_image)
+
+        assert result.isbns == ["9784839974206"]
+        assert result.stage == "raw"
+        assert result.stages_tried == ["raw"]
+        mock_enhanced.assert_not_called()
+
+    def test_detect_falls_through_to_later_stage(self):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        decoded = [[], [], [self._barcode("9784839974206")], []]
+
+        with patch('src.isbn_detector.pyzbar.decode', side_effect=decoded):
+            result = self.detector.detect(test_image)
+
+        assert result.isbns == ["9784839974206"]
+        assert result.stage == "otsu"
+        assert result.stages_tried == ["raw", "adaptive", "otsu"]
+
+    def test_detect_records_stage_metrics(self, metrics):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        decoded = [[], [], [self._barcode("9784839974206")], []]
+
+        with patch('src.isbn_detector.pyzbar.decode', side_effect=decoded):
+            self.detector.detect(test_image)
+
+        assert metrics.timer_stats("detector_detect_seconds").count == 1
+        assert metrics.timer_stats("detector_preprocess_seconds", stage="adaptive").count == 1
+        assert metrics.timer_stats("detector_preprocess_seconds", stage="enhanced") is None
+        assert metrics.timer_stats("detector_decode_seconds", stage="otsu").count == 1
+        assert metrics.counter("detector_scans_total", result="found") == 1
+
+    def test_detect_exhaustive_runs_all_stages(self):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        decoded = [
+            [self._barcode("9784839974206")],
+            [],
+            [self._barcode("9784873115658"), self._barcode("9784839974206")],
+            [],
+        ]
+
+        with patch('src.isbn_detector.pyzbar.decode', side_effect=decoded):
+            result = self.detector.detect(test_image, exhaustive=True)
+
+        assert result.isbns == ["9784839974206", "9784873115658"]
+        assert result.stage == "raw"
+        assert result.stages_tried == ["raw", "adaptive", "otsu", "enhanced"]
+
+    def test_detect_ignores_non_isbn_barcodes(self):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        barcode = SimpleNamespace(type='EAN13', data=b"4901234567894")
+
+        with patch('src.isbn_detector.pyzbar.decode', return_value=[barcode]):
+            result = self.detector.detect(test_image)
+
+        assert result.isbns == []
+        assert result.stage is None
+
+    def _striped_image(self):
+        image = np.full((600, 800), 255, dtype=np.uint8)
+        rng = np.random.default_rng(0)
+        x = 300
+        while x < 500:
+            width = int(rng.integers(2, 7))
+            image[200:320, x:x + width] = 0
+            x += width + int(rng.integers(2, 7))
+        return image
+
+    def test_locate_barcodes_finds_striped_region(self):
+        regions = self.detector.locate_barcodes(self._striped_image())
+
+        assert len(regions) >= 1
+        x, y, w, h = regions[0]
+        assert x <= 300 and x + w >= 500
+        assert y <= 200 and y + h >= 320
+
+    def test_locate_barcodes_finds_rotated_region(self):
+        rotated = np.ascontiguousarray(self._striped_image().T)
+
+        regions = self.detector.locate_barcodes(rotated)
+
+        assert len(regions) >= 1
+        x, y, w, h = regions[0]
+        assert x <= 200 and x + w >= 320
+        assert y <= 300 and y + h >= 500
+
+    def test_locate_barcodes_empty_image(self):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+        assert self.detector.locate_barcodes(test_image) == []
+
+    def test_detect_decodes_crop_before_full_frame(self):
+        image = self._striped_image()
+        decoded_shapes = []
+
+        def fake_decode(img):
+            decoded_shapes.append(img.shape)
+            return [self._barcode("9784839974206")]
+
+        with patch('src.isbn_detector.pyzbar.decode', side_effect=fake_decode):
+            result = self.detector.detect(image)
+
+        assert result.isbns == ["9784839974206"]
+        assert result.region is not None
+        assert decoded_shapes == [(result.region[3], result.region[2])]
+
+    def test_detect_falls_back_to_full_frame(self):
+        image = self._striped_image()
+        decoded_shapes = []
+
+        def fake_decode(img):
+            decoded_shapes.append(img.shape)
+            if img.shape == image.shape:
+                return [self._barcode("9784839974206")]
+            return []
+
+        with patch('src.isbn_detector.pyzbar.decode', side_effect=fake_decode):
+            result = self.detector.detect(image)
+
+        assert result.isbns == ["9784839974206"]
+        assert result.region is None
+        assert decoded_shapes[-1] == image.shape
+
+    def test_detect_skips_enhanced_stage_on_regions(self):
+        image = self._striped_image()
+        enhanced_shapes = []
+        original = self.detector._preprocess_enhanced
+
+        def enhanced(img):
+            enhanced_shapes.append(img.shape)
+            return original(img)
+
+        with patch('src.isbn_detector.pyzbar.decode', return_value=[]), \
+                patch.object(self.detector, '_preprocess_enhanced', side_effect=enhanced):
+            result = self.detector.detect(image)
+
+        assert result.isbns == []
+        assert result.stages_tried.count("enhanced") == 1
+        assert enhanced_shapes == [image.shape]
+
+    def test_working_scales_small_image(self):
+        test_image = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+        assert self.detector._working_scales(test_image) == [1.0]
+
+    def test_working_scales_large_image(self):
+        detector = ISBNDetector(max_working_size=1000, max_escalation_size=None)
+        test_image = np.zeros((3000, 4000), dtype=np.uint8)
+
+        assert detector._working_scales(test_image) == [0.25, 0.5, 1.0]
+
+    def test_working_scales_capped_by_max_escalation_size(self):
+        detector = ISBNDetector(max_working_size=1000, max_escalation_size=2000)
+        test_image = np.zeros((3000, 4000), dtype=np.uint8)
+
+        assert detector._working_scales(test_image) == [0.25, 0.5]
+
+    def test_working_scales_image_between_limits(self):
+        detector = ISBNDetector(max_working_size=1000, max_escalation_size=2000)
+
+        assert detector._working_scales(np.zeros((1200, 1600), dtype=np.uint8)) == [0.625, 1.0]
+        assert detector._working_scales(np.zeros((3000, 4000), dtype=np.uint8))[-1] == 0.5
+
+    def test_detect_runs_enhanced_stage_once_at_final_scale(self):
+        detector = ISBNDetector(max_working_size=1000, max_escalation_size=None)
+        test_image = np.zeros((3000, 4000), dtype=np.uint8)
+        enhanced_shapes = []
+
+        def enhanced(img):
+            enhanced_shapes.append(img.shape)
+            return img
+
+        with patch('src.isbn_detector.pyzbar.decode', return_value=[]), \
+                patch.object(detector, '_preprocess_enhanced', side_effect=enhanced):
+            result = detector.detect(test_image)
+
+        assert result.isbns == []
+        assert enhanced_shapes == [test_image.shape]
+
+    def test_detect_large_image_starts_at_working_size(self):
+        detector = ISBNDetector(max_working_size=1000)
+        test_image = np.zeros((3000, 4000), dtype=np.uint8)
+        decoded_shapes = []
+
+        def fake_decode(img):
+            decoded_shapes.append(img.shape)
+            return [self._barcode("9784839974206")]
+
+        with patch('src.isbn_detector.pyzbar.decode', side_effect=fake_decode):
+            result = detector.detect(test_image)
+
+        assert result.isbns == ["9784839974206"]
+        assert result.scale == 0.25
+        assert decoded_shapes == [(750, 1000)]
+
+    def test_detect_escalates_scale_when_not_found(self):
+        detector = ISBNDetector(max_working_size=1000)
+        test_image = np.zeros((3000, 4000), dtype=np.uint8)
+
+        def fake_decode(img):
+            if img.shape == (1500, 2000):
+                return [self._barcode("9784839974206")]
+            return []
+
+        with patch('src.isbn_detector.pyzbar.decode', side_effect=fake_decode):
+            result = detector.detect(test_image)
+
+        assert result.isbns == ["9784839974206"]
+        assert result.scale == 0.5
+
+    def test_detect_region_in_original_coordinates(self):
+        detector = ISBNDetector(max_working_size=400)
+        image = self._striped_image()
+
+        with patch('src.isbn_detector.pyzbar.decode', return_value=[self._barcode("9784839974206")]):
+            result = detector.detect(image)
+
+        assert result.scale == 0.5
+        x, y, w, h = result.region
+        assert x <= 300 and x + w >= 500
+        assert y <= 200 and y + h >= 320
+
+    def test_detect_many_sequential_keeps_index(self, tmp_path):
+        path = tmp_path / "book.png"
+        Image.new('RGB', (100, 100)).save(path)
+        images = [np.zeros((100, 100, 3), dtype=np.uint8), path]
+
+        with patch('src.isbn_detector.pyzbar.decode', return_value=[self._barcode("9784839974206")]):
+            results = list(self.detector.detect_many(images, max_workers=1))
+
+        assert [r.index for r in results] == [0, 1]
+        assert results[0].path is None
+        assert results[1].path == str(path)
+        assert all(r.isbns == ["9784839974206"] for r in results)
+
+    def test_detect_many_reports_unreadable_file(self, tmp_path):
+        path = tmp_path / "missing.png"
+
+        results = list(self.detector.detect_many([path], max_workers=1))
+
+        assert len(results) == 1
+        assert results[0].result is None
+        assert results[0].error is not None
+        assert results[0].isbns == []
+
+    def test_detect_many_process_pool(self, tmp_path):
+        paths = []
+        for i in range(4):
+            path = tmp_path / f"book{i}.png"
+            Image.new('RGB', (100, 100)).save(path)
+            paths.append(path)
+
+        results = list(self.detector.detect_many(paths, max_workers=2))
+
+        assert sorted(r.index for r in results) == [0, 1, 2, 3]
+        assert all(r.error is None for r in results)
+        assert all(r.path == str(paths[r.index]) for r in results)
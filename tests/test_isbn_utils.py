@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from src.isbn_utils import (
+    normalize_isbn, isbn10_to_isbn13, normalize_isbns, validate_isbns, isbns_to_isbn10
+)
+
+
+class TestISBNUtils:
+    def test_normalize_isbn_removes_hyphens_and_spaces(self):
+        assert normalize_isbn("978-4-8399 7420-6") == "9784839974206"
+
+    def test_normalize_isbn_converts_isbn10(self):
+        assert normalize_isbn("4-8399-7420-9") == "9784839974206"
+
+    def test_normalize_isbn_converts_isbn10_with_x_check_digit(self):
+        assert normalize_isbn("0-8044-2957-x") == "9780804429573"
+
+    def test_normalize_isbn_keeps_malformed_10_characters(self):
+        assert normalize_isbn("abcdefghij") == "ABCDEFGHIJ"
+        assert normalize_isbn("12345X7890") == "12345X7890"
+
+    def test_isbn10_to_isbn13_with_x_check_digit(self):
+        assert isbn10_to_isbn13("080442957X") == "9780804429573"
+
+
+class TestBulkISBN:
+    def test_normalize_isbns(self):
+        result = normalize_isbns([
+            "978-4-8399 7420-6",
+            "4-8399-7420-9",
+            "080442957x",
+            " 9784873115658 ",
+        ])
+
+        assert result.isbn13.tolist() == ["9784839974206", "9784839974206", "9780804429573", "9784873115658"]
+        assert result.valid.all()
+        assert result.was_isbn10.tolist() == [False, True, True, False]
+
+    def test_invalid_codes(self):
+        codes = ["9784839974207", "4839974208", "abc", "", "97848399742061", "４８３９９７４２０９", "X839974209"]
+
+        result = normalize_isbns(codes)
+
+        assert not result.valid.any()
+        assert result.isbn13.tolist() == [""] * len(codes)
+
+    def test_tabs_and_control_characters_are_invalid(self):
+        # validate_isbn と同じく、取り除くのはハイフンと空白だけ
+        codes = ["9784873115658\t", "978\n4873115658", "\t4839974209"]
+
+        assert not validate_isbns(codes).any()
+
+    def test_compacts_separators_in_any_position(self):
+        codes = ["- 978-4-8399-7420-6 -", "4 8 3 9 9 7 4 2 0 9", "9784839974206"]
+
+        assert normalize_isbns(codes).isbn13.tolist() == ["9784839974206"] * 3
+
+    def test_matches_scalar_normalize(self):
+        codes = ["4-87311-565-5", "978-4-87311-565-8", "4-8399-7420-9", "0-8044-2957-X"]
+
+        result = normalize_isbns(codes)
+
+        assert result.isbn13.tolist() == [normalize_isbn(code) for code in codes]
+
+    def test_validate_isbns_keeps_shape(self):
+        valid = validate_isbns(np.array([["9784839974206", "bad"], ["4839974209", "9784839974200"]]))
+
+        assert valid.tolist() == [[True, False], [True, False]]
+
+    def test_empty_input(self):
+        result = normalize_isbns([])
+
+        assert result.isbn13.shape == (0,)
+        assert result.valid.shape == (0,)
+
+    def test_isbns_to_isbn10(self):
+        isbn10, ok = isbns_to_isbn10(["9784839974206", "9780804429573", "4873115655", "9791234567896", "bad"])
+
+        assert isbn10.tolist() == ["4839974209", "080442957X", "4873115655", "", ""]
+        assert ok.tolist() == [True, True, True, False, False]
@@ -0,0 +1,110 @@
+import json
+import pytest
+from unittest.mock import Mock
+from src.book_api_client import BookAPIClient
+from src.image_url_validator import ImageURLValidator
+from src.metrics import Metrics
+from src.openbd_client import BookInfo
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMetrics:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.metrics = Metrics(buckets=(0.1, 1.0), clock=self.clock)
+
+    def test_counter_by_labels(self):
+        self.metrics.inc("cache_total", result="hit")
+        self.metrics.inc("cache_total", result="hit")
+        self.metrics.inc("cache_total", result="miss")
+
+        assert self.metrics.counter("cache_total", result="hit") == 2
+        assert self.metrics.counter("cache_total", result="miss") == 1
+        assert self.metrics.counter("cache_total") == 0
+
+    def test_timer_records_duration(self):
+        with self.metrics.timer("fetch_seconds", source="amazon"):
+            self.clock.now += 0.5
+
+        stats = self.metrics.timer_stats("fetch_seconds", source="amazon")
+        assert stats.count == 1
+        assert stats.total == pytest.approx(0.5)
+        assert stats.buckets == [0, 1, 0]
+
+    def test_timer_records_on_exception(self):
+        with pytest.raises(ValueError):
+            with self.metrics.timer("fetch_seconds"):
+                self.clock.now += 2.0
+                raise ValueError()
+
+        stats = self.metrics.timer_stats("fetch_seconds")
+        assert stats.count == 1
+        assert stats.buckets == [0, 0, 1]
+
+    def test_json_export(self):
+        self.metrics.inc("cache_total", result="hit")
+        self.metrics.observe("fetch_seconds", 0.05)
+        self.metrics.observe("fetch_seconds", 0.15)
+
+        data = json.loads(self.metrics.to_json())
+
+        assert data["counters"] == [{"name": "cache_total", "labels": {"result": "hit"}, "value": 1}]
+        timer = data["timers"][0]
+        assert timer["count"] == 2
+        assert timer["mean"] == pytest.approx(0.1)
+        assert timer["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 2}
+
+    def test_prometheus_export(self):
+        self.metrics.inc("cache_total", result="hit")
+        self.metrics.observe("fetch_seconds", 0.05, source='a"b')
+
+        text = self.metrics.to_prometheus(prefix="app_")
+
+        assert "# TYPE app_cache_total counter" in text
+        assert 'app_cache_total{result="hit"} 1' in text
+        assert "# TYPE app_fetch_seconds histogram" in text
+        assert 'app_fetch_seconds_bucket{source="a\\"b",le="0.1"} 1' in text
+        assert 'app_fetch_seconds_bucket{source="a\\"b",le="+Inf"} 1' in text
+        assert 'app_fetch_seconds_count{source="a\\"b"} 1' in text
+
+    def test_reset(self):
+        self.metrics.inc("cache_total")
+        self.metrics.reset()
+
+        assert self.metrics.snapshot() == {"counters": [], "timers": []}
+
+
+class TestInstrumentation:
+    def test_book_lookup_records_sources_and_cache(self, metrics):
+        client = BookAPIClient()
+        client.amazon.get_book_info = Mock(return_value=None)
+        client.google.get_book_info = Mock(return_value=None)
+        client.openbd.get_book_info = Mock(return_value=BookInfo(isbn="9784839974206", title="Test", page_count=100))
+        client.image_validator = ImageURLValidator(probe=lambda url: True)
+
+        client.get_book_info("9784839974206")
+        client.get_book_info("9784839974206")
+
+        assert metrics.timer_stats("lookup_seconds").count == 1
+        assert metrics.timer_stats("lookup_source_seconds", source="amazon").count == 1
+        assert metrics.counter("lookup_source_total", source="openbd", result="found") == 1
+        assert metrics.counter("lookup_fallback_total", to="google_openbd") == 1
+        assert metrics.counter("lookup_cache_total", layer="memory", result="hit") == 1
+        assert metrics.counter("lookup_cache_total", layer="memory", result="miss") == 1
+
+    def test_image_validation_cache(self, metrics):
+        validator = ImageURLValidator(probe=lambda url: True)
+
+        validator.is_valid("https://example.com/a.jpg")
+        validator.is_valid("https://example.com/a.jpg")
+
+        assert metrics.timer_stats("image_validation_seconds").count == 1
+        assert metrics.counter("image_validation_cache_total", result="hit") == 1
+        assert metrics.counter("image_validation_cache_total", result="miss") == 1
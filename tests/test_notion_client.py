@@ -0,0 +1,326 @@
+import json
+import os
+import tempfile
+import pytest
+import requests
+import responses
+from src.notion_client import NotionClient
+from src.notion_index import NotionISBNIndex
+from src.openbd_client import BookInfo
+
+
+DATABASE_ID = "0123456789abcdef0123456789abcdef"
+DATABASE_URL = "https://api.notion.com/v1/databases/01234567-89ab-cdef-0123-456789abcdef"
+PAGES_URL = "https://api.notion.com/v1/pages"
+
+SCHEMA = {
+    "properties": {
+        "Name": {"type": "title"},
+        "ISBN": {"type": "rich_text"},
+        "Pages": {"type": "number"},
+    }
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNotionClient:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.client = NotionClient("token", clock=self.clock)
+
+    def book(self, isbn, page_count=None):
+        return BookInfo(isbn=isbn, title=f"Book {isbn}", page_count=page_count)
+
+    @responses.activate
+    def test_property_mapping_is_cached(self):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+
+        first = self.client.get_property_mapping(DATABASE_ID)
+        second = self.client.get_property_mapping(DATABASE_ID)
+
+        assert first == {"Name": "title", "ISBN": "rich_text", "Pages": "number"}
+        assert second == first
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_custom_base_url(self):
+        responses.add(
+            responses.GET,
+            DATABASE_URL.replace("https://api.notion.com/v1", "http://127.0.0.1:8765/notion/v1"),
+            json=SCHEMA,
+            status=200
+        )
+
+        client = NotionClient("token", base_url="http://127.0.0.1:8765/notion/v1")
+
+        assert client.get_property_mapping(DATABASE_ID) == {"Name": "title", "ISBN": "rich_text", "Pages": "number"}
+
+    @responses.activate
+    def test_property_mapping_expires(self):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+
+        self.client.get_property_mapping(DATABASE_ID)
+        self.clock.now += self.client.schema_ttl + 1
+        self.client.get_property_mapping(DATABASE_ID)
+
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_failed_property_mapping_is_not_cached(self):
+        responses.add(responses.GET, DATABASE_URL, status=500)
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+
+        assert self.client.get_property_mapping(DATABASE_ID) is None
+        assert self.client.get_property_mapping(DATABASE_ID) is not None
+
+    @responses.activate
+    def test_add_book_to_database(self):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+        responses.add(responses.POST, PAGES_URL, json={"id": "page-1"}, status=200)
+
+        page, error = self.client.add_book_to_database(DATABASE_ID, self.book("9784873115658", 260))
+
+        assert error is None
+        assert page == {"id": "page-1"}
+        body = json.loads(responses.calls[1].request.body)
+        assert body["parent"] == {"database_id": "01234567-89ab-cdef-0123-456789abcdef"}
+        assert body["properties"]["Pages"] == {"number": 260}
+
+    @responses.activate
+    def test_add_books_fetches_schema_once(self):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+        responses.add(responses.POST, PAGES_URL, json={"id": "page"}, status=200)
+        books = [self.book(f"978487311{i:04d}") for i in range(10)]
+
+        results = self.client.add_books_to_database(DATABASE_ID, books, max_workers=4)
+
+        assert [r.index for r in results] == list(range(10))
+        assert [r.book for r in results] == books
+        assert all(r.ok for r in results)
+        methods = [call.request.method for call in responses.calls]
+        assert methods.count("GET") == 1
+        assert methods.count("POST") == 10
+
+    @responses.activate
+    def test_add_books_reports_failures_per_record(self):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+        responses.add(responses.POST, PAGES_URL, json={"id": "page-1"}, status=200)
+        responses.add(responses.POST, PAGES_URL, body="validation_error", status=400)
+
+        results = self.client.add_books_to_database(
+            DATABASE_ID,
+            [self.book("9784873115658"), self.book("9784839974206")],
+            max_workers=1
+        )
+
+        assert results[0].ok
+        assert results[0].page == {"id": "page-1"}
+        assert not results[1].ok
+        assert "400" in results[1].error
+
+    def test_add_books_without_token(self):
+        client = NotionClient()
+
+        results = client.add_books_to_database(DATABASE_ID, [self.book("9784873115658")])
+
+        assert results[0].error == "APIトークンが設定されていません"
+
+    def test_add_books_with_invalid_database_id(self):
+        results = self.client.add_books_to_database("invalid", [self.book("9784873115658")])
+
+        assert results[0].error == "データベースIDの形式が正しくありません"
+
+
+QUERY_URL = f"{DATABASE_URL}/query"
+
+
+def notion_page(page_id, isbn):
+    return {
+        "id": page_id,
+        "properties": {
+            "ISBN": {"type": "rich_text", "rich_text": [{"plain_text": isbn}]}
+        }
+    }
+
+
+class TestNotionUpsert:
+    def setup_method(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = NotionISBNIndex(os.path.join(self.tmp.name, "index.sqlite3"))
+        self.client = NotionClient("token", index=self.index)
+
+    def teardown_method(self):
+        self.tmp.cleanup()
+
+    def add_schema_and_query(self, *pages):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+        responses.add(
+            responses.POST,
+            QUERY_URL,
+            json={"results": list(pages), "has_more": False, "next_cursor": None},
+            status=200
+        )
+
+    @responses.activate
+    def test_sync_index_paginates(self):
+        responses.add(
+            responses.POST,
+            QUERY_URL,
+            json={"results": [notion_page("page-1", "978-4-87311-565-8")], "has_more": True, "next_cursor": "c1"},
+            status=200
+        )
+        responses.add(
+            responses.POST,
+            QUERY_URL,
+            json={"results": [notion_page("page-2", "4839974209")], "has_more": False, "next_cursor": None},
+            status=200
+        )
+
+        count, error = self.client.sync_index(DATABASE_ID)
+
+        assert (count, error) == (2, None)
+        assert json.loads(responses.calls[1].request.body)["start_cursor"] == "c1"
+        clean_id = "01234567-89ab-cdef-0123-456789abcdef"
+        assert self.index.get(clean_id, "9784873115658") == "page-1"
+        assert self.index.get(clean_id, "9784839974206") == "page-2"
+
+    @responses.activate
+    def test_update_existing_page(self):
+        self.add_schema_and_query(notion_page("page-1", "9784873115658"))
+        responses.add(responses.PATCH, "https://api.notion.com/v1/pages/page-1", json={"id": "page-1"}, status=200)
+
+        page, error = self.client.add_book_to_database(
+            DATABASE_ID, BookInfo(isbn="9784873115658", title="リーダブルコード"), on_existing="update"
+        )
+
+        assert (page, error) == ({"id": "page-1"}, None)
+        assert [call.request.method for call in responses.calls] == ["GET", "POST", "PATCH"]
+
+    @responses.activate
+    def test_skip_existing_without_network(self):
+        self.add_schema_and_query(notion_page("page-1", "9784873115658"))
+        responses.add(responses.POST, PAGES_URL, json={"id": "page-2"}, status=200)
+        books = [BookInfo(isbn="9784873115658", title="A"), BookInfo(isbn="9784839974206", title="B")]
+
+        results = self.client.add_books_to_database(DATABASE_ID, books, max_workers=1, on_existing="skip")
+
+        assert [r.action for r in results] == ["skipped", "created"]
+        assert results[0].page == {"id": "page-1"}
+        page_posts = [c for c in responses.calls if c.request.url == PAGES_URL]
+        assert len(page_posts) == 1
+
+    @responses.activate
+    def test_created_page_is_indexed(self):
+        self.add_schema_and_query()
+        responses.add(responses.POST, PAGES_URL, json={"id": "page-9"}, status=200)
+        book = BookInfo(isbn="9784873115658", title="A")
+
+        first = self.client.add_books_to_database(DATABASE_ID, [book], on_existing="skip")
+        second = self.client.add_books_to_database(DATABASE_ID, [book], on_existing="skip")
+
+        assert first[0].action == "created"
+        assert second[0].action == "skipped"
+        assert second[0].page == {"id": "page-9"}
+        # スキーマ取得・インデックス作成・ページ作成の3回だけ
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_deleted_page_is_recreated(self):
+        self.add_schema_and_query(notion_page("page-1", "9784873115658"))
+        responses.add(responses.PATCH, "https://api.notion.com/v1/pages/page-1", status=404)
+        responses.add(responses.POST, PAGES_URL, json={"id": "page-2"}, status=200)
+
+        results = self.client.add_books_to_database(
+            DATABASE_ID, [BookInfo(isbn="9784873115658", title="A")], on_existing="update"
+        )
+
+        assert results[0].action == "created"
+        assert self.index.get("01234567-89ab-cdef-0123-456789abcdef", "9784873115658") == "page-2"
+
+    @responses.activate
+    def test_sync_failure_is_reported(self):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+        responses.add(responses.POST, QUERY_URL, body="unauthorized", status=401)
+
+        results = self.client.add_books_to_database(
+            DATABASE_ID, [BookInfo(isbn="9784873115658", title="A")], on_existing="update"
+        )
+
+        assert "401" in results[0].error
+
+    @responses.activate
+    def test_sync_connection_error_is_reported_per_book(self):
+        responses.add(responses.GET, DATABASE_URL, json=SCHEMA, status=200)
+        responses.add(responses.POST, QUERY_URL, body=requests.ConnectionError("connection refused"))
+        books = [BookInfo(isbn="9784873115658", title="A"), BookInfo(isbn="9784839974206", title="B")]
+
+        results = self.client.add_books_to_database(DATABASE_ID, books, on_existing="update")
+
+        assert [r.index for r in results] == [0, 1]
+        assert all("connection refused" in r.error for r in results)
+
+    @responses.activate
+    def test_index_is_resynced_after_ttl(self):
+        self.add_schema_and_query()
+        responses.add(
+            responses.POST,
+            QUERY_URL,
+            json={"results": [notion_page("page-1", "9784873115658")], "has_more": False, "next_cursor": None},
+            status=200
+        )
+        client = NotionClient("token", index=self.index, index_ttl=0)
+        book = BookInfo(isbn="9784873115658", title="A")
+
+        client.sync_index(DATABASE_ID)
+        results = client.add_books_to_database(DATABASE_ID, [book], on_existing="skip")
+
+        assert results[0].action == "skipped"
+        assert results[0].page == {"id": "page-1"}
+        # 2回目の同期は前回以降に編集されたページだけを問い合わせる
+        queries = [json.loads(c.request.body) for c in responses.calls if c.request.url == QUERY_URL]
+        assert "filter" not in queries[0]
+        assert queries[1]["filter"]["timestamp"] == "last_edited_time"
+        assert "on_or_after" in queries[1]["filter"]["last_edited_time"]
+
+    @responses.activate
+    def test_incremental_sync_keeps_unedited_pages(self):
+        responses.add(
+            responses.POST,
+            QUERY_URL,
+            json={"results": [notion_page("page-1", "9784873115658"), notion_page("page-2", "9784839974206")],
+                  "has_more": False, "next_cursor": None},
+            status=200
+        )
+        archived = dict(notion_page("page-2", "9784839974206"), archived=True)
+        responses.add(
+            responses.POST,
+            QUERY_URL,
+            json={"results": [archived, notion_page("page-3", "9784274068560")],
+                  "has_more": False, "next_cursor": None},
+            status=200
+        )
+        client = NotionClient("token", index=self.index, index_ttl=0)
+        clean_id = "01234567-89ab-cdef-0123-456789abcdef"
+
+        assert client.sync_index(DATABASE_ID) == (2, None)
+        assert client._ensure_index(clean_id) is None
+
+        assert self.index.get(clean_id, "9784873115658") == "page-1"
+        assert self.index.get(clean_id, "9784839974206") is None
+        assert self.index.get(clean_id, "9784274068560") == "page-3"
+
+    def test_edited_time_filter_rounds_down_to_previous_minute(self):
+        # 2026-10-18T10:05:30Z
+        assert NotionClient._edited_time_filter(1792317930.0) == "2026-10-18T10:04:00+00:00"
+
+    def test_page_isbn_pads_number_isbn10(self):
+        page = {"id": "page-1", "properties": {"ISBN": {"type": "number", "number": 306406152}}}
+
+        assert NotionClient._page_isbn(page) == "9780306406157"
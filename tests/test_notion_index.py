@@ -0,0 +1,63 @@
+import os
+import tempfile
+import pytest
+from src.notion_index import NotionISBNIndex
+
+
+class TestNotionISBNIndex:
+    def setup_method(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.sqlite3")
+        self.index = NotionISBNIndex(self.path)
+
+    def teardown_method(self):
+        self.tmp.cleanup()
+
+    def test_set_and_get_normalizes_isbn(self):
+        self.index.set("db", "978-4-87311-565-8", "page-1")
+
+        assert self.index.get("db", "9784873115658") == "page-1"
+        assert self.index.get("db", "4873115655") == "page-1"
+        assert self.index.get("other", "9784873115658") is None
+
+    def test_replace_marks_synced(self):
+        self.index.set("db", "9784873115658", "old")
+        assert self.index.synced_at("db") is None
+
+        self.index.replace("db", {"9784839974206": "page-2"})
+
+        assert self.index.synced_at("db") is not None
+        assert self.index.get("db", "9784873115658") is None
+        assert self.index.count("db") == 1
+
+    def test_update_applies_edited_pages(self):
+        self.index.replace("db", {"9784873115658": "page-1", "9784839974206": "page-2"}, synced_at=100.0)
+
+        self.index.update("db", [("page-1", "9784274068560"), ("page-2", None), ("page-3", "4873115655")],
+                          synced_at=200.0)
+
+        assert self.index.synced_at("db") == 200.0
+        assert self.index.get("db", "9784274068560") == "page-1"
+        assert self.index.get("db", "9784839974206") is None
+        # ISBNが書き換えられたページの古い対応は残らない
+        assert self.index.get("db", "9784873115658") == "page-3"
+        assert self.index.count("db") == 2
+
+    def test_update_keeps_existing_page_for_duplicate_isbn(self):
+        self.index.replace("db", {"9784873115658": "page-1"})
+
+        self.index.update("db", [("page-2", "9784873115658")])
+
+        assert self.index.get("db", "9784873115658") == "page-1"
+
+    def test_delete(self):
+        self.index.set("db", "9784873115658", "page-1")
+
+        self.index.delete("db", "9784873115658")
+
+        assert self.index.get("db", "9784873115658") is None
+
+    def test_persists_across_instances(self):
+        self.index.set("db", "9784873115658", "page-1")
+
+        assert NotionISBNIndex(self.path).get("db", "9784873115658") == "page-1"
@@ -1,8 +1,10 @@
+import asyncio
 import pytest
 import json
+import httpx
 import responses
 from pathlib import Path
-from src.openbd_client import OpenBDClient, BookInfo
+from src.openbd_client import AsyncOpenBDClient, OpenBDClient
 
 
 class TestOpenBDClient:
@@ -61,6 +63,22 @@ class TestOpenBDClient:
 
         assert book is None
 
+    @responses.activate
+    def test_custom_base_url(self):
+        isbn = "9784839974206"
+        responses.add(
+            responses.GET,
+            f"http://127.0.0.1:8765/openbd/v1/get?isbn={isbn}",
+            json=self.mock_data['openbd_success'],
+            status=200
+        )
+
+        client = OpenBDClient(base_url="http://127.0.0.1:8765/openbd/v1/")
+        book = client.get_book_info(isbn)
+
+        assert book is not None
+        assert book.title == "リーダブルコード"
+
     def test_parse_response_with_full_data(self):
         data = self.mock_data['openbd_success'][0]
 
@@ -75,3 +93,115 @@ class TestOpenBDClient:
         book = self.client._parse_response(None)
 
         assert book is None
+
+    @responses.activate
+    def test_get_many_maps_results_to_isbns(self):
+        isbns = ["9784839974206", "9999999999999"]
+        responses.add(
+            responses.GET,
+            f"https://api.openbd.jp/v1/get?isbn={','.join(isbns)}",
+            json=self.mock_data['openbd_success'] + self.mock_data['openbd_not_found'],
+            status=200
+        )
+
+        books = self.client.get_many(isbns)
+
+        assert len(responses.calls) == 1
+        assert books["9784839974206"].title == "リーダブルコード"
+        assert books["9999999999999"] is None
+
+    @responses.activate
+    def test_get_many_chunks_requests(self):
+        isbns = ["9784839974206", "9784873115658", "9784274068560"]
+        responses.add(
+            responses.GET,
+            "https://api.openbd.jp/v1/get?isbn=9784839974206,9784873115658",
+            json=self.mock_data['openbd_success'] + self.mock_data['openbd_not_found'],
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            "https://api.openbd.jp/v1/get?isbn=9784274068560",
+            json=self.mock_data['openbd_not_found'],
+            status=200
+        )
+
+        books = self.client.get_many(isbns, chunk_size=2)
+
+        assert len(responses.calls) == 2
+        assert list(books.keys()) == isbns
+        assert books["9784839974206"] is not None
+        assert books["9784873115658"] is None
+        assert books["9784274068560"] is None
+
+    @responses.activate
+    def test_get_many_deduplicates_isbns(self):
+        responses.add(
+            responses.GET,
+            "https://api.openbd.jp/v1/get?isbn=9784839974206",
+            json=self.mock_data['openbd_success'],
+            status=200
+        )
+
+        books = self.client.get_many(["9784839974206", "9784839974206"])
+
+        assert len(responses.calls) == 1
+        assert list(books.keys()) == ["9784839974206"]
+
+    @responses.activate
+    def test_get_many_api_error_returns_none(self):
+        responses.add(
+            responses.GET,
+            "https://api.openbd.jp/v1/get",
+            json={"error": "Internal server error"},
+            status=500
+        )
+
+        books = self.client.get_many(["9784839974206"])
+
+        assert books == {"9784839974206": None}
+
+
+class TestAsyncOpenBDClient:
+    def setup_method(self):
+        fixtures_path = Path(__file__).parent / 'fixtures' / 'mock_responses.json'
+        with open(fixtures_path) as f:
+            self.mock_data = json.load(f)
+
+    def _client(self, handler):
+        return AsyncOpenBDClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    def test_get_book_info_success(self):
+        client = self._client(lambda request: httpx.Response(200, json=self.mock_data['openbd_success']))
+
+        book = asyncio.run(client.get_book_info("9784839974206"))
+
+        assert book == OpenBDClient()._parse_response(self.mock_data['openbd_success'][0])
+
+    def test_get_book_info_not_found(self):
+        client = self._client(lambda request: httpx.Response(200, json=self.mock_data['openbd_not_found']))
+
+        assert asyncio.run(client.get_book_info("9999999999999")) is None
+
+    def test_get_book_info_api_error(self):
+        client = self._client(lambda request: httpx.Response(500, json={"error": "Internal server error"}))
+
+        assert asyncio.run(client.get_book_info("9784839974206")) is None
+
+    def test_get_many_chunks_requests(self):
+        requested = []
+
+        def handler(request):
+            isbns = request.url.params["isbn"].split(",")
+            requested.append(isbns)
+            data = [self.mock_data['openbd_success'][0] if isbn == "9784839974206" else None for isbn in isbns]
+            return httpx.Response(200, json=data)
+
+        client = self._client(handler)
+
+        books = asyncio.run(client.get_many(["9784839974206", "9784873115658", "9784274068560"], chunk_size=2))
+
+        assert sorted(requested) == [["9784274068560"], ["9784839974206", "9784873115658"]]
+        assert books["9784839974206"].title == "リーダブルコード"
+        assert books["9784873115658"] is None
+        assert books["9784274068560"] is None
@@ -0,0 +1,85 @@
+import threading
+import time
+import pytest
+from src.pipeline import Pipeline, Stage
+
+
+class TestPipeline:
+    def test_runs_all_stages(self):
+        pipeline = Pipeline(
+            lambda: range(20),
+            [Stage("double", lambda x: x * 2, workers=4), Stage("inc", lambda x: x + 1, workers=2)]
+        )
+
+        results = sorted(pipeline.run())
+
+        assert results == [x * 2 + 1 for x in range(20)]
+        assert pipeline.stats["double"].processed == 20
+        assert pipeline.stats["inc"].processed == 20
+        assert pipeline.stats["source"].processed == 20
+
+    def test_without_stages(self):
+        assert list(Pipeline(lambda: iter([1, 2, 3]), []).run()) == [1, 2, 3]
+
+    def test_stages_overlap(self):
+        # 2段とも 0.05秒かかる処理を10件。直列なら約1秒、重なれば約0.55秒
+        def slow(x):
+            time.sleep(0.05)
+            return x
+
+        pipeline = Pipeline(lambda: range(10), [Stage("a", slow), Stage("b", slow)])
+        started = time.perf_counter()
+        assert len(list(pipeline.run())) == 10
+
+        assert time.perf_counter() - started < 0.9
+
+    def test_backpressure_limits_source(self):
+        produced = []
+        release = threading.Event()
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        def blocked(x):
+            release.wait()
+            return x
+
+        pipeline = Pipeline(source, [Stage("blocked", blocked)], queue_size=2)
+        results = []
+        consumer = threading.Thread(target=lambda: results.extend(pipeline.run()))
+        consumer.start()
+        time.sleep(0.2)
+
+        # 下流が止まっている間、ソースはキューの上限＋処理中の分しか進まない
+        assert len(produced) <= 5
+
+        release.set()
+        consumer.join()
+        assert results == list(range(100))
+
+    def test_stage_error_is_raised(self):
+        def fail(x):
+            if x == 3:
+                raise ValueError("bad item")
+            return x
+
+        with pytest.raises(ValueError, match="bad item"):
+            list(Pipeline(lambda: range(10), [Stage("fail", fail, workers=2)]).run())
+
+    def test_source_error_is_raised(self):
+        def source():
+            yield 1
+            raise RuntimeError("source failed")
+
+        with pytest.raises(RuntimeError, match="source failed"):
+            list(Pipeline(source, [Stage("id", lambda x: x)]).run())
+
+    def test_early_exit_stops_threads(self):
+        pipeline = Pipeline(lambda: iter(range(10 ** 6)), [Stage("id", lambda x: x, workers=2)], queue_size=4)
+
+        for item in pipeline.run():
+            break
+
+        assert threading.active_count() < 5
@@ -0,0 +1,148 @@
+import pytest
+import responses
+from src.http_session import RateLimitedAdapter, create_session
+from src.rate_limiter import Backoff, RateLimiter, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=2.0, capacity=2, clock=self.clock)
+
+    def test_burst_then_wait(self):
+        assert self.bucket.reserve() == 0
+        assert self.bucket.reserve() == 0
+        assert self.bucket.reserve() == pytest.approx(0.5)
+        assert self.bucket.reserve() == pytest.approx(1.0)
+
+    def test_refill_over_time(self):
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.clock.now += 1.0
+
+        assert self.bucket.reserve() == 0
+        assert self.bucket.reserve() == 0
+
+    def test_penalize_blocks_and_halves_rate(self):
+        self.bucket.penalize(3.0)
+
+        assert self.bucket.rate == 1.0
+        assert self.bucket.reserve() == pytest.approx(3.0)
+
+    def test_reward_restores_rate(self):
+        self.bucket.penalize(0)
+        for _ in range(20):
+            self.bucket.reward()
+
+        assert self.bucket.rate == 2.0
+
+
+class TestRateLimiter:
+    def test_bucket_per_host(self):
+        limiter = RateLimiter(host_limits={"www.amazon.co.jp": (1.0, 1)}, default_limit=(5.0, 5))
+
+        amazon = limiter.bucket("https://www.amazon.co.jp/dp/4873115655")
+
+        assert amazon is limiter.bucket("https://www.amazon.co.jp/s?k=book")
+        assert amazon.rate == 1.0
+        assert limiter.bucket("https://api.openbd.jp/v1/get").rate == 5.0
+
+
+class TestBackoff:
+    def test_exponential_with_cap(self):
+        backoff = Backoff(base=0.5, cap=4.0, rand=lambda low, high: high)
+
+        assert [backoff.delay(i) for i in range(5)] == [0.5, 1.0, 2.0, 4.0, 4.0]
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_http_date(self):
+        assert parse_retry_after("Thu, 01 Jan 1970 00:00:10 GMT", now=4.0) == 6.0
+
+    def test_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRateLimitedAdapter:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.sleeps = []
+        self.limiter = RateLimiter(host_limits={}, default_limit=(100.0, 100), clock=self.clock)
+        self.session = create_session(rate_limiter=self.limiter)
+        adapter = self.session.get_adapter("https://")
+        adapter.sleep = self.record_sleep
+        adapter.retry_policy.backoff = Backoff(base=0.5, cap=30.0, rand=lambda low, high: high)
+
+    def record_sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.clock.now += seconds
+
+    def test_session_uses_rate_limited_adapter(self):
+        assert isinstance(self.session.get_adapter("https://api.openbd.jp"), RateLimitedAdapter)
+
+    @responses.activate
+    def test_retries_429_with_retry_after(self):
+        url = "https://www.amazon.co.jp/dp/4873115655"
+        responses.add(responses.GET, url, status=429, headers={"Retry-After": "2"})
+        responses.add(responses.GET, url, status=200, body="ok")
+
+        response = self.session.get(url)
+
+        assert response.status_code == 200
+        assert self.sleeps == [pytest.approx(2.0)]
+
+    @responses.activate
+    def test_retries_503_with_backoff(self):
+        url = "https://www.googleapis.com/books/v1/volumes"
+        responses.add(responses.GET, url, status=503)
+        responses.add(responses.GET, url, status=503)
+        responses.add(responses.GET, url, status=200, json={})
+
+        response = self.session.get(url)
+
+        assert response.status_code == 200
+        assert len(responses.calls) == 3
+        # 2回目の待ち時間は rate が下がった分も含めて1回目より長い
+        assert self.sleeps[0] == pytest.approx(0.5)
+        assert self.sleeps[1] >= 1.0
+
+    @responses.activate
+    def test_gives_up_after_max_retries(self):
+        url = "https://api.openbd.jp/v1/get"
+        responses.add(responses.GET, url, status=429)
+
+        response = self.session.get(url)
+
+        assert response.status_code == 429
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_long_retry_after_is_not_waited(self):
+        url = "https://api.openbd.jp/v1/get"
+        responses.add(responses.GET, url, status=429, headers={"Retry-After": "3600"})
+
+        response = self.session.get(url)
+
+        assert response.status_code == 429
+        assert len(responses.calls) == 1
+        assert self.sleeps == []
+
+        # 次のリクエストも Retry-After の1時間ではなく backoff.cap までしか待たない
+        responses.replace(responses.GET, url, status=200, json=[])
+        response = self.session.get(url)
+
+        assert response.status_code == 200
+        assert len(self.sleeps) == 1
+        assert self.sleeps[0] <= 30.0
@@ -0,0 +1,239 @@
+import time
+import threading
+import pytest
+from unittest.mock import Mock
+from src.book_cache import BookCache
+from src.openbd_client import BookInfo
+from src.revalidating_client import RevalidatingBookClient, TRACKED_FIELDS, missing_fields
+
+
+DAY = 24 * 60 * 60
+
+
+def complete_book(**overrides):
+    fields = dict(
+        isbn="9784839974206",
+        title="リーダブルコード",
+        authors=["Dustin Boswell", "Trevor Foucher"],
+        publisher="オライリー・ジャパン",
+        published_date="2012-06",
+        page_count=260,
+        cover_image_url="https://cover.openbd.jp/9784839974206.jpg",
+        source="openbd"
+    )
+    fields.update(overrides)
+    return BookInfo(**fields)
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestMissingFields:
+    def test_complete_book(self):
+        assert missing_fields(complete_book()) == ()
+
+    def test_incomplete_book(self):
+        book = complete_book(page_count=None, cover_image_url=None)
+
+        assert missing_fields(book) == ("page_count", "cover_image_url")
+
+    def test_not_found(self):
+        assert missing_fields(None) == TRACKED_FIELDS
+
+
+class TestRevalidatingBookClient:
+    def setup_method(self):
+        self.clock = Clock()
+        self.api = Mock()
+        self.api.cache = None
+        self.api.google.get_book_info.return_value = None
+        self.api.openbd.get_book_info.return_value = None
+        self.api.image_validator.is_valid.return_value = True
+        self.client = RevalidatingBookClient(self.api, soft_ttl=7 * DAY, incomplete_soft_ttl=DAY,
+                                             background=False, clock=self.clock)
+
+    def test_miss_looks_up_and_caches(self, metrics):
+        book = complete_book()
+        self.api.get_book_info.return_value = book
+
+        assert self.client.get_book_info("9784839974206") == book
+        assert self.client.get_book_info("978-4-8399-7420-6") == book
+
+        self.api.get_book_info.assert_called_once_with("9784839974206")
+        assert metrics.counter("revalidate_cache_total", result="miss") == 1
+        assert metrics.counter("revalidate_cache_total", result="fresh") == 1
+        assert self.client.pending() == 0
+
+    def test_stale_entry_is_served_and_refreshed_later(self, metrics):
+        old = complete_book(title="Old")
+        new = complete_book(title="New")
+        self.api.get_book_info.side_effect = [old, new]
+
+        self.client.get_book_info("9784839974206")
+        self.clock.now += 8 * DAY
+
+        assert self.client.get_book_info("9784839974206") is old
+        assert self.client.pending() == 1
+        assert self.api.get_book_info.call_count == 1
+
+        assert self.client.refresh_pending() == 1
+        self.api.get_book_info.assert_called_with("9784839974206", use_cache=False)
+        assert self.client.get_book_info("9784839974206") is new
+        assert metrics.counter("revalidate_cache_total", result="stale") == 1
+        assert metrics.counter("revalidate_refresh_total", result="unchanged") == 1
+
+    def test_incomplete_entry_uses_shorter_ttl(self):
+        self.api.get_book_info.return_value = complete_book(page_count=None)
+
+        self.client.get_book_info("9784839974206")
+        self.clock.now += 2 * DAY
+        self.client.get_book_info("9784839974206")
+
+        assert self.client.incomplete() == {"9784839974206": ("page_count",)}
+        assert self.client.pending() == 1
+
+    def test_stale_entry_is_queued_once(self):
+        self.api.get_book_info.return_value = complete_book()
+
+        self.client.get_book_info("9784839974206")
+        self.clock.now += 8 * DAY
+        for _ in range(3):
+            self.client.get_book_info("9784839974206")
+
+        assert self.client.pending() == 1
+
+    def test_incomplete_entries_are_refreshed_first(self):
+        books = {
+            "9784839974206": complete_book(),
+            "9784873115658": complete_book(isbn="9784873115658", page_count=None),
+            "9784297127831": complete_book(isbn="9784297127831", page_count=None, cover_image_url=None),
+        }
+        self.api.get_book_info.side_effect = lambda isbn, use_cache=True: books[isbn]
+
+        for isbn in books:
+            self.client.get_book_info(isbn)
+        self.clock.now += 8 * DAY
+        for isbn in books:
+            self.client.get_book_info(isbn)
+        self.api.get_book_info.reset_mock()
+
+        self.client.refresh_pending()
+
+        refreshed = [call.args[0] for call in self.api.get_book_info.call_args_list]
+        assert refreshed == ["9784297127831", "9784873115658", "9784839974206"]
+
+    def test_refresh_fills_missing_fields_and_keeps_known_ones(self, metrics):
+        old = complete_book(page_count=None, source="openbd")
+        new = complete_book(page_count=260, publisher=None, source="google_books")
+        self.api.get_book_info.side_effect = [old, new]
+
+        self.client.get_book_info("9784839974206")
+        self.clock.now += 2 * DAY
+        self.client.get_book_info("9784839974206")
+        self.client.refresh_pending()
+
+        book = self.client.get_book_info("9784839974206")
+        assert book.page_count == 260
+        assert book.publisher == "オライリー・ジャパン"
+        assert self.client.incomplete() == {}
+        assert metrics.counter("revalidate_refresh_total", result="filled") == 1
+
+    def test_refresh_fills_missing_fields_from_other_sources(self, metrics):
+        # Amazon で見つかると通常の検索では openBD に問い合わせないので、取り直しで補う
+        amazon = complete_book(page_count=None, source="amazon")
+        self.api.get_book_info.side_effect = [amazon, complete_book(page_count=None, source="amazon")]
+        self.api.openbd.get_book_info.return_value = complete_book(title="openBD", page_count=260)
+
+        self.client.get_book_info("9784839974206")
+        self.clock.now += 2 * DAY
+        self.client.get_book_info("9784839974206")
+        self.client.refresh_pending()
+
+        book = self.client.get_book_info("9784839974206")
+        assert book.page_count == 260
+        assert book.title == "リーダブルコード"
+        assert book.source == "amazon"
+        self.api.google.get_book_info.assert_called_once_with("9784839974206")
+        self.api.openbd.get_book_info.assert_called_once_with("9784839974206")
+        assert self.client.incomplete() == {}
+        assert metrics.counter("revalidate_refresh_total", result="filled") == 1
+
+    def test_failed_refresh_keeps_previous_book(self, metrics):
+        old = complete_book()
+        self.api.get_book_info.side_effect = [old, RuntimeError("boom")]
+
+        self.client.get_book_info("9784839974206")
+        self.clock.now += 8 * DAY
+        self.client.get_book_info("9784839974206")
+        self.client.refresh_pending()
+
+        assert self.client.get_book_info("9784839974206") is old
+        assert self.client.pending() == 0
+        assert metrics.counter("revalidate_refresh_total", result="failed") == 1
+
+    def test_not_found_is_not_cached(self):
+        book = complete_book()
+        self.api.get_book_info.side_effect = [None, book]
+
+        assert self.client.get_book_info("9784839974206") is None
+        assert self.client.get_book_info("9784839974206") is book
+        assert self.api.get_book_info.call_count == 2
+        assert self.client.pending() == 0
+
+    def test_persistent_cache_age_is_used(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+        old = complete_book(title="Old")
+        cache.set("9784839974206", old)
+        self.api.cache = cache
+        self.api.get_book_info.return_value = old
+        self.clock.now = cache.fetched_at("9784839974206") + 8 * DAY
+
+        self.client.get_book_info("9784839974206")
+
+        assert self.client.pending() == 1
+
+    def test_failed_refresh_does_not_overwrite_persistent_cache(self, tmp_path):
+        cache = BookCache(str(tmp_path / "books.sqlite3"))
+        self.api.cache = cache
+        old = complete_book()
+        self.api.get_book_info.side_effect = [old, None]
+
+        self.client.get_book_info("9784839974206")
+        cache.set("9784839974206", None)
+        self.clock.now += 8 * DAY
+        self.client.get_book_info("9784839974206")
+        self.client.refresh_pending()
+
+        assert cache.get("9784839974206") == (True, old)
+
+    def test_background_refresh_does_not_block(self):
+        old = complete_book(title="Old")
+        new = complete_book(title="New")
+        release = threading.Event()
+
+        def lookup(isbn, use_cache=True):
+            if use_cache:
+                return old
+            release.wait(5)
+            return new
+        self.api.get_book_info.side_effect = lookup
+
+        with RevalidatingBookClient(self.api, soft_ttl=0, incomplete_soft_ttl=0, clock=self.clock) as client:
+            client.get_book_info("9784839974206")
+            self.clock.now += 1
+
+            start = time.perf_counter()
+            assert client.get_book_info("9784839974206") is old
+            assert time.perf_counter() - start < 1
+
+            release.set()
+            deadline = time.monotonic() + 5
+            while client._entries["9784839974206"].book is not new and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert client._entries["9784839974206"].book is new
@@ -0,0 +1,76 @@
+import threading
+import time
+import pytest
+from src.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    def setup_method(self):
+        self.flight = SingleFlight()
+
+    def test_returns_result(self):
+        assert self.flight.do("key", lambda: 42) == 42
+        assert self.flight.in_flight() == 0
+
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+        results = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "book"
+
+        def worker():
+            results.append(self.flight.do("9784839974206", slow))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["book"] * 5
+
+    def test_different_keys_run_separately(self):
+        assert self.flight.do("a", lambda: 1) == 1
+        assert self.flight.do("b", lambda: 2) == 2
+
+    def test_error_is_shared_with_waiters(self):
+        started = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        def worker():
+            try:
+                self.flight.do("key", failing)
+            except ValueError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == ["boom"] * 3
+        assert self.flight.in_flight() == 0
+
+    def test_key_released_after_completion(self):
+        calls = []
+
+        self.flight.do("key", lambda: calls.append(1))
+        self.flight.do("key", lambda: calls.append(1))
+
+        assert len(calls) == 2
@@ -0,0 +1,130 @@
+import time
+from concurrent.futures import Future
+import pytest
+import numpy as np
+from unittest.mock import Mock
+from src.isbn_detector import DetectionResult
+from src.stream_scanner import StreamScanner
+
+
+def slow_frames(count, delay=0.01, shape=(100, 100, 3)):
+    for _ in range(count):
+        time.sleep(delay)
+        yield np.zeros(shape, dtype=np.uint8)
+
+
+class SynchronousExecutor:
+    """submit された関数をその場で実行する（デコード中のフレームのスキップが起きない）"""
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+@pytest.fixture
+def synchronous_decode(monkeypatch):
+    monkeypatch.setattr("src.stream_scanner.ThreadPoolExecutor", SynchronousExecutor)
+
+
+class TestStreamScanner:
+    def setup_method(self):
+        self.detector = Mock()
+
+    def test_emits_each_isbn_once(self):
+        self.detector.detect.return_value = DetectionResult(isbns=["9784839974206"])
+        scanner = StreamScanner(detector=self.detector)
+
+        events = list(scanner.scan(slow_frames(5)))
+
+        assert [e.isbn for e in events] == ["9784839974206"]
+        assert events[0].frame_index == 0
+
+    def test_no_events_when_nothing_detected(self):
+        self.detector.detect.return_value = DetectionResult()
+        scanner = StreamScanner(detector=self.detector)
+
+        events = list(scanner.scan(slow_frames(3)))
+
+        assert events == []
+        assert scanner.stats.frames_decoded == 3
+
+    def test_skips_frames_while_decoding(self):
+        def slow_detect(image):
+            time.sleep(0.05)
+            return DetectionResult()
+
+        self.detector.detect.side_effect = slow_detect
+        scanner = StreamScanner(detector=self.detector)
+        frames = [np.zeros((100, 100, 3), dtype=np.uint8) for _ in range(10)]
+
+        list(scanner.scan(frames))
+
+        assert scanner.stats.frames_seen == 10
+        assert scanner.stats.frames_skipped > 0
+        assert scanner.stats.frames_decoded + scanner.stats.frames_skipped == 10
+
+    def test_reuses_last_region(self, synchronous_decode):
+        shapes = []
+
+        def detect(image):
+            shapes.append(image.shape[:2])
+            return DetectionResult(isbns=["9784839974206"], region=(40, 40, 20, 20))
+
+        self.detector.detect.side_effect = detect
+        scanner = StreamScanner(detector=self.detector, roi_margin=0.5)
+
+        list(scanner.scan(slow_frames(2, delay=0, shape=(200, 200, 3))))
+
+        assert shapes[0] == (200, 200)
+        assert shapes[1] == (40, 40)
+        assert scanner.stats.roi_hits == 1
+
+    def test_falls_back_to_full_frame_when_region_misses(self, synchronous_decode):
+        shapes = []
+
+        def detect(image):
+            shapes.append(image.shape[:2])
+            if len(shapes) == 1:
+                return DetectionResult(isbns=["9784839974206"], region=(40, 40, 20, 20))
+            return DetectionResult()
+
+        self.detector.detect.side_effect = detect
+        scanner = StreamScanner(detector=self.detector, roi_margin=0.5)
+
+        list(scanner.scan(slow_frames(2, delay=0, shape=(200, 200, 3))))
+
+        assert shapes == [(200, 200), (40, 40), (200, 200)]
+
+    def test_debounce_allows_reemit_after_interval(self):
+        now = [0.0]
+        self.detector.detect.return_value = DetectionResult(isbns=["9784839974206"])
+        scanner = StreamScanner(detector=self.detector, debounce_seconds=3.0, clock=lambda: now[0])
+
+        def frames():
+            for t in [0.0, 1.0, 10.0]:
+                now[0] = t
+                time.sleep(0.01)
+                yield np.zeros((100, 100, 3), dtype=np.uint8)
+
+        events = list(scanner.scan(frames()))
+
+        assert len(events) == 2
+
+    def test_scan_capture_invalid_source(self):
+        scanner = StreamScanner(detector=self.detector)
+
+        with pytest.raises(ValueError):
+            list(scanner.scan_capture("/nonexistent/video.mp4"))